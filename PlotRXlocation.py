@@ -5,10 +5,14 @@ where color & size are proportional to measurement interval (smaller is better)
 """
 from pathlib import Path
 from argparse import ArgumentParser
+import io
+import pandas
 import georinex as gr
 import georinex.plots as grp
 from matplotlib.pyplot import show
 
+from am.rinex import rinex_crx
+
 
 def main():
     p = ArgumentParser(description='plot receiver locations')
@@ -16,19 +20,45 @@ def main():
     p.add_argument('-glob', help='file glob pattern', nargs='+',
                    default=['*o',
                             '*O.rnx', '*O.rnx.gz',
-                            '*O.crx', '*O.crx.gz'])
+                            '*O.crx', '*O.crx.gz',
+                            '*d', '*d.gz'])
     p = p.parse_args()
 
     indir = Path(p.indir).expanduser()
 
     flist = gr.globber(indir, p.glob)
 
-    locs = gr.getlocations(flist)
+    # the header of Compact RINEX files is read in-process, without expanding the file
+    compact = [fn for fn in flist if rinex_crx.isCompact(str(fn))]
+    locs = pandas.concat([gr.getlocations([fn for fn in flist if fn not in compact]), compactlocations(compact)])
 
     grp.receiver_locations(locs)
 
     show()
 
 
+def compactlocations(flist) -> pandas.DataFrame:
+    """
+    receiver locations and measurement interval from the header of Compact RINEX files
+    """
+    locs = pandas.DataFrame(index=[fn.name for fn in flist], columns=['lat', 'lon', 'interval'])
+
+    for fn in flist:
+        try:
+            hdr = gr.rinexheader(io.StringIO(rinex_crx.rinexHeader(str(fn))))
+        except ValueError:
+            continue
+
+        if 'position_geodetic' not in hdr:
+            continue
+
+        locs.loc[fn.name, 'lat'] = hdr['position_geodetic'][0]
+        locs.loc[fn.name, 'lon'] = hdr['position_geodetic'][1]
+        if hdr.get('interval') is not None:
+            locs.loc[fn.name, 'interval'] = hdr['interval']
+
+    return locs.loc[locs.loc[:, ['lat', 'lon']].notna().all(axis=1), :]
+
+
 if __name__ == '__main__':
     main()
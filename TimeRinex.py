@@ -7,6 +7,8 @@ from argparse import ArgumentParser
 import georinex as gr
 import numpy as np
 
+from am.rinex import rinex_crx
+
 
 def main():
     p = ArgumentParser()
@@ -24,12 +26,16 @@ def main():
         for f in flist:
             eachfile(f, p.verbose)
     elif filename.is_file():
-        eachfile(filename, p.quiet, p.verbose)
+        eachfile(filename, p.verbose)
     else:
         raise FileNotFoundError(f'{filename} is not a path or file')
 
 
 def eachfile(fn: Path, verbose: bool = False):
+    if rinex_crx.isCompact(str(fn)):
+        eachcompact(fn, verbose)
+        return
+
     try:
         times = gr.gettime(fn)
     except Exception as e:
@@ -59,5 +65,33 @@ def eachfile(fn: Path, verbose: bool = False):
         print(times)
 
 
+def eachcompact(fn: Path, verbose: bool = False):
+    """
+    Compact RINEX (Hatanaka) files are decoded in-process, only their epoch lines are recovered
+    """
+    try:
+        idx = rinex_crx.epochIndex(str(fn))
+    except (ValueError, KeyError) as e:
+        if verbose:
+            print(f'{fn.name}: {e}')
+        return
+
+    times = idx['time']
+    if times.size == 0:
+        return
+# %% output
+    ostr = (f"{fn.name}:"
+            f" {times[0].astype('datetime64[us]').item().isoformat()}"
+            f" {times[-1].astype('datetime64[us]').item().isoformat()}")
+
+    if ~np.isnan(idx['interval']):
+        ostr += f" {idx['interval']}"
+
+    print(ostr)
+
+    if verbose:
+        print(times)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,136 @@
+"""
+GPS and Galileo time conversions of whole datetime64 arrays
+
+The epochs of the time coordinate of the observations (datetime64[ns]) are
+converted at once to and from the week number and time of week (TOW) of the
+GPS or Galileo system time, the day of year and the seconds of day. All
+conversions are integer nanosecond arithmetic in NumPy, without a Python call
+per epoch and independent of the timezone of the host.
+
+GPS time and Galileo System Time (GST) run without leap seconds and are
+aligned: GST week 0 starts with GPS week 1024 (1999-08-22). Epochs in UTC are
+converted with the table of leap seconds (GPS - UTC) below, which has to be
+extended when a new leap second is announced.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+__author__ = 'amuls'
+
+NSINSEC = 1000000000
+SECSINDAY = 86400
+SECSINWEEK = 604800
+
+# start of week 0 of the system time
+dEpochs = {
+    'G': np.datetime64('1980-01-06T00:00:00', 'ns'),
+    'E': np.datetime64('1999-08-22T00:00:00', 'ns'),
+}
+
+# UTC epoch from which the leap seconds apply and GPS - UTC [s] from then on
+LEAPSECONDS = np.array([
+    ('1981-07-01', 1),
+    ('1982-07-01', 2),
+    ('1983-07-01', 3),
+    ('1985-07-01', 4),
+    ('1988-01-01', 5),
+    ('1990-01-01', 6),
+    ('1991-01-01', 7),
+    ('1992-07-01', 8),
+    ('1993-07-01', 9),
+    ('1994-07-01', 10),
+    ('1996-01-01', 11),
+    ('1997-07-01', 12),
+    ('1999-01-01', 13),
+    ('2006-01-01', 14),
+    ('2009-01-01', 15),
+    ('2012-07-01', 16),
+    ('2015-07-01', 17),
+    ('2017-01-01', 18),
+], dtype=[('utc', 'datetime64[ns]'), ('leap', np.int64)])
+LEAPSECONDS.flags.writeable = False
+
+
+def nanoseconds(times: np.ndarray) -> np.ndarray:
+    """
+    returns the epochs (datetime64 of any unit) as int64 nanoseconds since 1970
+    """
+    return np.asarray(times).astype('datetime64[ns]').astype(np.int64)
+
+
+def leapSeconds(utc: np.ndarray) -> np.ndarray:
+    """
+    returns GPS - UTC [s] at the UTC epochs, 0 before the first leap second after 1980
+    """
+    index = np.searchsorted(LEAPSECONDS['utc'].astype(np.int64), nanoseconds(utc), side='right')
+
+    return np.concatenate([[0], LEAPSECONDS['leap']])[index]
+
+
+def utc2gps(utc: np.ndarray) -> np.ndarray:
+    """
+    returns the UTC epochs in GPS time (also GST)
+    """
+    return (nanoseconds(utc) + leapSeconds(utc) * NSINSEC).astype('datetime64[ns]')
+
+
+def gps2utc(gps: np.ndarray) -> np.ndarray:
+    """
+    returns the GPS time (or GST) epochs in UTC
+
+    An epoch during an inserted leap second (23:59:60 UTC) is returned as the first second of the next day.
+    """
+    ns = nanoseconds(gps)
+    # the GPS epochs from which the leap seconds apply
+    index = np.searchsorted(LEAPSECONDS['utc'].astype(np.int64) + LEAPSECONDS['leap'] * NSINSEC, ns, side='right')
+
+    return (ns - np.concatenate([[0], LEAPSECONDS['leap']])[index] * NSINSEC).astype('datetime64[ns]')
+
+
+def weekTOW(times: np.ndarray, gnss: str = 'G', utc: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    returns the week number (int64) and time of week [s] (float64) of the epochs
+
+    params times: the epochs (datetime64) in the system time, or in UTC when utc is set
+    params gnss: the system time, 'G' for GPS and 'E' for Galileo
+    params utc: the epochs are in UTC and are converted with the leap seconds
+    """
+    ns = nanoseconds(utc2gps(times) if utc else times) - dEpochs[gnss].astype(np.int64)
+    week, tow = np.divmod(ns, SECSINWEEK * NSINSEC)
+
+    return week, tow / NSINSEC
+
+
+def timesFromWeekTOW(week: np.ndarray, tow: np.ndarray, gnss: str = 'G', utc: bool = False) -> np.ndarray:
+    """
+    returns the epochs (datetime64[ns]) of the week numbers and times of week [s]
+
+    params gnss: the system time, 'G' for GPS and 'E' for Galileo
+    params utc: return the epochs in UTC instead of the system time
+    """
+    # the whole seconds are kept exact, the fraction is rounded to the nanosecond
+    seconds = np.floor(tow)
+    ns = dEpochs[gnss].astype(np.int64) + np.asarray(week, dtype=np.int64) * SECSINWEEK * NSINSEC + seconds.astype(np.int64) * NSINSEC + np.round((np.asarray(tow) - seconds) * NSINSEC).astype(np.int64)
+    times = ns.astype('datetime64[ns]')
+
+    return gps2utc(times) if utc else times
+
+
+def dayOfYear(times: np.ndarray) -> np.ndarray:
+    """
+    returns the day of year (1 on January 1st) of the epochs
+    """
+    times = np.asarray(times).astype('datetime64[ns]')
+
+    return (times.astype('datetime64[D]') - times.astype('datetime64[Y]')).astype(np.int64) + 1
+
+
+def secondsOfDay(times: np.ndarray) -> np.ndarray:
+    """
+    returns the seconds of day [s] (float64) of the epochs
+    """
+    times = np.asarray(times).astype('datetime64[ns]')
+
+    return (times - times.astype('datetime64[D]')).astype(np.int64) / NSINSEC
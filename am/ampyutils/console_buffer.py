@@ -0,0 +1,102 @@
+"""
+thread-safe, line-capped buffer collecting the text written to a redirected sys.stdout
+
+The writes (from the GUI thread or the worker threads) only append the text
+to a list under a lock; the consumer drains all text written since the last
+drain in one string, e.g. at a fixed frame rate for display. When more than
+maxLines lines are pending only the last maxLines are kept, with a line
+telling how many were dropped, so a burst of output costs bounded memory and
+display time.
+"""
+
+import threading
+
+__author__ = 'amuls'
+
+# number of lines kept for display
+MAXLINES = 10000
+
+
+class ConsoleBuffer(object):
+    """
+    file-like object coalescing the text written until it is drained
+    """
+
+    def __init__(self, maxLines: int = MAXLINES):
+        """
+        params maxLines: maximum number of lines returned by a drain, older lines are dropped
+        """
+        self.maxLines = maxLines
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.pendingLines = 0
+        self.dropped = 0
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        """
+        appends the text, the oldest lines are dropped when twice maxLines lines are pending
+        """
+        if self.closed or not text:
+            return 0
+
+        with self.lock:
+            self.pending.append(text)
+            self.pendingLines += text.count('\n')
+            if self.pendingLines > 2 * self.maxLines:
+                self.pending = [self.trim(''.join(self.pending))]
+                self.pendingLines = self.maxLines
+
+        return len(text)
+
+    def trim(self, text: str) -> str:
+        """
+        returns the text reduced to its last maxLines lines, counting the dropped lines (called with the lock held)
+        """
+        lines = text.split('\n')
+        nrDropped = len(lines) - 1 - self.maxLines
+        if nrDropped <= 0:
+            return text
+
+        self.dropped += nrDropped
+
+        return '\n'.join(lines[nrDropped:])
+
+    def drain(self) -> str:
+        """
+        returns the text written since the last drain (empty string when none), preceded by the number of dropped lines
+        """
+        with self.lock:
+            if not self.pending:
+                return ''
+
+            text = ''.join(self.pending)
+            if self.pendingLines > self.maxLines:
+                text = self.trim(text)
+            dropped, self.dropped = self.dropped, 0
+            self.pending = []
+            self.pendingLines = 0
+
+        if dropped:
+            text = '[... {:d} lines dropped ...]\n'.format(dropped) + text
+
+        return text
+
+    def flush(self):
+        """
+        the text is displayed when drained
+        """
+        pass
+
+    def close(self):
+        """
+        further writes are ignored, the pending text can still be drained
+        """
+        self.closed = True
+
+    def isatty(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return True
@@ -1,43 +1,56 @@
-from PyQt5.QtCore import (QObject)
+from PyQt5.QtCore import (QObject, QTimer)
 from PyQt5.QtCore import (pyqtSignal, pyqtSlot)
 
-from multiprocessing import Queue
+import sys
 
+from ampyutils import console_buffer
 
-class WriteStream(object):
-    """
-    The new Stream Object which replaces the default stream associated with sys.stdout
-    This object just puts data in a queue!
-    """
-    def __init__(self,queue):
-        self.queue = queue
+# interval in ms between two updates of the display (20 frames per second)
+FRAMEINTERVAL = 50
 
-    def write(self, text):
-        try:
-            self.queue.put(text)
-        except AttributeError:
-            pass
 
-class rxStdOut(QObject):
+class ConsoleStream(QObject):
     """
-    A QObject (to be run in a QThread) which sits waiting for data to come through a Queue.Queue().
-    It blocks until data is available, and one it has got something from the queue, it sends
-    it to the "MainThread" by emitting a Qt Signal
+    Replaces sys.stdout by a ConsoleBuffer collecting the text written from any thread.
+    A timer in the "MainThread" drains the buffer at a fixed frame rate and emits the text
+    written since the previous frame in a single Qt Signal, at most maxLines lines of it.
     """
-    rxStdOutSignal = pyqtSignal(str)
+    signalText = pyqtSignal(str)
 
-    def __init__(self,queue,*args,**kwargs):
-        QObject.__init__(self,*args,**kwargs)
-        self.queue = queue
+    def __init__(self, maxLines: int = console_buffer.MAXLINES, interval: int = FRAMEINTERVAL, *args, **kwargs):
+        QObject.__init__(self, *args, **kwargs)
+        self.buffer = console_buffer.ConsoleBuffer(maxLines=maxLines)
+        self.stdout = None
 
-    @pyqtSlot()
-    def run(self):
-        while True:
-            try:
-                text = self.queue.get()
-            except EOFError:
-                pass
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
 
-            self.rxStdOutSignal.emit(text)
+    def install(self):
+        """
+        redirects sys.stdout to the buffer and starts the display updates
+        """
+        self.stdout = sys.stdout
+        sys.stdout = self.buffer
+        self.timer.start()
 
+    @pyqtSlot()
+    def flush(self):
+        """
+        emits the text written since the previous frame
+        """
+        text = self.buffer.drain()
+        if text:
+            self.signalText.emit(text)
 
+    @pyqtSlot()
+    def close(self):
+        """
+        stops the display updates, restores sys.stdout and writes the text not yet displayed to it
+        """
+        self.timer.stop()
+        self.buffer.close()
+        if self.stdout is not None:
+            sys.stdout = self.stdout
+            self.stdout = None
+        sys.stdout.write(self.buffer.drain())
@@ -0,0 +1,120 @@
+"""
+headless rendering of the plots to PNG files in a pool of processes
+
+The plots of rinexObsPlot (one per signal type) and signalDiffPlot (one per
+PRN) are split in independent jobs, each rendered with the Agg backend in a
+separate process: no window is opened and no GUI event loop is started, so a
+day of plots is created unattended. The processes are started by spawning, they
+do not inherit the GUI state of the calling process.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+
+import xarray
+
+from rinex import rinex_diff
+from rinex import rinex_observables as rnxobs
+
+__author__ = 'amuls'
+
+
+def initRenderer():
+    """
+    selects the Agg backend in the rendering process, before any plot is created
+    """
+    import matplotlib.pyplot as plt
+
+    plt.switch_backend('Agg')
+
+
+def renderObservables(dPlot: dict, obsData: xarray.Dataset, singleArtist: bool = True, downsample: bool = True) -> List[str]:
+    """
+    renders the plots of the observables of rinexObsPlot without showing them
+
+    returns the names of the plots saved
+    """
+    from plot import rinexObsPlot
+
+    return rinexObsPlot.plotRinexObservables(dPlot=dPlot, obsData=obsData, logger=logging.getLogger(os.path.basename(__file__)), singleArtist=singleArtist, downsample=downsample, show=False)
+
+
+def renderSignalDiff(dCsv: dict, sigDiff: rinex_diff.SignalDiff, downsample: bool = True) -> List[str]:
+    """
+    renders the plots of the signal difference of signalDiffPlot without showing them
+
+    returns the names of the plots saved
+    """
+    from plot import signalDiffPlot
+
+    return signalDiffPlot.plotSignalDiff(dCsv=dCsv, sigDiff=sigDiff, logger=logging.getLogger(os.path.basename(__file__)), downsample=downsample, show=False)
+
+
+def observableJobs(dPlot: dict, obsData: xarray.Dataset, **kwargs) -> List[Tuple[Callable, dict]]:
+    """
+    returns a job per signal type of the selected signals, each holding only its signals and satellites of the time window
+
+    params kwargs: passed to renderObservables
+    """
+    # the signals grouped by signal type, in the order of selection
+    dSigTypes = {}
+    for signal in dPlot['Signals']:
+        dSigTypes.setdefault(rnxobs.signalType(signal), []).append(signal)
+
+    obsWindow = obsData.sel(time=slice(dPlot['Time']['start'], dPlot['Time']['end'])).sel(sv=dPlot['SVs'])
+
+    return [(renderObservables, dict(dPlot=dict(dPlot, Signals=signals), obsData=obsWindow[signals], **kwargs)) for signals in dSigTypes.values()]
+
+
+def signalDiffJobs(dCsv: dict, sigDiff: rinex_diff.SignalDiff, **kwargs) -> List[Tuple[Callable, dict]]:
+    """
+    returns a job per PRN, each holding only the arrays of its PRN
+
+    params kwargs: passed to renderSignalDiff
+    """
+    return [(renderSignalDiff, dict(dCsv=dict(dCsv, SVs=[prn], stats={prn: dCsv['stats'][prn]}), sigDiff=sigDiff.select([prn]), **kwargs)) for prn in dCsv['SVs']]
+
+
+def runJob(job: Tuple[Callable, dict]):
+    """
+    runs a job, returns its result
+    """
+    func, kwargs = job
+
+    return func(**kwargs)
+
+
+def runJobs(jobs: Sequence[Tuple[Callable, dict]], workers: int = None) -> Tuple[list, float]:
+    """
+    runs the jobs in parallel processes with the Agg backend
+
+    params workers: number of processes (None for all cores), 1 runs the jobs in this process after switching it to the Agg backend
+    returns the results of the jobs in their order and the elapsed time in seconds
+    """
+    tStart = time.perf_counter()
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(jobs) <= 1:
+        initRenderer()
+        results = [runJob(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=initRenderer) as executor:
+            results = list(executor.map(runJob, jobs))
+
+    return results, time.perf_counter() - tStart
+
+
+def renderPlots(jobs: Sequence[Tuple[Callable, dict]], workers: int = None) -> Tuple[List[str], float]:
+    """
+    renders the plots of the jobs in parallel processes
+
+    params workers: number of rendering processes (None for all cores), 1 renders in this process after switching it to the Agg backend
+    returns the names of the plots saved and the elapsed time in seconds
+    """
+    results, elapsed = runJobs(jobs, workers=workers)
+
+    return [name for names in results for name in names], elapsed
@@ -0,0 +1,250 @@
+"""
+downsampling of long time series to the resolution of the plot
+
+A daily 1 Hz or 10 Hz series holds far more epochs than the axis has pixels.
+Only the epochs that change the drawn image are handed to matplotlib:
+
+- for lines, the first, last, minimum and maximum epoch of each pixel column
+  (M4 aggregation), so spikes and jumps (e.g. cycle slips) are kept and the
+  line is drawn as with all epochs. The first missing epoch of each gap is
+  kept so the line still breaks at the gaps.
+- for markers without line, one epoch per pixel cell of the axis.
+
+The Downsampler keeps the full series of its lines and filled areas and selects again the epochs
+when the limits of the axis change (zoom, pan) or the figure is resized.
+Disabled, the lines are plotted with all epochs, e.g. for an export at full
+resolution.
+"""
+
+from typing import Sequence
+
+import numpy as np
+from matplotlib import dates
+
+__author__ = 'amuls'
+
+# line styles drawing only the markers
+NOLINE = ['None', 'none', '', ' ']
+
+
+def windowIndices(x: np.ndarray, valid: np.ndarray, xLim: Sequence[float]) -> np.ndarray:
+    """
+    returns the indices of the valid epochs in the x window, extended by the nearest valid epoch on each side
+
+    params x: sorted epochs
+    params valid: indices of the epochs with a value
+    """
+    lo, hi = np.searchsorted(x[valid], xLim[0], side='left'), np.searchsorted(x[valid], xLim[1], side='right')
+
+    return valid[max(lo - 1, 0):hi + 1]
+
+
+def bucketIndices(x: np.ndarray, y: np.ndarray, xLim: Sequence[float], nrBuckets: int) -> np.ndarray:
+    """
+    returns the sorted indices of the epochs drawing the line y(x) in the x window with nrBuckets pixel columns
+
+    Per column the first, last, minimum and maximum epoch are kept, and the first missing epoch of each gap.
+    """
+    missing = np.isnan(y)
+    window = windowIndices(x, np.flatnonzero(~missing), xLim)
+    if window.size == 0:
+        return window
+
+    # the first missing epoch after an observed one breaks the line
+    gaps = np.flatnonzero(missing[1:] & ~missing[:-1]) + 1
+    gaps = gaps[(gaps > window[0]) & (gaps < window[-1])]
+
+    if window.size <= 4 * nrBuckets:
+        return np.union1d(window, gaps)
+
+    # epochs outside the window go to the first and last column
+    buckets = np.clip(((x[window] - xLim[0]) / (xLim[1] - xLim[0]) * nrBuckets).astype(np.intp), 0, nrBuckets - 1)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], window.size]
+
+    values = y[window]
+    positions = np.arange(window.size)
+    iMin = np.minimum.reduceat(np.where(values == np.repeat(np.minimum.reduceat(values, starts), ends - starts), positions, window.size), starts)
+    iMax = np.minimum.reduceat(np.where(values == np.repeat(np.maximum.reduceat(values, starts), ends - starts), positions, window.size), starts)
+
+    return np.union1d(window[np.concatenate([starts, ends - 1, iMin, iMax])], gaps)
+
+
+def cellIndices(x: np.ndarray, y: np.ndarray, xLim: Sequence[float], yLim: Sequence[float], nrColumns: int, nrRows: int) -> np.ndarray:
+    """
+    returns the sorted indices of the epochs drawing the markers y(x) in the window with nrColumns x nrRows pixels, one per pixel
+
+    Epochs just outside the window are kept as their markers are partly visible.
+    """
+    window = windowIndices(x, np.flatnonzero(~np.isnan(y)), xLim)
+    if window.size <= nrColumns:
+        return window
+
+    columns = np.floor((x[window] - xLim[0]) / (xLim[1] - xLim[0]) * nrColumns)
+    rows = np.floor((y[window] - yLim[0]) / (yLim[1] - yLim[0]) * nrRows)
+    inside = (columns >= -2) & (columns < nrColumns + 2) & (rows >= -2) & (rows < nrRows + 2)
+    window, columns, rows = window[inside], columns[inside].astype(np.int64) + 2, rows[inside].astype(np.int64) + 2
+
+    cells = columns * (nrRows + 4) + rows
+    _, first = np.unique(cells, return_index=True)
+
+    return np.sort(window[first])
+
+
+def fillPolygons(x: np.ndarray, y: np.ndarray) -> list:
+    """
+    returns the polygons of the area between y(x) and 0 as fill_between creates them, one per run of epochs with a value
+    """
+    observed = ~np.isnan(y)
+    starts = np.flatnonzero(observed & ~np.r_[False, observed[:-1]])
+    ends = np.flatnonzero(observed & ~np.r_[observed[1:], False]) + 1
+
+    polygons = []
+    for start, end in zip(starts, ends):
+        polygon = np.empty((2 * (end - start) + 2, 2))
+        polygon[0] = x[start], 0
+        polygon[1:end - start + 1, 0], polygon[1:end - start + 1, 1] = x[start:end], y[start:end]
+        polygon[end - start + 1] = x[end - 1], 0
+        polygon[end - start + 2:, 0], polygon[end - start + 2:, 1] = x[start:end][::-1], 0
+        polygons.append(polygon)
+
+    return polygons
+
+
+class Downsampler:
+    """
+    keeps the full series of the lines of an axis and draws them with the epochs needed at the resolution of the axis
+    """
+
+    def __init__(self, ax, enabled: bool = True):
+        """
+        params enabled: when False the lines are plotted with all epochs
+        """
+        self.ax = ax
+        self.enabled = enabled
+        self.lines = []
+        self.fills = []
+        self.updating = False
+        # the limits and resolution of the axis for which the epochs were selected
+        self.view = None
+
+        # the callbacks keep the downsampler alive as long as the axis (bound methods would only be weakly referenced)
+        if enabled:
+            ax.callbacks.connect('xlim_changed', lambda event: self.update())
+            ax.callbacks.connect('ylim_changed', lambda event: self.update())
+            ax.figure.canvas.mpl_connect('resize_event', lambda event: self.update())
+
+    def plot(self, times: np.ndarray, values: np.ndarray, **kwargs):
+        """
+        plots the series as ax.plot does, with the epochs selected for the current limits of the axis
+
+        params times: the epochs (datetime64), sorted
+        returns the line created
+        """
+        if not self.enabled:
+            return self.ax.plot(times, values, **kwargs)[0]
+
+        times = np.asarray(times)
+        values = np.asarray(values, dtype=float)
+        x = dates.date2num(times)
+        observed = np.flatnonzero(~np.isnan(values))
+        if observed.size == 0:
+            return self.ax.plot(times, values, **kwargs)[0]
+
+        # the epochs for the range of the series unless the limits are set, with its extremes so that the axis limits
+        # follow the full series, selected again when the axis limits change
+        xLim = [x[observed[0]], x[observed[-1]]] if self.ax.get_autoscalex_on() else None
+        yLim = [np.nanmin(values), np.nanmax(values)] if self.ax.get_autoscaley_on() else None
+        indices = np.union1d(self.epochIndices(x, values, marker=kwargs.get('linestyle', kwargs.get('ls')) in NOLINE, xLim=xLim, yLim=yLim), [np.nanargmin(values), np.nanargmax(values)])
+
+        # adding the line may adapt the axis limits, the lines are selected again at the next change of the limits
+        self.updating = True
+        try:
+            line = self.ax.plot(times[indices], values[indices], **kwargs)[0]
+        finally:
+            self.updating = False
+        self.lines.append((line, times, x, values))
+
+        return line
+
+    def fillBetween(self, times: np.ndarray, values: np.ndarray, **kwargs):
+        """
+        fills the area between the series and 0 as ax.fill_between does, with the epochs of the line drawn for the current limits of the axis
+
+        returns the collection created
+        """
+        if not self.enabled:
+            return self.ax.fill_between(times, values, **kwargs)
+
+        times = np.asarray(times)
+        values = np.asarray(values, dtype=float)
+        fill = {'times': times, 'x': dates.date2num(times), 'values': values, 'kwargs': kwargs}
+        self.fills.append(fill)
+
+        self.updating = True
+        try:
+            self.selectFill(fill)
+        finally:
+            self.updating = False
+
+        return fill['collection']
+
+    def selectFill(self, fill: dict, xLim: Sequence[float] = None):
+        """
+        fills again the area with the epochs drawn for the limits, by default the current limits of the axis
+        """
+        observed = np.flatnonzero(~np.isnan(fill['values']))
+        if xLim is None and 'collection' not in fill and observed.size and self.ax.get_autoscalex_on():
+            xLim = [fill['x'][observed[0]], fill['x'][observed[-1]]]
+        indices = bucketIndices(fill['x'], fill['values'], sorted(self.ax.get_xlim() if xLim is None else xLim), self.resolution()[0])
+
+        # the area is created once by fill_between (limits, style, legend), afterwards only its polygons are replaced
+        if 'collection' in fill:
+            fill['collection'].set_verts(fillPolygons(fill['x'][indices], fill['values'][indices]))
+            fill['collection'].stale = True
+        else:
+            fill['collection'] = self.ax.fill_between(fill['times'][indices], fill['values'][indices], **fill['kwargs'])
+
+    def resolution(self):
+        """
+        returns the width and height in pixels of the axis
+        """
+        return max(1, int(self.ax.bbox.width)), max(1, int(self.ax.bbox.height))
+
+    def epochIndices(self, x: np.ndarray, values: np.ndarray, marker: bool, xLim: Sequence[float] = None, yLim: Sequence[float] = None) -> np.ndarray:
+        """
+        returns the epochs drawn for the limits, by default the current limits of the axis
+
+        params marker: the series is drawn by markers without line
+        """
+        xLim = sorted(self.ax.get_xlim() if xLim is None else xLim)
+        nrColumns, nrRows = self.resolution()
+
+        if marker:
+            return cellIndices(x, values, xLim, sorted(self.ax.get_ylim() if yLim is None else yLim), nrColumns, nrRows)
+
+        return bucketIndices(x, values, xLim, nrColumns)
+
+    def update(self):
+        """
+        selects again the epochs of all lines, called when the limits of the axis or the size of the figure change
+        """
+        # changing the data may adapt the limits of the axis, which calls update again
+        if self.updating:
+            return
+
+        # the x and y limits changed callbacks both call update
+        view = (tuple(self.ax.get_xlim()), tuple(self.ax.get_ylim()), self.resolution())
+        if view == self.view:
+            return
+        self.view = view
+
+        self.updating = True
+        try:
+            for line, times, x, values in self.lines:
+                indices = self.epochIndices(x, values, marker=line.get_linestyle() in NOLINE)
+                line.set_data(times[indices], values[indices])
+            for fill in self.fills:
+                self.selectFill(fill)
+        finally:
+            self.updating = False
@@ -0,0 +1,152 @@
+"""
+drawing the observations of many satellites on an axis as a single artist
+
+Drawing a Line2D with markers per satellite costs time per point, whatever the
+number of artists, and is repeated at each pan or zoom. SVPoints holds the
+points of all satellites of a subplot and draws them as one image of the axes
+area: each point marks its pixel with the index of its satellite, the marks are
+widened to the marker size and coloured through the satellite colours. The
+image is recomputed at each draw, so it follows pan and zoom at the screen
+resolution. As with the Line2D per satellite, a satellite plotted later covers
+the ones plotted before. When zoomed in, only the epochs in the time window of
+the axis are drawn.
+
+The legend per satellite is made from proxy handles.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import matplotlib as mpl
+from matplotlib import artist, colors as mcolors, dates
+from matplotlib.lines import Line2D
+
+__author__ = 'amuls'
+
+
+class SVPoints(artist.Artist):
+    """
+    the (time, sv) observations of the satellites drawn as one artist with a colour per satellite
+    """
+    zorder = 2
+
+    def __init__(self, times: np.ndarray, values: np.ndarray, colors: Sequence, markersize: float = 3, cull: bool = True, **kwargs):
+        """
+        params times: the epochs (datetime64) of the observations
+        params values: (time, sv) array of the observations, NaN when not observed
+        params colors: the colour of each satellite (column of values)
+        params markersize: size in points of the '.' marker used by Line2D
+        params cull: draw only the epochs in the time window of the axis
+        """
+        super().__init__(**kwargs)
+
+        # the points ordered by satellite so that later satellites cover the earlier ones
+        observed = ~np.isnan(values.T)
+        iSV, iTime = np.nonzero(observed)
+        self.xy = np.column_stack([dates.date2num(times)[iTime], values.T[observed]])
+        self.svIndex = (iSV + 1).astype(np.int16)
+        # the points of each satellite are sorted in time from svStarts[i] to svStarts[i + 1]
+        self.svStarts = np.searchsorted(iSV, np.arange(values.shape[1] + 1))
+        self.cull = cull
+
+        # index 0 is the transparent background
+        self.lut = np.round(np.vstack([np.zeros((1, 4)), mcolors.to_rgba_array(colors)]) * 255).astype(np.uint8)
+        self.markersize = markersize
+
+    def dataLim(self) -> np.ndarray:
+        """
+        returns the points as (x, y) in data coordinates for the limits of the axis
+        """
+        return self.xy
+
+    def windowIndices(self, xLim) -> np.ndarray:
+        """
+        returns the indices of the points of all satellites with their epoch in the window xLim
+        """
+        x = self.xy[:, 0]
+        ranges = []
+        for start, end in zip(self.svStarts[:-1], self.svStarts[1:]):
+            lo, hi = np.searchsorted(x[start:end], xLim)
+            ranges.append(np.arange(start + lo, start + hi))
+
+        return np.concatenate(ranges) if ranges else np.arange(0)
+
+    def markerRadius(self, renderer) -> int:
+        """
+        returns the radius in pixels of the '.' marker (half the marker size plus its edge)
+        """
+        diameter = 0.5 * self.markersize + mpl.rcParams['lines.markeredgewidth']
+
+        return int(renderer.points_to_pixels(diameter) / 2)
+
+    @artist.allow_rasterization
+    def draw(self, renderer):
+        """
+        draws the points as an image of the axes area
+        """
+        if not self.get_visible() or self.axes is None or self.xy.shape[0] == 0:
+            return
+
+        bbox = self.axes.bbox
+        x0, y0 = int(np.floor(bbox.x0)), int(np.floor(bbox.y0))
+        width, height = int(np.ceil(bbox.x1)) - x0, int(np.ceil(bbox.y1)) - y0
+        if width <= 0 or height <= 0:
+            return
+
+        radius = self.markerRadius(renderer)
+
+        # the points in the time window widened by the marker radius
+        if self.cull:
+            xMin, xMax = sorted(self.axes.get_xlim())
+            margin = (xMax - xMin) * (radius + 1) / width
+            points = self.windowIndices([xMin - margin, xMax + margin])
+        else:
+            points = np.arange(self.xy.shape[0])
+
+        # pixel of each point, points outside the axes area are dropped
+        pixels = np.floor(self.axes.transData.transform(self.xy[points]) - [x0, y0])
+        inside = np.all(np.isfinite(pixels), axis=1) & (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+        px = pixels[inside, 0].astype(np.intp)
+        py = pixels[inside, 1].astype(np.intp)
+
+        # the satellite index marked per pixel (the last one wins) in a frame of the marker radius
+        marks = np.zeros((height + 2 * radius, width + 2 * radius), dtype=np.int16)
+        marks[py + radius, px + radius] = self.svIndex[points[inside]]
+
+        # widen the marks to the disk of the marker, keeping the highest index as the satellite on top
+        svImage = np.zeros((height, width), dtype=np.int16)
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                if dx * dx + dy * dy <= radius * radius + radius:
+                    np.maximum(svImage, marks[radius + dy:radius + dy + height, radius + dx:radius + dx + width], out=svImage)
+
+        gc = renderer.new_gc()
+        gc.set_clip_rectangle(bbox)
+        gc.set_alpha(self.get_alpha())
+        renderer.draw_image(gc, x0, y0, self.lut[svImage])
+        gc.restore()
+
+        self.stale = False
+
+
+def plotSVs(ax, times: np.ndarray, values: np.ndarray, colors: Sequence, markersize: float = 3, cull: bool = True) -> SVPoints:
+    """
+    adds the (time, sv) observations to the axis as a single SVPoints artist and adapts the axis limits
+
+    returns the artist added
+    """
+    points = SVPoints(times=times, values=values, colors=colors, markersize=markersize, cull=cull)
+    ax.add_artist(points)
+
+    ax.xaxis_date()
+    ax.update_datalim(points.dataLim())
+    ax.autoscale_view()
+
+    return points
+
+
+def legendHandles(svs: Sequence[str], colors: Sequence, markersize: float = 3) -> list:
+    """
+    returns the proxy handles for a legend entry per satellite, drawn as the Line2D markers
+    """
+    return [Line2D([], [], label=sv, color=color, marker='.', markersize=markersize, linestyle='') for sv, color in zip(svs, colors)]
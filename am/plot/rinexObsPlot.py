@@ -13,14 +13,37 @@ from termcolor import colored
 
 from rinex import rinex_observables as rnxobs
 from plot import plot_utils
+from plot import plot_points
+from plot import plot_downsample
 
 register_matplotlib_converters()
 
 
-def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Logger):
+def prepareObservables(dPlot: dict, obsData: xarray.Dataset) -> dict:
+    """
+    returns the observations to plot: the epochs of the time window and per signal the (time, sv) values of the satellites in the order of dPlot['SVs']
+    """
+    timeInterval = [datetime.datetime.strptime(dPlot['Time']['start'], "%Y-%m-%dT%H:%M:%S"), datetime.datetime.strptime(dPlot['Time']['end'], "%Y-%m-%dT%H:%M:%S")]
+
+    # slice the time window once for all signals and satellites
+    obsWindow = obsData[dPlot['Signals']].sel(time=slice(timeInterval[0], timeInterval[1])).sel(sv=dPlot['SVs'])
+
+    dData = {}
+    dData['Time'] = obsWindow.time.values
+    dData['Signals'] = {signal: obsWindow[signal].transpose('time', 'sv').values for signal in dPlot['Signals']}
+
+    return dData
+
+
+def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Logger, singleArtist: bool = True, downsample: bool = True, show: bool = True) -> list:
     """
     plots the observales according to the selection made
     each plot combines separate plots for each signalType selected for all satellites
+
+    params singleArtist: draw the satellites of a subplot as one artist (faster pan / zoom) instead of a line per satellite
+    params downsample: draw only the epochs visible at the resolution of the plot, selected again on zoom (False for all epochs)
+    params show: show the plots, else they are only saved
+    returns the names of the plots saved
     """
     cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
@@ -44,9 +67,9 @@ def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Lo
     # find the signalType to which each signal belongs
     sigTypes = []
     for signal in dPlot['Signals']:
-        sigType = list(set(rnxobs.findKeyOfSignal(signal, dict(rnxobs.dGAL, **rnxobs.dGPS))))
+        sigType = rnxobs.signalType(signal)
         logger.info('{func:s}: signal = {sign!s}   signal type = {sigt!s}'.format(sign=signal, sigt=sigType, func=cFuncName))
-        sigTypes.append(sigType)
+        sigTypes.append([] if sigType is None else [sigType])
 
     # get rid of list of lists to get 1 list
     flatSigTypes = [item for sublist in sigTypes for item in sublist]
@@ -59,7 +82,11 @@ def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Lo
     tLim = [dPlot['Time']['start'], dPlot['Time']['end']]
     logger.info('{func:s}: time limits = {tlim!s}'.format(tlim=tLim, func=cFuncName))
 
+    # the observations in the time window for the selected signals and satellites
+    dData = prepareObservables(dPlot=dPlot, obsData=obsData)
+
     # create 1 plot for each uniq signalType with subplots for each signal of that sigType we have
+    figNames = []
     for i, sigType in enumerate(uniqSigTypes):
         logger.info('{func:s}: ----------------------'.format(func=cFuncName))
         logger.info('{func:s}: making plot for signal type {name!s} ({sigt:s})'.format(sigt=sigType, name=rnxobs.dSignalTypesNames[sigType]['name'], func=cFuncName))
@@ -115,24 +142,31 @@ def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Lo
             logger.info('{func:s}: Plotting signal {!s} over interval {time!s}'.format(signal, time=timeInterval, func=cFuncName))
             logger.info('{func:s}: for satellites {svs!s} (#{nr:d})'.format(svs=dPlot['SVs'], nr=len(dPlot['SVs']), func=cFuncName))
 
-            for iSV, sv in enumerate(dPlot['SVs']):
-                obsData_time = obsData.sel(time=slice(timeInterval[0], timeInterval[1]))
-                logger.info('{func:s} ... plotting satellite {sv:s}'.format(sv=sv, func=cFuncName))
+            # determine color for each SV by taking the color with the index of SV in AllSVs list
+            colorSVs = [colors[dPlot['AllSVs'].index(sv)] for sv in dPlot['SVs']]
 
-                # determine color for this SV by taking the color with th eindex of SV in AllSVs list
-                colorSV = colors[dPlot['AllSVs'].index(sv)]
+            if singleArtist:
+                logger.info('{func:s} ... plotting satellites {svs!s} as one artist'.format(svs=dPlot['SVs'], func=cFuncName))
+                plot_points.plotSVs(ax, times=dData['Time'], values=dData['Signals'][signal], colors=colorSVs, markersize=3, cull=downsample)
 
-                ax.plot(obsData_time.time, obsData_time[signal].sel(sv=sv), label='{sv:s}'.format(sv=sv), color=colorSV, marker='.', markersize=3, linestyle='')
+                # add a legend the plot showing the satellites displayed
+                ax.legend(handles=plot_points.legendHandles(svs=dPlot['SVs'], colors=colorSVs, markersize=3), loc='best', ncol=16, markerscale=6)
+            else:
+                downsampler = plot_downsample.Downsampler(ax, enabled=downsample)
+                for iSV, sv in enumerate(dPlot['SVs']):
+                    logger.info('{func:s} ... plotting satellite {sv:s}'.format(sv=sv, func=cFuncName))
 
-            # add a legend the plot showing the satellites displayed
-            ax.legend(loc='best', ncol=16, markerscale=6)
+                    downsampler.plot(dData['Time'], dData['Signals'][signal][:, iSV], label='{sv:s}'.format(sv=sv), color=colorSVs[iSV], marker='.', markersize=3, linestyle='')
+
+                # add a legend the plot showing the satellites displayed
+                ax.legend(loc='best', ncol=16, markerscale=6)
 
             # find name of the signal in each constellation and use this for subplot title
             subTitle = 'Datafile {name:s}: '.format(name=os.path.basename(dPlot['name']))
             if any([sv for sv in dPlot['SVs'] if sv.startswith('E')]):
-                subTitle += subTitleGNSS(dGNSS=rnxobs.dGAL, signal=signal, logger=logger)
+                subTitle += subTitleGNSS(gnss='E', signal=signal, logger=logger)
             if any([sv for sv in dPlot['SVs'] if sv.startswith('G')]):
-                subTitle += subTitleGNSS(dGNSS=rnxobs.dGPS, signal=signal, logger=logger)
+                subTitle += subTitleGNSS(gnss='G', signal=signal, logger=logger)
             logger.info('{func:s}: plot subtitle {sub:s}'.format(sub=subTitle, func=cFuncName))
 
             # adjust the titles for the subplots
@@ -183,15 +217,20 @@ def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Lo
 
         # figName += '{start:s}'.format(start=datetime.datetime.strptime(dPlot['Time']['start'], "%Y-%m-%dT%H:%M:%S"))
         # figName += '{end:s}'.format(end=datetime.datetime.strptime(dPlot['Time']['end'], "%Y-%m-%dT%H:%M:%S"))
-        tmpName = figName.replace(' ', '-')
+        # only the file name is adapted, not the directory
+        tmpName = os.path.basename(figName).replace(' ', '-')
         tmp2Name = tmpName.replace('.', '-')
         tmpName = tmp2Name.replace('_', '')
-        figName = tmpName + '.png'
+        figName = os.path.join(dirName, 'png', tmpName + '.png')
         fig.savefig(figName, dpi=100)
 
         logger.info('{func:s}: plot saved as {name:s}'.format(name=figName, func=cFuncName))
+        figNames.append(figName)
 
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
 
     # # tlim=['2017-02-23T12:59', '2017-02-23T13:13']
     # ax = figure().gca()
@@ -213,33 +252,26 @@ def plotRinexObservables(dPlot: dict, obsData: xarray.Dataset, logger=logging.Lo
     # # ax.plot(self.obsData.time, self.obsData['C2L'].sel(sv=['G02', 'E02']))
     # # show()
 
+    return figNames
+
 
-def subTitleGNSS(dGNSS: dict, signal: str, logger: logging.Logger) -> str:
+def subTitleGNSS(gnss: str, signal: str, logger: logging.Logger) -> str:
     """
     subTitleGNSS returns the subtitle valid for this GNSS
+
+    params gnss: the GNSS system identifier (e.g. 'E')
     """
     cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-    path = []
-    rnxobs.path2Dict = None
-
-    # walk through the dict to find the sub-dict to which the signal belongs
-    rnxobs.walk(dGNSS, path, signal)
-
-    if rnxobs.path2Dict is not None:
-        subDicts = rnxobs.path2Dict.split('.')[:-1]  # drop key/value pair
-
-        dSub1 = dGNSS[subDicts[0]]
-        dSub2 = dSub1[subDicts[1]]
+    # the band and tracking mode to which the signal belongs
+    info = rnxobs.signalInfo(gnss, signal)
+    if info is None:
+        return ''
 
-        # get the elements for subplot title
-        subTitleGNSS = '{syst:s} {navsv:s} - {signal:s} - {freq:.3f} MHz  '.format(syst=dGNSS['name'], navsv=dSub2['name'], signal=signal, freq=dSub1['freq'])
+    # get the elements for subplot title
+    subTitleGNSS = '{syst:s} {navsv:s} - {signal:s} - {freq:.3f} MHz  '.format(syst=info.system, navsv=info.name, signal=signal, freq=info.freq)
 
-        logger.info('{func:s}: subDicts = {!s}'.format(subDicts, func=cFuncName))
-        logger.info('{func:s}: dGal-path = {!s}'.format(dGNSS[subDicts[0]][subDicts[1]], func=cFuncName))
-        logger.info('{func:s}: dGal-path = {!s}'.format(dGNSS[subDicts[0]], func=cFuncName))
-        logger.info('{func:s}: returns subTitle {subt:s}'.format(subt=subTitleGNSS, func=cFuncName))
+    logger.info('{func:s}: signal info = {!s}'.format(info, func=cFuncName))
+    logger.info('{func:s}: returns subTitle {subt:s}'.format(subt=subTitleGNSS, func=cFuncName))
 
-        return subTitleGNSS
-    else:
-        return ''
+    return subTitleGNSS
@@ -0,0 +1,326 @@
+"""
+cache of parsed RINEX observations
+
+Each entry holds the Dataset read from a RINEX file for a selection of GNSS
+systems, observables, time span, decimation interval and indicators, stored as
+NetCDF in the cache directory. Entries are keyed on the content hash of the
+RINEX file so that a copied or renamed file still hits the cache. A request is
+served from an entry holding the same selection or a superset of it (more GNSS
+systems or observables, a wider time span, no decimation, with indicators).
+The least recently used entries are removed when the cache exceeds its size.
+
+The catalogue is read, updated and written holding a lock, so the loads run
+in the worker threads of rnxplot do not lose each other's entries; the files
+are written under unique temporary names and renamed at once.
+
+The cache directory defaults to ~/.cache/pyrinex and can be set by the
+environment variable PYRINEX_CACHE, its maximum size (in MB) by PYRINEX_CACHE_SIZE.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+import xarray
+
+from rinex import rinex_obs3, rinex_netcdf
+
+__author__ = 'amuls'
+
+# default cache directory and maximum size in bytes
+CACHEDIR = os.environ.get('PYRINEX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'pyrinex'))
+CACHESIZE = int(float(os.environ.get('PYRINEX_CACHE_SIZE', 2000)) * 1e6)
+# catalogue of the entries and the hashed RINEX files
+CATALOGUE = 'catalogue.json'
+# block size used for hashing the RINEX files
+HASHBLOCK = 1 << 20
+# attributes stored by NetCDF as arrays which are lists in the Dataset
+LISTATTRS = ['position', 'time_offset']
+# lock held while the catalogue is read, updated and written (shared by the caches of the process)
+CATALOGUELOCK = threading.RLock()
+
+
+def hashFile(fn: str) -> str:
+    """
+    returns the SHA1 hash of the content of the file
+    """
+    sha1 = hashlib.sha1()
+    with open(fn, 'rb') as f:
+        for block in iter(lambda: f.read(HASHBLOCK), b''):
+            sha1.update(block)
+
+    return sha1.hexdigest()
+
+
+def normSelection(use: Sequence[str] = None, meas: Sequence[str] = None, tlim: Sequence = None, interval: Union[float, int, timedelta] = None, useindicators: bool = False, hdrInterval: float = None) -> dict:
+    """
+    returns the selection in a normalised form used as key of the cache
+
+    A decimation interval not exceeding the interval of the RINEX file keeps all epochs and is dropped.
+    """
+    if isinstance(use, str):
+        use = [use]
+    if isinstance(meas, str):
+        meas = [meas]
+    if meas is not None and not [m for m in meas if m.strip()]:
+        meas = None
+    if isinstance(interval, timedelta):
+        interval = interval.total_seconds()
+    if interval is not None and hdrInterval is not None and interval <= hdrInterval:
+        interval = None
+
+    dSelect = {}
+    dSelect['use'] = sorted(set(use)) if use else None
+    dSelect['meas'] = sorted(set([m.strip() for m in meas if m.strip()])) if meas else None
+    dSelect['tlim'] = [pd.Timestamp(t).isoformat() for t in tlim] if tlim is not None else None
+    dSelect['interval'] = float(interval) if interval is not None else None
+    dSelect['indicators'] = bool(useindicators)
+
+    return dSelect
+
+
+def covers(dEntry: dict, dSelect: dict) -> bool:
+    """
+    checks whether the selection of the cache entry holds all data of the requested selection
+    """
+    if dSelect['indicators'] and not dEntry['indicators']:
+        return False
+
+    if dEntry['use'] is not None:
+        if dSelect['use'] is None or not set(dSelect['use']).issubset(dEntry['use']):
+            return False
+
+    # observables are selected by prefix ('C1' keeps C1C, C1W, ...)
+    if dEntry['meas'] is not None:
+        if dSelect['meas'] is None or not all([m.startswith(tuple(dEntry['meas'])) for m in dSelect['meas']]):
+            return False
+
+    if dEntry['tlim'] is not None:
+        if dSelect['tlim'] is None or pd.Timestamp(dSelect['tlim'][0]) < pd.Timestamp(dEntry['tlim'][0]) or pd.Timestamp(dSelect['tlim'][1]) > pd.Timestamp(dEntry['tlim'][1]):
+            return False
+
+    # decimated data can only serve the very same decimation
+    if dEntry['interval'] is not None:
+        if dSelect['interval'] != dEntry['interval'] or dSelect['tlim'] != dEntry['tlim']:
+            return False
+
+    return True
+
+
+def selectSubset(data: xarray.Dataset, dSelect: dict, dFields: dict) -> xarray.Dataset:
+    """
+    extracts the requested selection from the Dataset of a cache entry holding a superset of it
+
+    params dFields: per GNSS system the observables in the header of the RINEX file
+    """
+    nrEpochs = data.sizes['time']
+    iTimes = np.arange(nrEpochs)
+
+    # time span and decimation, done as rinex_obs3 does while reading
+    if dSelect['tlim'] is not None:
+        tStart, tStop = [np.datetime64(pd.Timestamp(t).to_datetime64(), 'ns') for t in dSelect['tlim']]
+        iTimes = iTimes[(data.time.values[iTimes] >= tStart) & (data.time.values[iTimes] <= tStop)]
+    if dSelect['interval'] is not None:
+        iTimes = iTimes[rinex_obs3.decimationMask(data.time.values[iTimes], timedelta(seconds=dSelect['interval']))]
+
+    subset = data.isel(time=iTimes)
+
+    # satellites of the selected GNSS systems observed in the time span by any observable of the entry: a direct read
+    # keeps the satellites of the epoch records, also those without a value for the observables selected
+    if dSelect['use'] is not None:
+        subset = subset.isel(sv=[i for i, sv in enumerate(subset.sv.values) if sv[0] in dSelect['use']])
+    observed = np.zeros(subset.sizes['sv'], dtype=bool)
+    for name in subset.data_vars:
+        observed |= subset[name].notnull().any(dim='time').values
+    subset = subset.isel(sv=np.flatnonzero(observed))
+
+    # variables of the selected observables of the GNSS systems observed
+    hdr = {'fields': {}}
+    for sysID in sorted(set([sv[0] for sv in subset.sv.values])):
+        hdr['fields'][sysID] = [obs for obs in dFields.get(sysID, []) if dSelect['meas'] is None or obs.startswith(tuple(dSelect['meas']))]
+    subset = subset[[name for name in rinex_obs3.variableNames(hdr, dSelect['indicators']) if name in subset.data_vars]]
+
+    # clock offsets per epoch
+    if 'time_offset' in subset.attrs:
+        if len(subset.attrs['time_offset']) == nrEpochs:
+            subset.attrs['time_offset'] = [subset.attrs['time_offset'][i] for i in iTimes]
+        else:
+            del subset.attrs['time_offset']
+
+    return subset
+
+
+class ObsCache(object):
+    """
+    cache of parsed RINEX observations stored as NetCDF files in a cache directory
+    """
+
+    def __init__(self, cacheDir: str = CACHEDIR, maxSize: int = CACHESIZE):
+        """
+        params cacheDir: directory holding the NetCDF files and the catalogue
+        params maxSize: maximum total size in bytes of the cached NetCDF files
+        """
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+    def readCatalogue(self) -> dict:
+        """
+        returns the catalogue of the cache holding the 'entries' and the hashed 'files'
+        """
+        try:
+            with open(os.path.join(self.cacheDir, CATALOGUE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'entries': {}, 'files': {}}
+
+    def writeCatalogue(self, dCatalogue: dict):
+        """
+        writes the catalogue, replacing the old one at once
+        """
+        fd, tmpName = tempfile.mkstemp(dir=self.cacheDir, prefix=CATALOGUE + '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(dCatalogue, f, indent=1)
+        os.replace(tmpName, os.path.join(self.cacheDir, CATALOGUE))
+
+    def fileInfo(self, fn: str, dCatalogue: dict) -> dict:
+        """
+        returns content hash, header interval and observables of the RINEX file, reusing them while size and modification time are unchanged
+        """
+        stat = os.stat(fn)
+        fileName = os.path.abspath(fn)
+
+        dInfo = dCatalogue['files'].get(fileName)
+        if dInfo is None or dInfo['size'] != stat.st_size or dInfo['mtime'] != stat.st_mtime:
+            dInfo = {'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': hashFile(fn), 'interval': None, 'fields': None}
+
+            # the observables per GNSS allow selecting a subset, only known for RINEX v3 files
+            try:
+                with rinex_obs3.openRinex(fn) as f:
+                    hdr = rinex_obs3.obsheader3(f)
+                dInfo['interval'] = hdr.get('interval')
+                dInfo['fields'] = hdr['fields']
+            except (ValueError, KeyError, OSError):
+                pass
+
+            dCatalogue['files'][fileName] = dInfo
+
+        return dInfo
+
+    def entryName(self, key: str) -> str:
+        return os.path.join(self.cacheDir, key + '.nc')
+
+    def lookup(self, fn: str, use: Sequence[str] = None, tlim: Sequence = None, useindicators: bool = False, meas: Sequence[str] = None, interval: Union[float, int, timedelta] = None) -> xarray.Dataset:
+        """
+        returns the observations of the selection from the cache, None when not cached
+
+        The parameters are those of rinex_obs3.rinexobs3 and georinex.load.
+        """
+        with CATALOGUELOCK:
+            dCatalogue = self.readCatalogue()
+            dInfo = self.fileInfo(fn, dCatalogue)
+            dSelect = normSelection(use=use, meas=meas, tlim=tlim, interval=interval, useindicators=useindicators, hdrInterval=dInfo['interval'])
+
+            # an exact match, else the smallest entry holding a superset of the selection
+            candidates = []
+            for key, dEntry in dCatalogue['entries'].items():
+                if dEntry['hash'] != dInfo['hash']:
+                    continue
+                if dEntry['selection'] == dSelect:
+                    candidates = [(-1, key)]
+                    break
+                if covers(dEntry['selection'], dSelect) and (dInfo['fields'] is not None or (dEntry['selection']['use'] == dSelect['use'] and dEntry['selection']['meas'] == dSelect['meas'])):
+                    candidates.append((dEntry['size'], key))
+
+            for _, key in sorted(candidates):
+                # only the data of the subset are read from the entry
+                try:
+                    with rinex_netcdf.HDF5LOCK, xarray.open_dataset(self.entryName(key)) as nc:
+                        nc = nc.assign_coords(sv=nc.sv.values.astype('U3'))
+                        for attr in LISTATTRS:
+                            if attr in nc.attrs:
+                                nc.attrs[attr] = np.atleast_1d(nc.attrs[attr]).tolist()
+
+                        if dCatalogue['entries'][key]['selection'] != dSelect:
+                            nc = selectSubset(nc, dSelect=dSelect, dFields=dInfo['fields'] or {})
+                        data = nc.load()
+                except (OSError, ValueError):
+                    del dCatalogue['entries'][key]
+                    continue
+
+                data.attrs['filename'] = os.path.basename(fn)
+
+                dCatalogue['entries'][key]['atime'] = time.time()
+                self.writeCatalogue(dCatalogue)
+
+                return data
+
+            self.writeCatalogue(dCatalogue)
+
+            return None
+
+    def store(self, fn: str, data: xarray.Dataset, use: Sequence[str] = None, tlim: Sequence = None, useindicators: bool = False, meas: Sequence[str] = None, interval: Union[float, int, timedelta] = None):
+        """
+        stores the observations read from RINEX file fn for the selection and evicts the least recently used entries
+        """
+        with CATALOGUELOCK:
+            dCatalogue = self.readCatalogue()
+            dInfo = self.fileInfo(fn, dCatalogue)
+            dSelect = normSelection(use=use, meas=meas, tlim=tlim, interval=interval, useindicators=useindicators, hdrInterval=dInfo['interval'])
+
+            key = hashlib.sha1(json.dumps([dInfo['hash'], dSelect], sort_keys=True).encode('ascii')).hexdigest()
+            ncName = self.entryName(key)
+
+            # stored without compression, decompressing takes longer than parsing the selection again
+            fd, tmpName = tempfile.mkstemp(dir=self.cacheDir, prefix=key + '.', suffix='.tmp')
+            os.close(fd)
+            try:
+                with rinex_netcdf.HDF5LOCK:
+                    data.to_netcdf(tmpName, mode='w', format='NETCDF4')
+                os.replace(tmpName, ncName)
+            except Exception:
+                os.remove(tmpName)
+                raise
+
+            dCatalogue['entries'][key] = {'hash': dInfo['hash'], 'file': os.path.abspath(fn), 'selection': dSelect, 'size': os.path.getsize(ncName), 'atime': time.time()}
+
+            self.evict(dCatalogue)
+            self.writeCatalogue(dCatalogue)
+
+    def evict(self, dCatalogue: dict):
+        """
+        removes the least recently used entries until the total size is within the maximum size
+        """
+        totalSize = sum([dEntry['size'] for dEntry in dCatalogue['entries'].values()])
+
+        for key in sorted(dCatalogue['entries'], key=lambda k: dCatalogue['entries'][k]['atime']):
+            if totalSize <= self.maxSize:
+                break
+            totalSize -= dCatalogue['entries'][key]['size']
+            del dCatalogue['entries'][key]
+            try:
+                os.remove(self.entryName(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        removes all entries from the cache
+        """
+        with CATALOGUELOCK:
+            dCatalogue = self.readCatalogue()
+            for key in dCatalogue['entries']:
+                try:
+                    os.remove(self.entryName(key))
+                except OSError:
+                    pass
+
+            self.writeCatalogue({'entries': {}, 'files': {}})
@@ -0,0 +1,414 @@
+"""
+streaming decoder for Compact RINEX (Hatanaka) observation files
+
+Port of the algorithm of rnxcmp/source/crx2rnx.c (CRINEX 1.0 for RINEX 2.x and
+CRINEX 3.0 for RINEX 3.x). The RINEX lines are recovered one epoch at a time
+while reading the (gzip compressed) compact file, so that the observation reader
+can consume a .crx / .crx.gz file without expanding it to disk first.
+"""
+
+import gzip
+from datetime import datetime
+from typing import Iterator, List
+
+import numpy as np
+
+__author__ = 'amuls'
+
+# label of the first line of a Compact RINEX file
+CRXLABEL = 'CRINEX VERS   / TYPE'
+# maximum order of the differences used by RNX2CRX
+MAXDIFFORDER = 5
+
+# layout of the epoch lines: first character (compact / RINEX), position of event flag, number of satellites, satellite list, decimals of clock offset
+dEpochLayout = {
+    2: {'topFrom': '&', 'topTo': ' ', 'event': 28, 'nrSVs': 29, 'svList': 32, 'clkDecimals': 9, 'offset': 3},
+    3: {'topFrom': '>', 'topTo': '>', 'event': 31, 'nrSVs': 32, 'svList': 41, 'clkDecimals': 12, 'offset': 6},
+}
+
+
+def openText(fn: str):
+    """
+    opens a plain or gzip compressed file for reading text lines
+    """
+    if fn.endswith('.gz'):
+        return gzip.open(fn, 'rt', encoding='ascii', errors='ignore')
+
+    return open(fn, 'r', encoding='ascii', errors='ignore')
+
+
+def isCompact(fn: str) -> bool:
+    """
+    checks whether the (gzip compressed) file is a Compact RINEX file
+    """
+    if fn.endswith(('.Z', '.bz2', '.zip', '.nc')):
+        return False
+
+    try:
+        with openText(fn) as f:
+            return f.readline(81)[60:80].strip() == CRXLABEL.strip()
+    except (OSError, EOFError):
+        return False
+
+
+def repair(old: str, diff: str) -> str:
+    """
+    applies the text differences of a compact line to the previous line: a blank keeps the old character, '&' becomes a blank
+    """
+    if not diff:
+        return old
+
+    n = min(len(old), len(diff))
+    chars = list(old)
+    for i in range(n):
+        if diff[i] != ' ':
+            chars[i] = ' ' if diff[i] == '&' else diff[i]
+
+    return ''.join(chars) + diff[n:].replace('&', ' ')
+
+
+def obsField(value: int) -> str:
+    """
+    formats an observation in thousandths as F14.3 the way CRX2RNX does (no leading zero for values below 1)
+    """
+    if -1000 < value < 1000:
+        return ('-.%03d' % -value if value < 0 else '.%03d' % value).rjust(14)
+
+    digits = '%d' % value
+    return (digits[:-3] + '.' + digits[-3:]).rjust(14)
+
+
+def clockField(value: int, decimals: int) -> str:
+    """
+    formats a receiver clock offset given in units of 10^-decimals s as F(3+decimals).decimals the way CRX2RNX does
+    """
+    intPart, fracPart = divmod(abs(value), 10**decimals)
+
+    return '{sign:s}{int:s}.{frac:0{width:d}d}'.format(sign='-' if value < 0 else '', int=str(intPart) if intPart else '', frac=fracPart, width=decimals).rjust(3 + decimals)
+
+
+def recoverValue(diff: int, order: int, arcOrder: int, previous: List[int]) -> List[int]:
+    """
+    recovers the value from its difference of order arcOrder using the differences of the previous epoch
+
+    returns: the differences of order 0 .. order where the last one holds the value
+    """
+    y = [diff]
+    if order < arcOrder:
+        for k in range(order + 1):
+            y.append(y[k] + previous[k])
+    else:
+        for k in range(order):
+            y.append(y[k] + previous[k + 1])
+
+    return y
+
+
+class CrxReader(object):
+    """
+    file-like object returning the RINEX lines recovered from a (gzip compressed) Compact RINEX file
+    """
+
+    def __init__(self, fn: str, epochsOnly: bool = False):
+        """
+        params fn: Compact RINEX file (.crx, .crx.gz, .yyd, .yyd.gz)
+        params epochsOnly: only return the header and the epoch lines (without clock offset), the observations are skipped
+        """
+        self.fn = fn
+        self.f = openText(fn)
+
+        # CRINEX version line and program line
+        ln = self.f.readline()
+        if ln[60:80].strip() != CRXLABEL.strip() or ln[:3] not in ('1.0', '3.0'):
+            self.f.close()
+            raise ValueError('{:s} is not a Compact RINEX 1.0 / 3.0 file'.format(fn))
+        self.crinexVersion = int(ln[0])
+        self.f.readline()
+
+        self.rinexVersion = None
+        # number of observation types (RINEX 2) and per GNSS (RINEX 3)
+        self.nrTypes = 0
+        self.dNrTypes = {}
+
+        self.lines = self.decode(epochsOnly=epochsOnly)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self.lines)
+
+    def readline(self) -> str:
+        return next(self.lines, '')
+
+    def close(self):
+        self.f.close()
+
+    def nextLine(self) -> str:
+        """
+        returns the next compact line without line ending, raises ValueError on a truncated file
+        """
+        ln = self.f.readline()
+        if not ln:
+            raise ValueError('{:s} seems to be truncated'.format(self.fn))
+
+        return ln.rstrip('\r\n')
+
+    def countTypes(self, ln: str):
+        """
+        keeps the number of observation types defined by a header line
+        """
+        if ln[60:79] == '# / TYPES OF OBSERV' and ln[5] != ' ':
+            self.nrTypes = int(ln[:6])
+        elif ln[60:79] == 'SYS / # / OBS TYPES' and ln[0] != ' ':
+            self.dNrTypes[ln[0]] = int(ln[3:6])
+
+    def header(self) -> Iterator[str]:
+        """
+        returns the RINEX header lines, which are stored without compression
+        """
+        ln = self.nextLine().rstrip(' ')
+        if ln[60:80] != 'RINEX VERSION / TYPE' or ln[5] not in '23':
+            raise ValueError('{:s} does not hold a RINEX 2.x / 3.x file'.format(self.fn))
+        self.rinexVersion = int(ln[5])
+        yield ln + '\n'
+
+        while ln[60:73] != 'END OF HEADER':
+            ln = self.nextLine().rstrip(' ')
+            self.countTypes(ln)
+            yield ln + '\n'
+
+    def decode(self, epochsOnly: bool = False) -> Iterator[str]:
+        """
+        generator recovering the RINEX lines epoch by epoch
+        """
+        yield from self.header()
+
+        dLayout = dEpochLayout[self.rinexVersion]
+        topFrom = dLayout['topFrom']
+        topTo = dLayout['topTo']
+        iEvent = dLayout['event']
+        iSVs = dLayout['nrSVs']
+        iSVList = dLayout['svList']
+        offset = dLayout['offset']
+
+        epochLine = ''
+        # per satellite of the previous epoch the state of its observables and its flags
+        dPrevious = {}
+        dPrevFlags = {}
+        # state of the receiver clock offset
+        clkOrder = clkArcOrder = 0
+        clk = [0] * (MAXDIFFORDER + 1)
+
+        for ln in self.f:
+            ln = ln.rstrip('\r\n')
+
+            # skip the escape lines of CRINEX 3
+            if self.crinexVersion == 3 and ln[:1] == '&':
+                continue
+            if ln[:1] == '\x1a':  # DOS EOF
+                return
+
+            if ln[:1] == topFrom:
+                ln = topTo + ln[1:]
+                # event records are copied, the epoch following them is initialised
+                if ln[iEvent:iEvent + 1] not in ('0', '1'):
+                    for evLine in self.events(ln, dLayout):
+                        yield evLine
+                    ln = self.lastEvent
+                    ln = topTo + ln[1:]
+                # initialise the epoch and all satellite arcs
+                epochLine = ''
+                dPrevious = {}
+
+            epochLine = repair(epochLine, ln).rstrip(' ')
+            if epochLine[:1] != topTo or len(epochLine) < 26 + offset or epochLine[offset + 23:offset + 25] != '  ' or not epochLine[offset + 25:offset + 26].isdigit():
+                raise ValueError('{:s}: invalid epoch line {:s}'.format(self.fn, epochLine))
+
+            nrSVs = int(epochLine[iSVs:iSVs + 3])
+            svList = epochLine[iSVList:iSVList + 3 * nrSVs]
+            svs = [svList[i:i + 3] for i in range(0, 3 * nrSVs, 3)]
+
+            # receiver clock offset
+            clkLine = self.nextLine()
+
+            if epochsOnly:
+                for _ in range(nrSVs):
+                    self.nextLine()
+                yield self.epochText(epochLine, None, dLayout)
+                continue
+
+            if not clkLine:
+                clkOrder = -1
+            else:
+                if clkLine[1:2] == '&':
+                    clkArcOrder = int(clkLine[0])
+                    clkOrder = -1
+                    clkLine = clkLine[2:]
+                clk = recoverValue(int(clkLine), clkOrder, clkArcOrder, clk)
+                clkOrder = clkOrder + 1 if clkOrder < clkArcOrder else clkOrder
+
+            lines = [self.epochText(epochLine, clk[clkOrder] if clkLine else None, dLayout)]
+
+            dCurrent = {}
+            dFlags = {}
+            for sv in svs:
+                nrTypes = self.nrTypes if self.rinexVersion == 2 else self.dNrTypes[sv[0]]
+                dataLine = self.nextLine()
+
+                # separate the differenced fields, the remainder of the line holds the flag differences
+                fields = dataLine.split(' ', nrTypes)
+                diffFlags = fields[nrTypes] if len(fields) > nrTypes else ''
+                fields += [''] * (nrTypes - len(fields))
+
+                # recover the flags (LLI & SSI of each observable)
+                if sv in dPrevious:
+                    flags = repair(dPrevFlags[sv], diffFlags)
+                else:
+                    flags = repair('' if self.rinexVersion == 3 else diffFlags.ljust(2 * nrTypes), diffFlags)
+                flags = flags.ljust(2 * nrTypes)
+
+                previous = dPrevious.get(sv)
+                state = []
+                text = sv if self.rinexVersion == 3 else ''
+                for j in range(nrTypes):
+                    txt = fields[j]
+                    if not txt:
+                        state.append(None)
+                        if self.crinexVersion == 1:
+                            flags = flags[:2 * j] + '  ' + flags[2 * j + 2:]
+                        text += '              ' + flags[2 * j:2 * j + 2]
+                    else:
+                        if txt[1:2] == '&':  # arc initialisation
+                            arcOrder, order, prev = int(txt[0]), -1, None
+                            txt = txt[2:]
+                        elif previous is None or previous[j] is None:
+                            raise ValueError('{:s}: data arc of {:s} at {:s} is not initialised'.format(self.fn, sv, epochLine[:iSVs]))
+                        else:
+                            arcOrder, order, prev = previous[j]
+
+                        y = recoverValue(int(txt), order, arcOrder, prev)
+                        order = order + 1 if order < arcOrder else order
+                        state.append((arcOrder, order, y))
+                        text += obsField(y[order]) + flags[2 * j:2 * j + 2]
+
+                    # RINEX 2 records hold 5 observables per line
+                    if self.rinexVersion == 2 and (j + 1) % 5 == 0 and j + 1 < nrTypes:
+                        lines.append(text.rstrip(' ') + '\n')
+                        text = ''
+
+                lines.append(text.rstrip(' ') + '\n')
+
+                dCurrent[sv] = state
+                dFlags[sv] = flags
+
+            dPrevious = dCurrent
+            dPrevFlags = dFlags
+
+            for outLine in lines:
+                yield outLine
+
+    def epochText(self, epochLine: str, clock: int, dLayout: dict) -> str:
+        """
+        returns the RINEX epoch line(s) with the receiver clock offset when available
+        """
+        if self.rinexVersion == 3:
+            if clock is None:
+                return epochLine[:41].rstrip(' ') + '\n'
+            return epochLine[:41] + clockField(clock, dLayout['clkDecimals']) + '\n'
+
+        if clock is None:
+            text = epochLine[:68] + '\n'
+        else:
+            text = epochLine[:68].ljust(68) + clockField(clock, dLayout['clkDecimals']) + '\n'
+        # continuation lines for more than 12 satellites
+        for i in range(68, len(epochLine), 36):
+            text += ' ' * 32 + epochLine[i:i + 36] + '\n'
+
+        return text
+
+    def events(self, ln: str, dLayout: dict) -> Iterator[str]:
+        """
+        copies the event records (flags 2 .. 6) until the next observation epoch, which is kept in self.lastEvent
+        """
+        iEvent = dLayout['event']
+
+        while ln[iEvent:iEvent + 1] not in ('0', '1'):
+            ln = dLayout['topTo'] + ln[1:].rstrip(' ')
+            yield ln + '\n'
+            if len(ln) > 29:
+                for _ in range(int(ln[iEvent + 1:iEvent + 4])):
+                    evLine = self.nextLine().rstrip(' ')
+                    self.countTypes(evLine)
+                    yield evLine + '\n'
+
+            ln = self.nextLine()
+            while self.crinexVersion == 3 and ln[:1] == '&':
+                ln = self.nextLine()
+            if ln[:1] != dLayout['topFrom'] or len(ln) < 29 or not ln[iEvent:iEvent + 1].isdigit():
+                raise ValueError('{:s}: the epoch following an event should be initialised {:s}'.format(self.fn, ln))
+
+        self.lastEvent = ln
+
+
+def rinexHeader(fn: str) -> str:
+    """
+    returns the RINEX header of a Compact RINEX file
+    """
+    with CrxReader(fn) as f:
+        return ''.join(f.header())
+
+
+def epochTime(ln: str, rinexVersion: int) -> datetime:
+    """
+    converts a RINEX 2 or RINEX 3 epoch line to a datetime
+    """
+    if rinexVersion == 3:
+        year, fields = int(ln[2:6]), ln[7:29]
+    else:
+        year, fields = int(ln[1:3]), ln[4:26]
+        year += 2000 if year < 80 else 1900
+    seconds = float(fields[11:22])
+
+    return datetime(year, int(fields[0:2]), int(fields[3:5]), int(fields[6:8]), int(fields[9:11]), int(seconds), int(round(seconds % 1 * 1000000)) % 1000000)
+
+
+def epochIndex(fn: str) -> dict:
+    """
+    returns the times and number of satellites of the observation epochs and the header interval of a Compact RINEX file
+
+    The dict has the 'time' and 'interval' entries used by rinex_index.epochTiming.
+    """
+    dIndex = {'interval': np.nan}
+    times = []
+    nrSVs = []
+
+    with CrxReader(fn, epochsOnly=True) as f:
+        for ln in f:
+            if ln[60:68] == 'INTERVAL':
+                dIndex['interval'] = float(ln[:10])
+            elif ln[60:73] == 'END OF HEADER':
+                break
+
+        dLayout = dEpochLayout[f.rinexVersion]
+        iEvent = dLayout['event']
+        iSVs = dLayout['nrSVs']
+        for ln in f:
+            # skip the event records and their lines
+            if ln[:1] == dLayout['topTo'] and ln[iEvent:iEvent + 1] in ('0', '1'):
+                try:
+                    times.append(epochTime(ln, f.rinexVersion))
+                    nrSVs.append(int(ln[iSVs:iSVs + 3]))
+                except ValueError:
+                    continue
+
+    dIndex['time'] = np.array(times, dtype='datetime64[ns]')
+    dIndex['nrSVs'] = np.array(nrSVs, dtype=np.int32)
+
+    return dIndex
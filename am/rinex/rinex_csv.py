@@ -0,0 +1,142 @@
+"""
+export of RINEX observations to CSV files per GNSS system and signal
+
+Each signal is taken from the observations once as a (time, sv) array, its
+columns are split over the GNSS systems by a mask on the satellite prefix and
+a CSV file is written per GNSS system. The signals are exported in parallel
+processes.
+
+The CSV text is the one written by pandas.DataFrame.to_csv, but the epochs are
+formatted once for all files and only the observed values are formatted.
+
+The values are read signal by signal, so observations opened lazily from a
+NetCDF file are exported without loading them all.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray
+
+from rinex import rinex_netcdf, rinex_progress
+
+__author__ = 'amuls'
+
+
+def csvName(csvDir: str, obsName: str, *parts: str) -> str:
+    """
+    returns the name of the CSV file for the observation file and the parts (GNSS system, signal, ...) joined by '-'
+
+    dots and underscores are not kept in the file name
+    """
+    baseName = '-'.join((obsName,) + parts).replace('.', '-').replace('_', '')
+
+    return os.path.join(csvDir, '{:s}.csv'.format(baseName))
+
+
+def signalValues(obsData: xarray.Dataset, signal: str, dims: Tuple[str, str] = ('time', 'sv')) -> np.ndarray:
+    """
+    returns the values of the signal as array over dims, read holding the HDF5 lock when opened lazily from a NetCDF file
+    """
+    with rinex_netcdf.HDF5LOCK:
+        return obsData[signal].transpose(*dims).values
+
+
+def systemMasks(svs: Sequence[str]) -> dict:
+    """
+    returns per GNSS system the mask selecting its satellites
+    """
+    prefixes = np.array([sv[0] for sv in svs])
+
+    return {gnss: prefixes == gnss for gnss in sorted(set(prefixes))}
+
+
+def timeColumn(times: np.ndarray) -> np.ndarray:
+    """
+    returns the epochs formatted as in the time index of a CSV file written by pandas
+    """
+    return np.array(pd.DataFrame(index=pd.Index(times, name='time')).to_csv().splitlines()[1:], dtype=object)
+
+
+def csvText(timeCol: np.ndarray, columns: Sequence[str], values: np.ndarray) -> str:
+    """
+    returns the CSV text of the (time, column) values, missing values are left empty
+    """
+    text = np.full(values.shape, '', dtype=object)
+    observed = ~np.isnan(values)
+    text[observed] = values[observed].astype(str)
+
+    lines = [','.join(['time'] + list(columns))] + [','.join(row) for row in np.column_stack([timeCol, text]).tolist()]
+
+    return os.linesep.join(lines) + os.linesep
+
+
+def writeSignal(timeCol: np.ndarray, svs: np.ndarray, values: np.ndarray, signal: str, csvDir: str, obsName: str) -> List[str]:
+    """
+    writes for each GNSS system the CSV file holding the signal of all its satellites
+
+    params timeCol: the formatted epochs
+    params values: (time, sv) array of the signal
+    returns the names of the CSV files created
+    """
+    csvNames = []
+    for gnss, mask in systemMasks(svs).items():
+        csvNames.append(csvName(csvDir, obsName, gnss, signal))
+        with open(csvNames[-1], 'w', newline='') as fCSV:
+            fCSV.write(csvText(timeCol, svs[mask], values[:, mask]))
+
+    return csvNames
+
+
+def exportSignals(obsData: xarray.Dataset, csvDir: str, obsName: str, signals: Sequence[str] = None, workers: int = 1, progress: rinex_progress.Progress = None) -> List[str]:
+    """
+    creates per GNSS system and per signal a CSV file for all observed satellites, sorted by name
+
+    params signals: the signals to export, None for all
+    params workers: number of processes writing the CSV files
+    params progress: reports the bytes of each signal exported, the export stops with Cancelled between signals when cancelled
+    returns the names of the CSV files created
+    """
+    order = np.argsort(obsData.sv.values)
+    svs = obsData.sv.values[order].astype(str)
+    timeCol = timeColumn(obsData.time.values)
+    signals = list(obsData.data_vars) if signals is None else signals
+
+    if progress is not None:
+        progress.start(totalBytes=int(sum([obsData[signal].nbytes for signal in signals])))
+
+    csvNames = []
+    if workers <= 1 or len(signals) <= 1:
+        for signal in signals:
+            if progress is not None:
+                progress.check()
+            csvNames += writeSignal(timeCol, svs, signalValues(obsData, signal)[:, order], signal, csvDir, obsName)
+            if progress is not None:
+                progress.update(nbytes=obsData[signal].nbytes)
+
+        return csvNames
+
+    # spawned processes, forking while other threads hold locks (e.g. the HDF5 lock) can deadlock the child
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = []
+        try:
+            for signal in signals:
+                if progress is not None:
+                    progress.check()
+                futures.append(executor.submit(writeSignal, timeCol, svs, signalValues(obsData, signal)[:, order], signal, csvDir, obsName))
+
+            for signal, future in zip(signals, futures):
+                csvNames += future.result()
+                if progress is not None:
+                    progress.update(nbytes=obsData[signal].nbytes)
+        except rinex_progress.Cancelled:
+            # the signals not started are dropped
+            for future in futures:
+                future.cancel()
+            raise
+
+    return csvNames
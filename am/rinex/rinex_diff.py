@@ -0,0 +1,265 @@
+"""
+difference between two signals of all PRNs with its moving average and statistics
+
+The observations of both signals are held as (time, prn) arrays: the
+difference, its moving average over a number of epochs and the statistics of
+the moving average are computed for all PRNs at once, without adding a
+column per PRN to a dataframe. The moving average at an epoch is the mean of
+the difference over the window of epochs ending at this epoch, NaN unless all
+epochs of the window have a difference (the rolling mean of pandas).
+
+Both signals are read from the CSV files per signal created by rnxplot, or
+directly from a NetCDF file or Zarr store holding the (time, sv) observations
+of both: only the two signals of the satellites of the GNSS system are read,
+already aligned on the epochs of the file. The CSV files are aligned on an
+integer grid of epochs, filled directly into the (2, time, prn) array.
+
+For periods longer than fit in memory (e.g. a Zarr store of several weeks),
+StreamingDiff takes the observations chunk by chunk of epochs: only the
+differences in the window of the moving average are carried over to the next
+chunk, the statistics are accumulated per PRN.
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray
+
+from rinex import rinex_netcdf
+from rinex import rinex_zarr
+
+__author__ = 'amuls'
+
+
+class SignalDiff(object):
+    """
+    the observations of two signals, their difference and its moving average, as (time, prn) arrays
+    """
+
+    def __init__(self, times: np.ndarray, prns: Sequence[str], signals: Sequence[str], obs: np.ndarray, movAvg: int):
+        """
+        params times: the epochs (datetime64) of the rows
+        params prns: the PRNs of the columns
+        params signals: the names of both signals
+        params obs: (2, time, prn) array of the observations of both signals, NaN when not observed
+        params movAvg: number of epochs of the moving average
+        """
+        self.times = np.asarray(times)
+        self.prns = list(prns)
+        self.signals = list(signals)
+        self.obs = np.asarray(obs, dtype=float)
+        self.movAvg = movAvg
+
+        self.diff = self.obs[0] - self.obs[1]
+        self.diffMA = movingAverage(self.diff, movAvg)
+        self.stats = statistics(self.diffMA, self.prns)
+
+    def column(self, prn: str) -> int:
+        """
+        returns the column of the PRN in the arrays
+        """
+        return self.prns.index(prn)
+
+    def select(self, prns: Sequence[str]) -> 'SignalDiff':
+        """
+        returns the signal difference reduced to the PRNs, without computing it again
+        """
+        columns = [self.column(prn) for prn in prns]
+
+        sigDiff = SignalDiff.__new__(SignalDiff)
+        sigDiff.times, sigDiff.prns, sigDiff.signals, sigDiff.movAvg = self.times, list(prns), self.signals, self.movAvg
+        sigDiff.obs, sigDiff.diff, sigDiff.diffMA = self.obs[:, :, columns], self.diff[:, columns], self.diffMA[:, columns]
+        sigDiff.stats = {prn: self.stats[prn] for prn in prns}
+
+        return sigDiff
+
+    def toDataFrame(self) -> pd.DataFrame:
+        """
+        returns the arrays as a dataframe with the columns time, PRN-signal of both signals, PRN (difference) and PRN-MA
+        """
+        columns = ['{prn:s}-{st:s}'.format(prn=prn, st=signal) for signal in self.signals for prn in self.prns] + self.prns + ['{prn:s}-MA'.format(prn=prn) for prn in self.prns]
+        dfDiff = pd.DataFrame(np.hstack([self.obs[0], self.obs[1], self.diff, self.diffMA]), columns=columns)
+        dfDiff.insert(0, 'time', self.times)
+
+        return dfDiff
+
+
+def openObservations(obsName: str) -> xarray.Dataset:
+    """
+    opens lazily the observations of a NetCDF file or a Zarr store
+    """
+    if rinex_zarr.isStore(obsName):
+        return rinex_zarr.openStore(obsName)
+
+    return rinex_netcdf.openObs(obsName, lazy=True)
+
+
+def systemSignals(obsData: xarray.Dataset, gnss: str, signals: Sequence[str]) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    returns the epochs, the PRNs of the GNSS system sorted by name and the (2, time, prn) array of both signals
+
+    params gnss: the GNSS system identifier (e.g. 'E')
+    Only the signals of the PRNs of the system are read from disk.
+    """
+    prns = sorted([str(sv) for sv in obsData.sv.values if str(sv).startswith(gnss)])
+    selection = obsData[list(signals)].sel(sv=prns).load()
+
+    return selection.time.values, prns, np.stack([selection[signal].transpose('time', 'sv').values for signal in signals])
+
+
+def systemChunks(obsData: xarray.Dataset, gnss: str, signals: Sequence[str], chunk: int) -> Iterator[Tuple[np.ndarray, List[str], np.ndarray]]:
+    """
+    yields per chunk of epochs the epochs, the PRNs of the GNSS system and the (2, time, prn) array of both signals
+
+    params chunk: number of epochs read at once
+    """
+    for start in range(0, obsData.sizes['time'], chunk):
+        yield systemSignals(obsData.isel(time=slice(start, start + chunk)), gnss=gnss, signals=signals)
+
+
+def samplingInterval(times: np.ndarray) -> int:
+    """
+    returns the median interval in nanoseconds between the sorted epochs (datetime64), 0 for less than 2 epochs
+    """
+    if len(times) < 2:
+        return 0
+
+    return int(np.median(np.diff(times.astype('datetime64[ns]').astype(np.int64))))
+
+
+def alignEpochs(times: Sequence[np.ndarray], values: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    maps the (time, prn) values of the inputs onto a shared grid of epochs
+
+    The grid has the interval of the most coarsely sampled input and is anchored on its first epoch, an epoch
+    has index (t - t0) / interval. The epochs of an input go to the nearest epoch of the grid when within half
+    their own interval of it: a more finely sampled input is decimated to the epochs of the grid, small offsets
+    are matched to the nearest epoch.
+
+    params times: the sorted epochs (datetime64) of each input
+    params values: the (time, prn) array of each input with the same PRNs
+    returns the epochs of the grid and the (input, time, prn) array, NaN for epochs without value
+    """
+    epochs = [np.asarray(t).astype('datetime64[ns]').astype(np.int64) for t in times]
+    intervals = [samplingInterval(t) for t in times]
+    coarsest = int(np.argmax(intervals))
+    interval = intervals[coarsest] or 1000000000
+
+    # the grid covers the epochs of all inputs
+    start = min([t[0] for t in epochs if t.size], default=0)
+    end = max([t[-1] for t in epochs if t.size], default=0)
+    t0 = epochs[coarsest][0] + ((start - epochs[coarsest][0]) // interval) * interval if epochs[coarsest].size else start
+    nrEpochs = int((end - t0) // interval) + 1
+
+    aligned = np.full((len(values), nrEpochs, values[0].shape[1]), np.nan)
+    for i, (epoch, value) in enumerate(zip(epochs, values)):
+        index = (epoch - t0 + interval // 2) // interval
+        matched = np.abs(epoch - t0 - index * interval) <= max(intervals[i], 1) // 2
+        if matched.all() and index.size and index[-1] - index[0] + 1 == index.size and np.all(np.diff(index) == 1):
+            # the epochs of the input are a run of consecutive epochs of the grid
+            aligned[i, index[0]:index[-1] + 1] = value
+        else:
+            aligned[i, index[matched]] = value[matched]
+
+    return (t0 + np.arange(nrEpochs, dtype=np.int64) * interval).astype('datetime64[ns]'), aligned
+
+
+def movingAverage(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    returns the moving average over window epochs of each column of the (time, prn) array, NaN unless the window is complete
+    """
+    if window <= 0 or window > values.shape[0]:
+        return np.full(values.shape, np.nan)
+
+    # a single rolling pass over all columns
+    return pd.DataFrame(values, copy=False).rolling(window=window).mean().values
+
+
+def statistics(values: np.ndarray, prns: Sequence[str]) -> dict:
+    """
+    returns per PRN the count, mean, max and min of its column of the (time, prn) array
+    """
+    running = RunningStats(len(prns))
+    running.update(values)
+
+    return running.stats(prns)
+
+
+class RunningStats(object):
+    """
+    the count, sum, max and min per column of (time, prn) arrays given one after the other
+    """
+
+    def __init__(self, nrPRNs: int):
+        self.counts = np.zeros(nrPRNs, dtype=np.int64)
+        self.sums = np.zeros(nrPRNs)
+        self.maxs = np.full(nrPRNs, np.nan)
+        self.mins = np.full(nrPRNs, np.nan)
+
+    def update(self, values: np.ndarray):
+        """
+        adds the values of the (time, prn) array, NaN values are not counted
+        """
+        valid = ~np.isnan(values)
+        self.counts += np.count_nonzero(valid, axis=0)
+        self.sums += np.where(valid, values, 0).sum(axis=0)
+        # fmax and fmin ignore NaN, a column without values stays NaN
+        self.maxs = np.fmax(self.maxs, np.fmax.reduce(values, axis=0, initial=np.nan) if values.shape[0] else np.nan)
+        self.mins = np.fmin(self.mins, np.fmin.reduce(values, axis=0, initial=np.nan) if values.shape[0] else np.nan)
+
+    def stats(self, prns: Sequence[str]) -> dict:
+        """
+        returns per PRN the count, mean, max and min of the values added
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.counts
+
+        return {prn: {'count': int(self.counts[i]), 'mean': means[i], 'max': self.maxs[i], 'min': self.mins[i]} for i, prn in enumerate(prns)}
+
+
+class StreamingDiff(object):
+    """
+    the difference of two signals with its moving average and statistics, computed on time ordered chunks of epochs
+
+    Only the differences of the last window - 1 epochs are kept between chunks, so a period of any length is
+    compared in the memory of a chunk. The moving average and the statistics equal those of SignalDiff on the
+    whole period up to the rounding of the sums.
+    """
+
+    def __init__(self, prns: Sequence[str], signals: Sequence[str], movAvg: int):
+        """
+        params movAvg: number of epochs of the moving average
+        """
+        self.prns = list(prns)
+        self.signals = list(signals)
+        self.movAvg = movAvg
+        self.nrEpochs = 0
+
+        # the differences of the epochs before the chunk in the window of its first epoch
+        self.history = np.empty((0, len(self.prns)))
+        self.running = RunningStats(len(self.prns))
+
+    def update(self, obs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        adds the chunk of the (2, time, prn) observations of both signals
+
+        returns the difference and its moving average for the epochs of the chunk
+        """
+        diff = np.asarray(obs, dtype=float)[0] - np.asarray(obs, dtype=float)[1]
+
+        window = np.vstack([self.history, diff])
+        diffMA = movingAverage(window, self.movAvg)[self.history.shape[0]:]
+        self.history = window[max(window.shape[0] - self.movAvg + 1, 0):]
+
+        self.running.update(diffMA)
+        self.nrEpochs += diff.shape[0]
+
+        return diff, diffMA
+
+    @property
+    def stats(self) -> dict:
+        """
+        returns per PRN the count, mean, max and min of the moving average of the chunks added
+        """
+        return self.running.stats(self.prns)
@@ -0,0 +1,178 @@
+"""
+epoch index for RINEX v3 observation files
+
+The index holds for each epoch its time, the byte offset of its epoch line, its
+epoch flag and the number of satellite records. It is built once by scanning the
+file for the epoch lines and is stored in a sidecar file next to the RINEX file
+so that reading a time window can seek directly to the first wanted epoch.
+"""
+
+import mmap
+import os
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+__author__ = 'amuls'
+
+# suffix appended to the RINEX file name for the sidecar index file
+IDXSUFFIX = '.idx.npz'
+# number of characters of the epoch line holding time, flag and number of satellites
+EPOCHWIDTH = 35
+
+
+def indexName(fn: str) -> str:
+    """
+    returns the name of the sidecar index file for RINEX file fn
+    """
+    return fn + IDXSUFFIX
+
+
+def isIndexable(fn: str) -> bool:
+    """
+    only uncompressed RINEX v3 files allow seeking to an epoch
+    """
+    if fn.endswith(('.gz', '.Z', '.bz2', '.zip', '.crx')):
+        return False
+
+    with open(fn, 'rb') as f:
+        line = f.readline(81)
+
+    try:
+        return float(line[:9]) >= 3 and line[20:21] == b'O'
+    except ValueError:
+        return False
+
+
+def parseEpochLines(lines: list) -> dict:
+    """
+    converts the epoch lines to arrays of times, flags and number of satellites
+    """
+    chars = np.frombuffer(b''.join([ln[:EPOCHWIDTH].ljust(EPOCHWIDTH) for ln in lines]), dtype='S1').reshape(len(lines), EPOCHWIDTH)
+
+    def column(start: int, stop: int, dtype):
+        return np.ascontiguousarray(chars[:, start:stop]).view('S{:d}'.format(stop - start)).ravel().astype(dtype)
+
+    years = column(2, 6, np.int64)
+    months = column(7, 9, np.int64)
+    days = column(10, 12, np.int64)
+
+    dates = (years - 1970).astype('datetime64[Y]') + (months - 1).astype('timedelta64[M]')
+    dates = dates.astype('datetime64[D]') + (days - 1).astype('timedelta64[D]')
+    nsOfDay = (column(13, 15, np.int64) * 3600 + column(16, 18, np.int64) * 60) * 1000000000 + np.round(column(18, 29, np.float64) * 1e9).astype(np.int64)
+
+    dEpochs = {}
+    dEpochs['time'] = dates.astype('datetime64[ns]') + nsOfDay.astype('timedelta64[ns]')
+    dEpochs['flag'] = np.where(chars[:, 31] == b' ', b'0', chars[:, 31]).view(np.uint8) - ord('0')
+    dEpochs['nrSVs'] = column(32, 35, np.int32)
+
+    return dEpochs
+
+
+def buildEpochIndex(fn: str) -> dict:
+    """
+    scans the RINEX v3 observation file for its epoch lines
+
+    returns: dict with per epoch 'time', 'offset', 'flag', 'nrSVs' and the file 'size', 'mtime' and header 'interval'
+    """
+    stat = os.stat(fn)
+
+    dIndex = {'size': stat.st_size, 'mtime': stat.st_mtime, 'interval': np.nan}
+
+    offsets = []
+    lines = []
+    with open(fn, 'rb') as f:
+        # the header interval is used for reporting the timing of the file
+        for ln in f:
+            if ln[60:73] == b'END OF HEADER':
+                break
+            if ln[60:68] == b'INTERVAL':
+                dIndex['interval'] = float(ln[:10])
+
+        if stat.st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # epoch lines are the only lines starting with '> ', search from the newline ending the header
+                pos = mm.find(b'\n> ', f.tell() - 1)
+                while pos >= 0:
+                    pos += 1
+                    eol = mm.find(b'\n', pos)
+                    offsets.append(pos)
+                    lines.append(mm[pos:eol if eol >= 0 else len(mm)])
+                    pos = mm.find(b'\n> ', pos)
+
+    dIndex['offset'] = np.array(offsets, dtype=np.int64)
+    if lines:
+        dIndex.update(parseEpochLines(lines))
+    else:
+        dIndex.update({'time': np.array([], dtype='datetime64[ns]'), 'flag': np.array([], dtype=np.uint8), 'nrSVs': np.array([], dtype=np.int32)})
+
+    # only keep the observation epochs, not the event records
+    keep = dIndex['flag'] <= 1
+    for key in ['time', 'offset', 'flag', 'nrSVs']:
+        dIndex[key] = dIndex[key][keep]
+
+    return dIndex
+
+
+def loadEpochIndex(fn: str, rebuild: bool = False) -> dict:
+    """
+    returns the epoch index of RINEX file fn, reusing the sidecar index file when it is still valid
+
+    params fn: RINEX v3 observation file
+    params rebuild: rebuild the index even when a valid sidecar file exists
+    """
+    stat = os.stat(fn)
+    idxName = indexName(fn)
+
+    if not rebuild and os.path.isfile(idxName):
+        try:
+            with np.load(idxName) as npz:
+                dIndex = {key: npz[key] for key in npz.files}
+            if int(dIndex['size']) == stat.st_size and float(dIndex['mtime']) == stat.st_mtime:
+                dIndex['size'] = int(dIndex['size'])
+                dIndex['mtime'] = float(dIndex['mtime'])
+                dIndex['interval'] = float(dIndex['interval'])
+                return dIndex
+        except (OSError, KeyError, ValueError):
+            pass
+
+    dIndex = buildEpochIndex(fn)
+
+    # store the index, a read-only directory just means we rebuild next time
+    try:
+        with open(idxName, 'wb') as f:
+            np.savez(f, **dIndex)
+    except OSError:
+        pass
+
+    return dIndex
+
+
+def epochRange(dIndex: dict, tlim: Sequence) -> Tuple[int, int]:
+    """
+    returns the range [start, stop) of epochs in the index that lie between the time limits
+    """
+    tStart = np.datetime64(pd.Timestamp(tlim[0]).to_datetime64(), 'ns')
+    tStop = np.datetime64(pd.Timestamp(tlim[1]).to_datetime64(), 'ns')
+
+    return int(np.searchsorted(dIndex['time'], tStart, side='left')), int(np.searchsorted(dIndex['time'], tStop, side='right'))
+
+
+def epochTiming(dIndex: dict) -> dict:
+    """
+    returns start and stop time, interval and number of epochs described by the index
+    """
+    dTiming = {}
+    dTiming['start'] = pd.Timestamp(dIndex['time'][0])
+    dTiming['stop'] = pd.Timestamp(dIndex['time'][-1])
+    dTiming['epochs'] = len(dIndex['time'])
+
+    if not np.isnan(dIndex['interval']):
+        dTiming['interval'] = dIndex['interval']
+    elif dTiming['epochs'] > 1:
+        dTiming['interval'] = float(np.median(np.diff(dIndex['time']) / np.timedelta64(1, 's')))
+    else:
+        dTiming['interval'] = np.nan
+
+    return dTiming
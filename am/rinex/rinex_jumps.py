@@ -0,0 +1,107 @@
+"""
+detection of the largest jumps in the observations of each satellite
+
+The jumps are the first differences between consecutive epochs, computed for
+all satellites at once on the (time, sv) array of a signal. Per satellite the
+k largest positive and k largest negative jumps are selected by partial
+sorting, ties are resolved in favour of the earliest epoch as pandas nlargest
+and nsmallest do.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+import xarray
+
+from rinex import rinex_csv, rinex_progress
+
+__author__ = 'amuls'
+
+# number of largest positive and negative jumps kept per satellite
+NRJUMPS = 3
+
+
+def firstDifferences(series: np.ndarray) -> np.ndarray:
+    """
+    returns the difference of each epoch with the previous one for the (sv, time) series, NaN for the first epoch
+    """
+    diffs = np.full(series.shape, np.nan)
+    diffs[:, 1:] = series[:, 1:] - series[:, :-1]
+
+    return diffs
+
+
+def topK(diffs: np.ndarray, k: int) -> np.ndarray:
+    """
+    returns the mask of the k largest values of each (sv, time) series, ties kept for the earliest epochs
+
+    As pandas nlargest, a series holding less than k values is completed by its first epochs without value.
+    """
+    nrEpochs = diffs.shape[1]
+    if k <= 0 or nrEpochs == 0:
+        return np.zeros(diffs.shape, dtype=bool)
+    if k >= nrEpochs:
+        return np.ones(diffs.shape, dtype=bool)
+
+    # partitioning the negated values for the k smallest is fastest
+    valid = ~np.isnan(diffs)
+    filled = np.where(valid, -diffs, np.inf)
+
+    # the k-th largest value of each series (negated), inf when a series has less than k values
+    kth = np.partition(filled, k - 1, axis=1)[:, k - 1:k]
+
+    above = filled < kth
+    ties = valid & (filled == kth)
+    selected = above | ties
+
+    # the rare series with more ties than needed keep the earliest ones
+    nrTies = k - above.sum(axis=1, keepdims=True)
+    over = np.nonzero(ties.sum(axis=1, keepdims=True) > nrTies)[0]
+    if over.size:
+        selected[over] = above[over] | (ties[over] & (np.cumsum(ties[over], axis=1) <= nrTies[over]))
+
+    # series with less than k values
+    nrMissing = k - valid.sum(axis=1, keepdims=True)
+    short = np.nonzero(nrMissing > 0)[0]
+    if short.size:
+        selected[short] |= ~valid[short] & (np.cumsum(~valid[short], axis=1) <= nrMissing[short])
+
+    return selected
+
+
+def extremeDiffs(obsData: xarray.Dataset, signal: str, k: int = NRJUMPS) -> pd.DataFrame:
+    """
+    returns the k largest positive and negative jumps of the signal per satellite
+
+    The rows of the positive jumps are followed by the rows of the negative jumps and sorted by time,
+    each row holds the jumps at that epoch with a column per satellite.
+    """
+    diffs = firstDifferences(np.ascontiguousarray(rinex_csv.signalValues(obsData, signal, dims=('sv', 'time'))))
+    times = obsData.time.values
+    svs = obsData.sv.values.astype(str)
+
+    dfJumps = []
+    for selected in [topK(diffs, k), topK(-diffs, k)]:
+        epochs = np.nonzero(selected.any(axis=0))[0]
+        dfJumps.append(pd.DataFrame(np.where(selected[:, epochs], diffs[:, epochs], np.nan).T, index=pd.Index(times[epochs], name='time'), columns=svs))
+
+    return pd.concat(dfJumps).sort_index(axis=0, kind='mergesort')
+
+
+def exportJumps(obsData: xarray.Dataset, csvDir: str, obsName: str, signals: Sequence[str] = None, k: int = NRJUMPS, progress: rinex_progress.Progress = None) -> List[str]:
+    """
+    creates per signal a CSV file holding the k largest positive and negative jumps of all satellites
+
+    params signals: the signals to examine, None for all
+    params progress: the export stops with Cancelled between signals when cancelled
+    returns the names of the CSV files created
+    """
+    csvNames = []
+    for signal in (list(obsData.data_vars) if signals is None else signals):
+        if progress is not None:
+            progress.check()
+        csvNames.append(rinex_csv.csvName(csvDir, obsName, signal, 'diff'))
+        extremeDiffs(obsData, signal, k=k).to_csv(csvNames[-1])
+
+    return csvNames
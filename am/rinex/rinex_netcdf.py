@@ -0,0 +1,206 @@
+"""
+NetCDF (HDF5) storage of RINEX observations
+
+The data variables are written with explicit (time, sv) chunk shapes chosen for
+the way the observations are read back: a time series of a single satellite or
+a short time window of all satellites. Decompressing a chunk is the main cost
+when reading, so a chunk should hold little more than what a read needs.
+
+Opened lazily only the coordinates are read, the values of the satellites,
+signals and time window selected for display are read on demand.
+
+With a Progress the file is written and read variable by variable, reporting
+the bytes after each variable and stopping between variables when cancelled
+(a partly written file is removed).
+
+netCDF4 / HDF5 is not thread-safe: every read and write of a NetCDF file, also
+the reads of lazily opened files, is done holding HDF5LOCK.
+"""
+
+import os
+import threading
+from typing import Sequence, Tuple
+
+import numpy as np
+import xarray
+
+from rinex import rinex_progress
+
+__author__ = 'amuls'
+
+# lock serialising all NetCDF (HDF5) I/O of the process
+HDF5LOCK = threading.RLock()
+
+# for NetCDF compression. too high slows down with little space savings.
+ENC = {'zlib': True, 'complevel': 1, 'fletcher32': True}
+
+# chunk layouts: seconds of observations and number of satellites in a chunk (None for the full dimension)
+dLayouts = {
+    'default': None,  # chunking chosen by the NetCDF library
+    'sv': (86400, 1),  # per satellite time series
+    'window': (600, None),  # short time windows of all satellites
+    'balanced': (1800, 8),  # both read patterns at moderate cost
+}
+
+# per kind of variable the dtype used for storing, observables by their first character
+dDtypes = {
+    'lossless': {'lli': 'int8', 'ssi': 'int8'},  # indicators are single digits
+    'compact': {'lli': 'int8', 'ssi': 'int8', 'S': 'float32', 'D': 'float32'},  # signal strength and Doppler lose digits beyond float32
+}
+# fill value for the indicators stored as integers
+INDFILL = -1
+
+
+def variableKind(name: str) -> str:
+    """
+    returns the kind of variable used for selecting its dtype: 'lli', 'ssi' or the type of observable (C, L, D, S)
+    """
+    if name.endswith(('lli', 'ssi')):
+        return name[-3:]
+
+    return name[0]
+
+
+def chunkShape(obsData: xarray.Dataset, layout: str) -> Tuple[int, int]:
+    """
+    returns the (time, sv) chunk shape of the layout for the observations, None for the default chunking
+    """
+    if dLayouts[layout] is None:
+        return None
+
+    seconds, nrSVs = dLayouts[layout]
+
+    # number of epochs spanned by the seconds of the layout, the observations may be decimated
+    if obsData.sizes['time'] > 1:
+        interval = float(np.median(np.diff(obsData.time.values) / np.timedelta64(1, 's')))
+    else:
+        interval = obsData.attrs.get('interval')
+    if interval is None or np.isnan(interval) or interval <= 0:
+        nrEpochs = obsData.sizes['time']
+    else:
+        nrEpochs = int(round(seconds / interval))
+
+    nrEpochs = max(1, min(nrEpochs, obsData.sizes['time']))
+    nrSVs = max(1, obsData.sizes['sv'] if nrSVs is None else min(nrSVs, obsData.sizes['sv']))
+
+    return nrEpochs, nrSVs
+
+
+def encoding(obsData: xarray.Dataset, layout: str = 'balanced', shuffle: bool = True, dtypes: str = 'lossless', complevel: int = 1) -> dict:
+    """
+    returns the NetCDF encoding of the data variables
+
+    params layout: chunk layout from dLayouts
+    params shuffle: apply the HDF5 shuffle filter, which groups the bytes of the values and improves compression
+    params dtypes: storage dtypes from dDtypes or None for keeping float64
+    params complevel: zlib compression level (0 for no compression)
+    """
+    chunks = chunkShape(obsData, layout)
+
+    dEnc = {}
+    for name in obsData.data_vars:
+        enc = dict(ENC)
+        enc['complevel'] = complevel
+        enc['zlib'] = complevel > 0
+        enc['shuffle'] = shuffle
+        if chunks is not None:
+            enc['chunksizes'] = chunks
+
+        dtype = dDtypes[dtypes].get(variableKind(name)) if dtypes is not None else None
+        if dtype is not None:
+            enc['dtype'] = dtype
+            if np.issubdtype(np.dtype(dtype), np.integer):
+                enc['_FillValue'] = INDFILL
+
+        dEnc[name] = enc
+
+    return dEnc
+
+
+def writeObs(NetCDFName: str, obsData: xarray.Dataset, layout: str = 'balanced', shuffle: bool = True, dtypes: str = 'lossless', complevel: int = 1, progress: rinex_progress.Progress = None):
+    """
+    writes the observations in the OBS group of a NetCDF file using the chunk layout and storage dtypes
+
+    params progress: the variables are written one by one, the writing stops with Cancelled when cancelled
+    """
+    if os.path.isfile(NetCDFName):
+        os.remove(NetCDFName)
+
+    dEnc = encoding(obsData, layout=layout, shuffle=shuffle, dtypes=dtypes, complevel=complevel)
+    if progress is None:
+        with HDF5LOCK:
+            obsData.to_netcdf(NetCDFName, group='OBS', mode='w', encoding=dEnc)
+        return
+
+    progress.start(totalBytes=int(sum([obsData[name].nbytes for name in obsData.data_vars])))
+    try:
+        # the coordinates and attributes, then each variable is appended on the dimensions of the file
+        with HDF5LOCK:
+            xarray.Dataset(coords=obsData.coords, attrs=obsData.attrs).to_netcdf(NetCDFName, group='OBS', mode='w')
+        for name in obsData.data_vars:
+            progress.check()
+            # the lock is released between the variables so that other files are read meanwhile
+            with HDF5LOCK:
+                xarray.Dataset({name: obsData[name].variable}).to_netcdf(NetCDFName, group='OBS', mode='a', encoding={name: dEnc[name]})
+            progress.update(nbytes=obsData[name].nbytes)
+    except rinex_progress.Cancelled:
+        os.remove(NetCDFName)
+        raise
+
+    progress.epochs = obsData.sizes['time']
+    progress.finish()
+
+
+def openObs(NetCDFName: str, lazy: bool = True, chunks: dict = None, progress: rinex_progress.Progress = None) -> xarray.Dataset:
+    """
+    opens the observations in the OBS group of a NetCDF file
+
+    params lazy: keep the data variables on disk and read only the coordinates, else load all values
+    params chunks: dask chunks (e.g. {'time': 3600}) for the lazy arrays, None reads through the NetCDF backend. Ignored when dask is not installed
+    params progress: the values are loaded variable by variable, the loading stops with Cancelled when cancelled
+    """
+    if lazy and chunks is not None:
+        try:
+            import dask  # noqa: F401
+        except ImportError:
+            chunks = None
+
+    with HDF5LOCK:
+        obsData = xarray.open_dataset(NetCDFName, group='OBS', chunks=chunks if lazy else None)
+
+    if not lazy:
+        if progress is not None:
+            progress.start(totalBytes=int(sum([obsData[name].nbytes for name in obsData.data_vars])))
+            try:
+                for name in obsData.data_vars:
+                    progress.check()
+                    with HDF5LOCK:
+                        obsData[name].variable.load()
+                    progress.update(nbytes=obsData[name].nbytes)
+            except rinex_progress.Cancelled:
+                with HDF5LOCK:
+                    obsData.close()
+                raise
+            progress.epochs = obsData.sizes['time']
+            progress.finish()
+
+        with HDF5LOCK:
+            obsData.load()
+            obsData.close()
+
+    return obsData
+
+
+def selectWindow(obsData: xarray.Dataset, svs: Sequence[str], signals: Sequence[str], tlim: Sequence = None) -> xarray.Dataset:
+    """
+    returns the observations for the satellites, signals and time window with their values loaded into memory
+
+    params tlim: start and end time of the window, None for all epochs
+    """
+    selection = obsData[list(signals)].sel(sv=list(svs))
+    if tlim is not None:
+        selection = selection.sel(time=slice(tlim[0], tlim[1]))
+
+    # the values of a lazily opened file are read here
+    with HDF5LOCK:
+        return selection.load()
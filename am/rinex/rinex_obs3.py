@@ -0,0 +1,627 @@
+"""
+native streaming reader for RINEX v3.0x observation files
+
+The epochs are delivered by a generator and the satellite records of a block of
+epochs are converted at once by NumPy into preallocated (time, sv) arrays. The
+returned xarray.Dataset has the same layout as the one created by georinex.load()
+so that both can be used interchangeably by the workers.
+"""
+
+import gzip
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xarray
+
+from rinex import rinex_index, rinex_crx, rinex_progress
+
+__author__ = 'amuls'
+
+# number of epochs whose satellite records are converted together
+EPOCHBLOCK = 500
+# width of a single observation field in a satellite record: F14.3, LLI & SSI
+OBSWIDTH = 16
+# initial number of columns reserved for the satellites
+SVCAPACITY = 64
+# maximum number of epochs preallocated from an estimate, the arrays grow beyond this when needed
+MAXPREALLOC = 86400
+# minimum number of epochs in a chunk parsed by a separate process
+MINCHUNKEPOCHS = 1000
+
+# time system used when the header has a single GNSS
+dTimeSystems = {
+    'G': 'GPS',
+    'R': 'GLO',
+    'E': 'GAL',
+    'J': 'QZS',
+    'C': 'BDT',
+    'I': 'IRN'
+}
+
+
+def openRinex(fn: str):
+    """
+    opens a plain, gzip compressed or Compact RINEX (Hatanaka) file for reading text lines
+    """
+    if rinex_crx.isCompact(fn):
+        return rinex_crx.CrxReader(fn)
+    if fn.endswith('.gz'):
+        return gzip.open(fn, 'rt', encoding='ascii', errors='ignore')
+
+    return open(fn, 'r', encoding='ascii', errors='ignore')
+
+
+def toDatetime(t: Union[str, datetime]) -> datetime:
+    """
+    converts an ISO formatted string (as returned by the selection dialog) to a datetime
+    """
+    if isinstance(t, datetime):
+        return t
+
+    return pd.to_datetime(t).to_pydatetime()
+
+
+def toTimedelta(interval: Union[float, int, timedelta, None]) -> timedelta:
+    """
+    converts the decimation interval in seconds to a timedelta
+    """
+    if interval is None or isinstance(interval, timedelta):
+        return interval
+    if interval < 0:
+        raise ValueError('time interval must be non-negative')
+
+    return timedelta(seconds=interval)
+
+
+def obsheader3(f, use: Sequence[str] = None, meas: Sequence[str] = None) -> dict:
+    """
+    reads the RINEX v3 observation header and determines the observables to keep
+
+    params f: text file positioned at the start of the RINEX file
+    params use: GNSS system IDs to keep ('G' or ['G', 'E'])
+    params meas: observables to keep, an observable is kept when it starts with one of these ('C1' keeps C1C, C1A, ...)
+    returns: header dict where 'fields' holds per GNSS the selected observables and 'fields_ind' their position in the satellite records
+    """
+    hdr = {}
+    allFields = {}
+
+    ln = f.readline()
+    hdr['version'] = float(ln[:9])
+    hdr['filetype'] = ln[20]
+    hdr['systems'] = ln[40]
+    if hdr['version'] < 3:
+        raise ValueError('RINEX version {:.2f} is not a RINEX v3 observation file'.format(hdr['version']))
+
+    for ln in f:
+        label = ln[60:80].strip()
+        content = ln[:60]
+
+        if label == 'END OF HEADER':
+            break
+        elif label == 'SYS / # / OBS TYPES':
+            if content[0] != ' ':
+                sysID = content[0]
+                allFields[sysID] = content[6:60].split()
+            else:  # continuation line
+                allFields[sysID] += content[6:60].split()
+        elif label not in hdr:
+            hdr[label] = content
+        else:
+            hdr[label] += ' ' + content
+
+    hdr['Fmax'] = max([len(v) for v in allFields.values()])
+
+    # optional header information
+    try:
+        hdr['position'] = [float(v) for v in hdr['APPROX POSITION XYZ'].split()][:3]
+    except (KeyError, ValueError):
+        pass
+    try:
+        hdr['interval'] = float(hdr['INTERVAL'][:10])
+    except (KeyError, ValueError):
+        pass
+
+    # determine the time system used
+    if hdr['systems'] in dTimeSystems:
+        hdr['time_system'] = dTimeSystems[hdr['systems']]
+    else:
+        hdr['time_system'] = hdr.get('TIME OF FIRST OBS', ' ' * 51)[48:51].strip()
+
+    # select the GNSS systems
+    if use:
+        if isinstance(use, str):
+            use = [use]
+        if not set(allFields.keys()).intersection(use):
+            raise KeyError('system type {!s} not found in RINEX file'.format(use))
+        systems = [sysID for sysID in use if sysID in allFields]
+    else:
+        systems = list(allFields.keys())
+
+    # select the observables for each GNSS and keep their position in the satellite record
+    if isinstance(meas, str):
+        meas = [meas]
+    if meas is not None and not [m for m in meas if m.strip()]:
+        meas = None
+
+    hdr['fields'] = {}
+    hdr['fields_ind'] = {}
+    for sysID in systems:
+        ind = [i for i, field in enumerate(allFields[sysID]) if meas is None or field.startswith(tuple(meas))]
+        hdr['fields'][sysID] = [allFields[sysID][i] for i in ind]
+        hdr['fields_ind'][sysID] = ind
+
+    return hdr
+
+
+def timeObs(ln: str) -> datetime:
+    """
+    converts the epoch line of a RINEX v3 observation record to a datetime
+    """
+    seconds = float(ln[18:29])
+
+    return datetime(int(ln[2:6]), int(ln[7:9]), int(ln[10:12]), int(ln[13:15]), int(ln[16:18]), int(seconds), int(round(seconds % 1 * 1000000)) % 1000000)
+
+
+def epochRecords(f, tlim: Tuple[datetime, datetime] = None, interval: timedelta = None) -> Iterator[Tuple[datetime, str, List[str]]]:
+    """
+    generator yielding for each observation epoch the time, receiver clock offset and satellite records
+
+    params f: text file positioned after the header
+    params tlim: only epochs between these times are returned
+    params interval: decimation of the epochs returned
+    """
+    lastEpoch = None
+
+    for ln in f:
+        if not ln.startswith('>'):  # garbage between epochs
+            continue
+
+        nrRecords = int(ln[32:35])
+        records = list(islice(f, nrRecords))
+
+        # skip the event records (flags 2 .. 6)
+        if ln[31] not in ' 01':
+            continue
+
+        time = timeObs(ln)
+
+        if tlim is not None:
+            if time < tlim[0]:
+                continue
+            elif time > tlim[1]:
+                break
+
+        if interval is not None:
+            if lastEpoch is None:
+                lastEpoch = time
+            elif time - lastEpoch < interval:
+                continue
+            else:
+                lastEpoch += interval
+
+        yield time, ln[41:56], records
+
+
+def charsToFloat(chars: np.ndarray) -> np.ndarray:
+    """
+    converts a 2D array of single characters holding right aligned numbers to floats, blank fields become NaN
+    """
+    text = np.ascontiguousarray(chars).view('S{:d}'.format(chars.shape[1])).ravel()
+    text[(chars == b' ').all(axis=1)] = b'nan'
+
+    return text.astype(np.float64)
+
+
+def charToIndicator(chars: np.ndarray) -> np.ndarray:
+    """
+    converts a LLI or SSI indicator column to floats, blank indicators become NaN
+    """
+    indicator = chars.view(np.uint8).astype(np.float64) - ord('0')
+    indicator[chars == b' '] = np.nan
+
+    return indicator
+
+
+def obsVariables(obs: str, useindicators: bool) -> list:
+    """
+    returns the names of the variables created for an observable
+    """
+    names = [obs]
+    if useindicators:
+        if obs.startswith(('L1', 'L2')):
+            names.append(obs + 'lli')
+        names.append(obs + 'ssi')
+
+    return names
+
+
+def variableNames(hdr: dict, useindicators: bool) -> list:
+    """
+    returns the names of all variables for the selected observables in order of creation
+    """
+    varNames = []
+    for fields in hdr['fields'].values():
+        for obs in fields:
+            for name in obsVariables(obs, useindicators):
+                if name not in varNames:
+                    varNames.append(name)
+
+    return varNames
+
+
+class ObsColumns(object):
+    """
+    preallocated (time, sv) arrays for the observables, filled by blocks of epochs
+    """
+
+    def __init__(self, hdr: dict, useindicators: bool, nrEpochs: int):
+        """
+        params hdr: header as returned by obsheader3
+        params useindicators: also keep the LLI & SSI indicators
+        params nrEpochs: expected number of epochs
+        """
+        self.hdr = hdr
+        self.useindicators = useindicators
+
+        # width of the satellite records as used for NumPy parsing
+        self.width = 3 + OBSWIDTH * hdr['Fmax']
+
+        # names of the variables in order of creation
+        self.varNames = variableNames(hdr, useindicators)
+
+        self.times = []
+        self.svCols = {}
+        self.seenSystems = set()
+        self.data = {name: np.full((max(nrEpochs, 1), SVCAPACITY), np.nan) for name in self.varNames}
+
+    def reserve(self, nrEpochs: int, nrSVs: int):
+        """
+        grows the arrays (doubling their size) when needed
+        """
+        rows, cols = self.data[self.varNames[0]].shape if self.varNames else (nrEpochs, nrSVs)
+        if nrEpochs <= rows and nrSVs <= cols:
+            return
+
+        while rows < nrEpochs:
+            rows *= 2
+        while cols < nrSVs:
+            cols *= 2
+
+        for name, arr in self.data.items():
+            grown = np.full((rows, cols), np.nan)
+            grown[:arr.shape[0], :arr.shape[1]] = arr
+            self.data[name] = grown
+
+    def svColumn(self, sv: str) -> int:
+        """
+        returns the column for the satellite, assigns a new column at first appearance
+        """
+        try:
+            return self.svCols[sv]
+        except KeyError:
+            self.svCols[sv] = len(self.svCols)
+            return self.svCols[sv]
+
+    def addBlock(self, times: list, records: list, rows: list):
+        """
+        converts the satellite records of a block of epochs into the arrays
+
+        params times: the times of the epochs in this block
+        params records: satellite records of all epochs in the block
+        params rows: for each satellite record the index of its epoch
+        """
+        self.times += times
+
+        # only keep the records of the selected GNSS systems
+        keep = [i for i, rec in enumerate(records) if rec[:1] in self.hdr['fields']]
+        if len(keep) == 0:
+            return
+        records = [records[i] for i in keep]
+        rows = np.asarray(rows)[keep]
+
+        cols = np.array([self.svColumn(rec[:3].replace(' ', '0')) for rec in records])
+        self.reserve(len(self.times), len(self.svCols))
+
+        # fixed width character matrix of all satellite records of this block
+        buf = ''.join([rec.rstrip('\r\n')[:self.width].ljust(self.width) for rec in records])
+        chars = np.frombuffer(buf.encode('ascii', 'replace'), dtype='S1').reshape(len(records), self.width)
+        sysIDs = chars[:, 0]
+
+        for sysID, fields in self.hdr['fields'].items():
+            sysMask = sysIDs == sysID.encode('ascii')
+            if not sysMask.any():
+                continue
+            self.seenSystems.add(sysID)
+
+            sysChars = chars[sysMask]
+            sysRows = rows[sysMask]
+            sysCols = cols[sysMask]
+
+            for obs, iField in zip(fields, self.hdr['fields_ind'][sysID]):
+                start = 3 + iField * OBSWIDTH
+                self.data[obs][sysRows, sysCols] = charsToFloat(sysChars[:, start:start + 14])
+
+                if self.useindicators:
+                    if obs.startswith(('L1', 'L2')):
+                        self.data[obs + 'lli'][sysRows, sysCols] = charToIndicator(sysChars[:, start + 14])
+                    self.data[obs + 'ssi'][sysRows, sysCols] = charToIndicator(sysChars[:, start + 15])
+
+    def toDataset(self) -> xarray.Dataset:
+        """
+        trims the arrays and returns the Dataset with satellites sorted
+        """
+        svNames = np.array(list(self.svCols.keys()), dtype='U3')
+        order = np.argsort(svNames)
+        cols = np.array(list(self.svCols.values()), dtype=int)[order]
+        nrEpochs = len(self.times)
+
+        # keep only the variables of the GNSS systems observed
+        keepNames = set()
+        for sysID in self.seenSystems:
+            for obs in self.hdr['fields'][sysID]:
+                keepNames.update(obsVariables(obs, self.useindicators))
+
+        dVars = {name: (('time', 'sv'), self.data[name][:nrEpochs, cols]) for name in self.varNames if name in keepNames}
+
+        return xarray.Dataset(dVars, coords={'time': np.array(self.times, dtype='datetime64[ns]'), 'sv': svNames[order]})
+
+
+def fillColumns(obsCols: ObsColumns, epochs: Iterator[Tuple[datetime, str, List[str]]], verbose: bool = False, progress: rinex_progress.Progress = None) -> list:
+    """
+    fills the arrays by blocks of EPOCHBLOCK epochs and returns the receiver clock offsets
+
+    params obsCols: the arrays to fill
+    params epochs: time, receiver clock offset and satellite records per epoch as returned by epochRecords
+    params progress: updated with the epochs and the bytes of the satellite records of each block, raises Cancelled when cancelled
+    """
+    times = []
+    records = []
+    rows = []
+    clockOffsets = []
+    nrBytes = 0
+    for time, clockOffset, epochRecs in epochs:
+        rows += [len(obsCols.times) + len(times)] * len(epochRecs)
+        times.append(time)
+        records += epochRecs
+        if progress is not None:
+            nrBytes += sum(map(len, epochRecs))
+
+        try:
+            clockOffsets.append(float(clockOffset))
+        except ValueError:
+            pass
+
+        if len(times) == EPOCHBLOCK:
+            if verbose:
+                print(time, end='\r')
+            obsCols.addBlock(times=times, records=records, rows=rows)
+            if progress is not None:
+                progress.update(epochs=len(times), nbytes=nrBytes)
+            times, records, rows, nrBytes = [], [], [], 0
+
+    obsCols.addBlock(times=times, records=records, rows=rows)
+    if progress is not None:
+        progress.update(epochs=len(times), nbytes=nrBytes)
+
+    return clockOffsets
+
+
+def decimationMask(times: np.ndarray, interval: timedelta) -> np.ndarray:
+    """
+    returns for the epoch times whether the epoch is kept, using the same decimation as epochRecords
+    """
+    keep = np.ones(len(times), dtype=bool)
+    if interval is None or len(times) == 0:
+        return keep
+
+    step = int(round(interval.total_seconds() * 1e9))
+    ns = times.astype('datetime64[ns]').astype(np.int64).tolist()
+    lastEpoch = ns[0]
+    for i in range(1, len(ns)):
+        if ns[i] - lastEpoch < step:
+            keep[i] = False
+        else:
+            lastEpoch += step
+
+    return keep
+
+
+def epochChunks(dIndex: dict, tlim: Tuple[datetime, datetime], interval: timedelta, workers: int) -> List[Tuple[int, np.ndarray]]:
+    """
+    splits the epochs of the index within tlim at epoch boundaries into byte ranges of similar size
+
+    params dIndex: epoch index as returned by rinex_index.loadEpochIndex
+    params workers: maximum number of chunks, each chunk has at least MINCHUNKEPOCHS epochs
+    returns: per chunk the byte offset of its first epoch and for each of its epochs whether it is kept after decimation
+    """
+    iStart, iStop = (0, len(dIndex['time'])) if tlim is None else rinex_index.epochRange(dIndex, tlim)
+    nrChunks = min(workers, (iStop - iStart) // MINCHUNKEPOCHS)
+    if nrChunks < 2:
+        return []
+
+    offsets = dIndex['offset'][iStart:iStop]
+    keep = decimationMask(dIndex['time'][iStart:iStop], interval)
+
+    # first epoch of each chunk is the first epoch past an equal share of the bytes
+    bounds = np.searchsorted(offsets, np.linspace(offsets[0], offsets[-1], nrChunks + 1)[1:-1])
+    bounds = np.concatenate(([0], np.unique(bounds), [len(offsets)]))
+
+    return [(int(offsets[start]), keep[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:]) if keep[start:stop].any()]
+
+
+def chunkSize(dIndex: dict, offset: int, nrEpochs: int) -> int:
+    """
+    returns the number of bytes of the nrEpochs epochs of the index starting at byte offset
+    """
+    iEnd = int(np.searchsorted(dIndex['offset'], offset)) + nrEpochs
+
+    return (int(dIndex['offset'][iEnd]) if iEnd < len(dIndex['offset']) else int(dIndex['size'])) - offset
+
+
+def readEpochChunk(fn: str, use: Sequence[str], meas: Sequence[str], useindicators: bool, offset: int, keep: np.ndarray) -> Tuple[xarray.Dataset, list]:
+    """
+    reads the consecutive epochs starting at byte offset, run in a separate process by rinexobs3
+
+    params offset: byte offset of the first epoch line of the chunk
+    params keep: for each epoch of the chunk whether it is kept
+    returns: the observations of the chunk and its receiver clock offsets
+    """
+    with openRinex(fn) as f:
+        hdr = obsheader3(f, use=use, meas=meas)
+        f.seek(offset)
+
+        obsCols = ObsColumns(hdr=hdr, useindicators=useindicators, nrEpochs=int(keep.sum()))
+        clockOffsets = fillColumns(obsCols, epochs=(epoch for kept, epoch in zip(keep, epochRecords(f)) if kept))
+
+    return obsCols.toDataset(), clockOffsets
+
+
+def concatChunks(chunks: List[xarray.Dataset], varNames: list) -> xarray.Dataset:
+    """
+    concatenates the chunks along time on the union of their satellites and variables
+    """
+    svNames = np.unique(np.concatenate([chunk.sv.values for chunk in chunks]))
+    times = np.concatenate([chunk.time.values for chunk in chunks])
+    names = [name for name in varNames if any(name in chunk.data_vars for chunk in chunks)]
+
+    dData = {name: np.full((len(times), len(svNames)), np.nan) for name in names}
+    row = 0
+    for chunk in chunks:
+        cols = np.searchsorted(svNames, chunk.sv.values)
+        rows = slice(row, row + chunk.sizes['time'])
+        for name in chunk.data_vars:
+            dData[name][rows, cols] = chunk[name].values
+        row = rows.stop
+
+    return xarray.Dataset({name: (('time', 'sv'), dData[name]) for name in names}, coords={'time': times, 'sv': svNames})
+
+
+def expectedEpochs(fn: str, hdr: dict, tlim: Tuple[datetime, datetime], interval: timedelta) -> int:
+    """
+    returns the number of epochs read within tlim after decimation, from the epoch index when available, else
+    estimated from the interval of the header. None when unknown
+    """
+    if rinex_index.isIndexable(fn):
+        dIndex = rinex_index.loadEpochIndex(fn)
+        iStart, iStop = (0, len(dIndex['time'])) if tlim is None else rinex_index.epochRange(dIndex, tlim)
+
+        return int(decimationMask(dIndex['time'][iStart:iStop], interval).sum())
+
+    step = interval.total_seconds() if interval is not None else hdr.get('interval', 0)
+    if tlim is not None and step > 0:
+        return int((tlim[1] - tlim[0]).total_seconds() / step) + 1
+
+    return None
+
+
+def setAttributes(data: xarray.Dataset, hdr: dict, fn: str, clockOffsets: list):
+    """
+    sets the attributes of the Dataset as done by georinex
+    """
+    data.attrs['version'] = hdr['version']
+    if 'interval' in hdr:
+        data.attrs['interval'] = hdr['interval']
+    elif data.time.size > 1:
+        data.attrs['interval'] = np.median(np.diff(data.time) / np.timedelta64(1, 's'))
+    else:
+        data.attrs['interval'] = np.nan
+    data.attrs['rinextype'] = 'obs'
+    data.attrs['fast_processing'] = 0
+    data.attrs['time_system'] = hdr['time_system']
+    data.attrs['filename'] = os.path.basename(fn)
+    if 'position' in hdr:
+        data.attrs['position'] = hdr['position']
+    if clockOffsets:
+        data.attrs['time_offset'] = clockOffsets
+    if 'RCV CLOCK OFFS APPL' in hdr:
+        try:
+            data.attrs['receiver_clock_offset_applied'] = int(hdr['RCV CLOCK OFFS APPL'])
+        except ValueError:
+            pass
+
+
+def rinexobs3(fn: str, use: Sequence[str] = None, tlim: Sequence[Union[str, datetime]] = None, useindicators: bool = False, meas: Sequence[str] = None, interval: Union[float, int, timedelta] = None, verbose: bool = False, useIndex: bool = True, workers: int = 1, progress: rinex_progress.Progress = None) -> xarray.Dataset:
+    """
+    reads RINEX v3 observations into a Dataset with the same layout as georinex.load()
+
+    params fn: RINEX observation file
+    params use: 'G' or ['G', 'E'] or similar
+    params tlim: start / stop time (datetime or ISO formatted string)
+    params useindicators: SSI & LLI are added as variables
+    params meas: 'L1C' or ['L1C', 'C1C'] or similar
+    params interval: decimation in seconds
+    params useIndex: use the epoch index to seek to the first epoch within tlim
+    params workers: number of processes parsing chunks of the file in parallel (needs an indexable file)
+    params progress: updated after each block of epochs (or chunk parsed in parallel), reading stops with Cancelled when cancelled
+    """
+    if tlim is not None:
+        tlim = [toDatetime(t) for t in tlim]
+    interval = toTimedelta(interval)
+
+    with openRinex(fn) as f:
+        hdr = obsheader3(f, use=use, meas=meas)
+
+        # parse chunks of epochs in a pool of processes and concatenate them along time
+        chunks = []
+        if workers > 1 and rinex_index.isIndexable(fn):
+            dIndex = rinex_index.loadEpochIndex(fn)
+            chunks = epochChunks(dIndex, tlim=tlim, interval=interval, workers=workers)
+
+        if chunks:
+            if progress is not None:
+                chunkBytes = [chunkSize(dIndex, offset, len(keep)) for offset, keep in chunks]
+                progress.start(totalEpochs=int(sum([keep.sum() for _, keep in chunks])), totalBytes=sum(chunkBytes))
+
+            # spawned processes, forking while other threads hold locks (e.g. the HDF5 lock) can deadlock the child
+            with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [pool.submit(readEpochChunk, fn, use, meas, useindicators, offset, keep) for offset, keep in chunks]
+
+                # the chunks are reported as they are parsed, the chunks not started are dropped when cancelled
+                if progress is not None:
+                    try:
+                        for future in as_completed(futures):
+                            chunk, _ = future.result()
+                            progress.update(epochs=chunk.sizes['time'], nbytes=chunkBytes[futures.index(future)])
+                    except rinex_progress.Cancelled:
+                        for future in futures:
+                            future.cancel()
+                        raise
+
+                results = [future.result() for future in futures]
+
+            data = concatChunks([chunk for chunk, _ in results], varNames=variableNames(hdr, useindicators))
+            clockOffsets = [clockOffset for _, chunkOffsets in results for clockOffset in chunkOffsets]
+
+        else:
+            # estimate the number of epochs to preallocate the arrays
+            step = interval.total_seconds() if interval is not None else hdr.get('interval', 0)
+            if tlim is not None and step > 0:
+                nrEpochs = min(int((tlim[1] - tlim[0]).total_seconds() / step) + 1, MAXPREALLOC)
+            else:
+                nrEpochs = 3600
+
+            # seek straight to the first wanted epoch
+            if tlim is not None and useIndex and rinex_index.isIndexable(fn):
+                dIndex = rinex_index.loadEpochIndex(fn)
+                iStart, iStop = rinex_index.epochRange(dIndex, tlim)
+                f.seek(int(dIndex['offset'][iStart]) if iStart < len(dIndex['offset']) else dIndex['size'])
+                nrEpochs = iStop - iStart if interval is None else min(nrEpochs, iStop - iStart)
+
+            if progress is not None:
+                progress.start(totalEpochs=expectedEpochs(fn, hdr=hdr, tlim=tlim, interval=interval))
+
+            obsCols = ObsColumns(hdr=hdr, useindicators=useindicators, nrEpochs=nrEpochs)
+            clockOffsets = fillColumns(obsCols, epochs=epochRecords(f, tlim=tlim, interval=interval), verbose=verbose, progress=progress)
+
+            data = obsCols.toDataset()
+
+    # attributes as set by georinex
+    setAttributes(data, hdr=hdr, fn=fn, clockOffsets=clockOffsets)
+
+    return data
@@ -1,4 +1,6 @@
 import sys
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
 
 
 # observables in RINEX v3.02
@@ -562,3 +564,74 @@ dGAL = {
         'E6ABC': dE6ABC
     }
 }
+
+
+# GNSS systems of which the signals are described
+dGNSSs = {
+    'G': dGPS,
+    'E': dGAL
+}
+
+
+class SignalInfo(NamedTuple):
+    """
+    description of a RINEX observation code of a GNSS system
+    """
+    gnss: str       # GNSS system identifier (e.g. 'E')
+    system: str     # name of the GNSS system (e.g. 'Galileo')
+    code: str       # RINEX observation code (e.g. 'C6A')
+    sigType: str    # signal type (PR, CP, DF or SS)
+    band: str       # frequency band (e.g. 'E6')
+    freq: float     # frequency of the band [MHz]
+    mode: str       # tracking mode (e.g. 'E6A')
+    name: str       # name of the tracking mode (e.g. 'PRS')
+
+
+def buildSignalIndex(dSystems: dict) -> MappingProxyType:
+    """
+    buildSignalIndex returns the read-only mapping of (GNSS, observation code) to its SignalInfo
+
+    params dSystems: the nested dict (band, tracking mode, signal type) of each GNSS system
+    """
+    dIndex = {}
+    for gnss, dGNSS in dSystems.items():
+        for band, dBand in dGNSS.items():
+            if not isinstance(dBand, dict):
+                continue
+            for mode, dMode in dBand.items():
+                if not isinstance(dMode, dict):
+                    continue
+                for sigType in dSignalTypesNames:
+                    # the codeless channels have no pseudo-range
+                    if dMode.get(sigType):
+                        dIndex[(gnss, dMode[sigType])] = SignalInfo(gnss=gnss, system=dGNSS['name'], code=dMode[sigType], sigType=sigType, band=band, freq=dBand['freq'], mode=mode, name=dMode['name'])
+
+    return MappingProxyType(dIndex)
+
+
+# built once at import and read-only, so the lookups need no lock in worker threads
+dSignalIndex = buildSignalIndex(dGNSSs)
+
+dSignalTypeOfCode = MappingProxyType({info.code: info.sigType for info in dSignalIndex.values()})
+dCodesOfSignalType = MappingProxyType({sigType: tuple(sorted({info.code for info in dSignalIndex.values() if info.sigType == sigType})) for sigType in dSignalTypesNames})
+
+
+def signalInfo(gnss: str, code: str) -> Optional[SignalInfo]:
+    """
+    signalInfo returns the description of the observation code of the GNSS system, None when unknown
+    """
+    return dSignalIndex.get((gnss, code))
+
+
+def signalType(code: str) -> Optional[str]:
+    """
+    signalType returns the signal type (PR, CP, DF or SS) of the observation code, None when unknown
+    """
+    return dSignalTypeOfCode.get(code)
+
+
+def signalsOfType(sigType: str) -> Tuple[str, ...]:
+    """
+    signalsOfType returns the observation codes of all GNSS systems of the signal type (PR, CP, DF or SS)
+    """
+    return dCodesOfSignalType.get(sigType, ())
@@ -0,0 +1,143 @@
+"""
+progress reporting and cooperative cancellation of the readers and writers
+
+A Progress is handed to a reader or writer that works incrementally (blocks of
+epochs, chunks of the file, variables): after each step it adds the epochs and
+bytes processed, which checks whether the operation was cancelled and, at most
+every interval seconds, calls back with the counts, the throughput in MB/s and
+the estimated time left. Cancelling is done from another thread (e.g. the GUI):
+the next update raises Cancelled in the reader or writer, which cleans up and
+stops at the end of its current step.
+"""
+
+import threading
+import time
+from typing import Callable
+
+__author__ = 'amuls'
+
+# minimum time in seconds between two reports
+REPORTINTERVAL = 0.25
+
+
+class Cancelled(Exception):
+    """
+    raised in a reader or writer when its operation is cancelled
+    """
+    pass
+
+
+class Progress(object):
+    """
+    counts the epochs and bytes processed, reports them through a callback and checks for cancellation
+    """
+
+    def __init__(self, callback: Callable[[dict], None] = None, totalEpochs: int = None, totalBytes: int = None, interval: float = REPORTINTERVAL):
+        """
+        params callback: called with the dict returned by report, at most every interval seconds
+        params totalEpochs: number of epochs to process, None when unknown
+        params totalBytes: number of bytes to process, None when unknown
+        """
+        self.callback = callback
+        self.totalEpochs = totalEpochs
+        self.totalBytes = totalBytes
+        self.interval = interval
+
+        self.epochs = 0
+        self.bytes = 0
+        self.tStart = time.perf_counter()
+        self.tReport = self.tStart
+
+        # set from another thread, checked by the reader or writer between its steps
+        self.cancelEvent = threading.Event()
+
+    def start(self, totalEpochs: int = None, totalBytes: int = None):
+        """
+        restarts the counts and the clock, setting the totals when known
+        """
+        if totalEpochs is not None:
+            self.totalEpochs = totalEpochs
+        if totalBytes is not None:
+            self.totalBytes = totalBytes
+
+        self.epochs = 0
+        self.bytes = 0
+        self.tStart = self.tReport = time.perf_counter()
+
+    def cancel(self):
+        """
+        requests the operation to stop, may be called from any thread
+        """
+        self.cancelEvent.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        returns whether the operation was cancelled
+        """
+        return self.cancelEvent.is_set()
+
+    def check(self):
+        """
+        raises Cancelled when the operation was cancelled
+        """
+        if self.cancelEvent.is_set():
+            raise Cancelled()
+
+    def update(self, epochs: int = 0, nbytes: int = 0):
+        """
+        adds the epochs and bytes of a step, reports when due and raises Cancelled when the operation was cancelled
+        """
+        self.check()
+
+        self.epochs += epochs
+        self.bytes += nbytes
+
+        tNow = time.perf_counter()
+        if self.callback is not None and tNow - self.tReport >= self.interval:
+            self.tReport = tNow
+            self.callback(self.report())
+
+    def finish(self):
+        """
+        reports the final counts
+        """
+        if self.callback is not None:
+            self.callback(self.report())
+
+    def report(self) -> dict:
+        """
+        returns the epochs and bytes processed, their totals, the elapsed time, the throughput in MB/s and the estimated seconds left (None when unknown)
+        """
+        elapsed = time.perf_counter() - self.tStart
+        MBps = self.bytes / 1e6 / elapsed if elapsed > 0 else 0.
+
+        # estimated from the bytes when their total is known, else from the epochs
+        eta = None
+        if self.totalBytes and self.bytes:
+            eta = elapsed * max(self.totalBytes - self.bytes, 0) / self.bytes
+        elif self.totalEpochs and self.epochs:
+            eta = elapsed * max(self.totalEpochs - self.epochs, 0) / self.epochs
+
+        return {'epochs': self.epochs, 'totalEpochs': self.totalEpochs, 'bytes': self.bytes, 'totalBytes': self.totalBytes, 'elapsed': elapsed, 'MBps': MBps, 'eta': eta}
+
+
+def progressMessage(action: str, dProgress: dict) -> str:
+    """
+    returns the status bar text of the progress of the action (e.g. 'Reading BEGP2190.19O')
+    """
+    parts = []
+    if dProgress['epochs'] or dProgress['totalEpochs']:
+        if dProgress['totalEpochs']:
+            parts.append('{epochs:d}/{total:d} epochs'.format(epochs=dProgress['epochs'], total=dProgress['totalEpochs']))
+        else:
+            parts.append('{epochs:d} epochs'.format(epochs=dProgress['epochs']))
+    if dProgress['totalBytes']:
+        parts.append('{MB:.1f}/{total:.1f} MB'.format(MB=dProgress['bytes'] / 1e6, total=dProgress['totalBytes'] / 1e6))
+    else:
+        parts.append('{MB:.1f} MB'.format(MB=dProgress['bytes'] / 1e6))
+    parts.append('{MBps:.1f} MB/s'.format(MBps=dProgress['MBps']))
+    if dProgress['eta'] is not None:
+        parts.append('{eta:.0f} s left'.format(eta=dProgress['eta']))
+
+    return '{action:s}: {progress:s}'.format(action=action, progress=', '.join(parts))
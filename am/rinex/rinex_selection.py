@@ -0,0 +1,135 @@
+"""
+selection of the GNSS systems, observables and time window to read from a RINEX observation file
+
+The selection is the dict returned by the selection dialog of rnxplot
+(dRinexSelected):
+    {'GNSSObs': {'E': ['C1C', 'L1C'], 'G': ['C1C']},
+     'Timing': {'start': '2019-08-07T00:00:00', 'stop': '2019-08-07T23:59:59', 'duration': 1440, 'interval': 1.0},
+     'Indicators': False}
+The functions below complete a partial selection from the header and the epochs
+of the file as the dialog does, convert it to the arguments of the readers and
+name the NetCDF file storing the observations read, without any GUI.
+"""
+
+import io
+import os
+from typing import Sequence
+
+import georinex as gr
+import pandas as pd
+
+from rinex import rinex_crx, rinex_index
+
+__author__ = 'amuls'
+
+# format of the start and stop times of the selection
+TIMEFORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def readHeader(fn: str) -> dict:
+    """
+    returns the header of the RINEX observation file (also Compact RINEX) as read by georinex
+    """
+    if rinex_crx.isCompact(fn):
+        return gr.rinexheader(io.StringIO(rinex_crx.rinexHeader(fn)))
+
+    return gr.rinexheader(fn)
+
+
+def readTiming(fn: str) -> dict:
+    """
+    returns the start and stop time (pd.Timestamp), the interval [s] and the number of epochs of the RINEX observation file
+
+    The times are taken from the epoch index (built once and stored next to the RINEX file) or from the epoch lines of a
+    Compact RINEX file, else from georinex.
+    """
+    if rinex_crx.isCompact(fn):
+        return rinex_index.epochTiming(rinex_crx.epochIndex(fn))
+    if rinex_index.isIndexable(fn):
+        return rinex_index.epochTiming(rinex_index.loadEpochIndex(fn))
+
+    obsTimes = gr.gettime(fn)
+
+    return {'start': pd.Timestamp(obsTimes[0].values), 'stop': pd.Timestamp(obsTimes[-1].values), 'interval': obsTimes[0].attrs['interval'], 'epochs': len(obsTimes)}
+
+
+def selectTime(value: str, day: pd.Timestamp) -> str:
+    """
+    returns the time of the selection: an ISO date and time, or a time of day (HH:MM or HH:MM:SS) on the day given
+    """
+    if 'T' in value or '-' in value:
+        return pd.Timestamp(value).strftime(TIMEFORMAT)
+
+    return (day.normalize() + pd.Timedelta(value if value.count(':') == 2 else value + ':00')).strftime(TIMEFORMAT)
+
+
+def completeSelection(fn: str, dRinexSelect: dict = None) -> dict:
+    """
+    returns the selection completed with the defaults of the selection dialog of rnxplot
+
+    A missing or empty list of observables selects all observables of the GNSS system in the header, missing GNSS systems
+    select all systems of the header. Missing start or stop times are the first or last epoch of the file, a time of day is
+    taken on the day of the first epoch. A missing interval is the interval of the file.
+
+    params dRinexSelect: the partial selection, as dRinexSelected
+    """
+    dRinexSelect = dRinexSelect or {}
+    dFields = readHeader(fn)['fields']
+    dTiming = readTiming(fn)
+
+    # the observables of the GNSS systems, those not in the header are ignored
+    dGNSSObs = {}
+    for gnss, listObs in (dRinexSelect.get('GNSSObs') or {gnss: [] for gnss in dFields}).items():
+        if gnss not in dFields:
+            continue
+        dGNSSObs[gnss] = [obs for obs in dFields[gnss] if obs in listObs] if listObs else list(dFields[gnss])
+    if not dGNSSObs:
+        raise ValueError('{file:s}: none of the GNSS systems {gnss!s} observed'.format(file=fn, gnss=list(dRinexSelect['GNSSObs'])))
+
+    dSelTiming = dRinexSelect.get('Timing') or {}
+    SelectedTiming = {}
+    SelectedTiming['start'] = selectTime(dSelTiming['start'], dTiming['start']) if dSelTiming.get('start') else dTiming['start'].strftime(TIMEFORMAT)
+    SelectedTiming['stop'] = selectTime(dSelTiming['stop'], dTiming['start']) if dSelTiming.get('stop') else dTiming['stop'].strftime(TIMEFORMAT)
+    SelectedTiming['duration'] = int((pd.Timestamp(SelectedTiming['stop']) - pd.Timestamp(SelectedTiming['start'])).total_seconds() // 60)
+    SelectedTiming['interval'] = float(dSelTiming.get('interval') or dTiming['interval'])
+
+    return {'GNSSObs': dGNSSObs, 'Timing': SelectedTiming, 'Indicators': bool(dRinexSelect.get('Indicators', False))}
+
+
+def gnssObs(gnss: Sequence[str] = None, meas: Sequence[str] = None) -> dict:
+    """
+    returns the GNSSObs of a selection of the GNSS systems (None for all) and observables (None for all)
+    """
+    return {GNSS: list(meas or []) for GNSS in gnss} if gnss else ({GNSS: list(meas) for GNSS in 'CEGIJRS'} if meas else {})
+
+
+def loadArguments(dRinexSelect: dict) -> dict:
+    """
+    returns the arguments tlim, use, meas, useindicators and interval of the readers (and of the observation cache) for the selection
+    """
+    # specify the GNSS systems and measurements to load
+    useGNSS = []
+    useMeas = []
+    for GNSS, Meas in dRinexSelect['GNSSObs'].items():
+        useGNSS.append(GNSS)
+        useMeas = useMeas + Meas
+    useMeas = list(set(useMeas))
+
+    # specify in ISOFORMAT the start / stop times for reading the RINEX file
+    tLim = [dRinexSelect['Timing']['start'], dRinexSelect['Timing']['stop']]
+
+    return {'tlim': tLim, 'use': useGNSS, 'meas': useMeas, 'useindicators': dRinexSelect['Indicators'], 'interval': dRinexSelect['Timing']['interval']}
+
+
+def netCDFName(rinexObsName: str, dRinexSelect: dict) -> str:
+    """
+    returns the name of the NetCDF file storing the observations of the selection, named after the RINEX file, the start and stop time, the interval and the GNSS systems
+
+    The NetCDF file is placed in the directory of the RINEX file, only the dots of the file name are replaced.
+    """
+    startHMS = ''.join(dRinexSelect['Timing']['start'][-8:-3].split(':'))
+    stopHMS = ''.join(dRinexSelect['Timing']['stop'][-8:-3].split(':'))
+    interval = '{:05.2f}'.format(dRinexSelect['Timing']['interval']).replace('.', '')
+    gnss = ''.join([k for k, v in dRinexSelect['GNSSObs'].items()])
+
+    return os.path.join(os.path.dirname(rinexObsName), '{rinex:s}-{start:s}-{stop:s}-{interval:s}-{gnss:s}.nc'.format(rinex=os.path.basename(rinexObsName).replace('.', '-'), start=startHMS, stop=stopHMS, interval=interval, gnss=gnss))
@@ -0,0 +1,206 @@
+"""
+Zarr store of RINEX observations growing in time
+
+The observations of consecutive files (e.g. the daily files of a campaign) are
+appended along the time dimension of one store, so that a period spanning many
+files is selected by time and satellite without opening each file. Every
+observable is a separate array chunked per satellite and per time span, chunks
+holding no observations are not written. Satellites and observables not seen
+before are added to the store when appending.
+
+The chunks of the appended observations are compressed and written in parallel
+when dask is installed.
+"""
+
+import os
+from typing import Sequence
+
+import numpy as np
+import xarray
+import zarr
+
+from rinex import rinex_netcdf
+
+__author__ = 'amuls'
+
+# seconds of observations and number of satellites in a chunk, a day of a satellite for daily appends
+CHUNKSECONDS = 86400
+SVCHUNK = 1
+# storage of the epochs, exact for sub-second intervals
+TIMEENCODING = {'units': 'nanoseconds since 1980-01-06', 'calendar': 'proleptic_gregorian', 'dtype': 'int64'}
+# attributes holding a value per epoch, not kept in the store
+EPOCHATTRS = ['time_offset']
+
+
+def isStore(storeName: str) -> bool:
+    """
+    checks whether storeName is a Zarr store, a directory holding the group metadata of the Zarr v2 layout
+    """
+    return os.path.isdir(storeName) and os.path.isfile(os.path.join(storeName, '.zgroup'))
+
+
+def storeAttrs(obsData: xarray.Dataset, files: Sequence[str] = None) -> dict:
+    """
+    returns the attributes of the observations kept in the store, filename lists the files appended
+    """
+    attrs = {k: v for k, v in obsData.attrs.items() if k not in EPOCHATTRS}
+    attrs['filename'] = ', '.join([f for f in (files or []) + [obsData.attrs.get('filename', '')] if f])
+
+    return attrs
+
+
+def writeChunked(data: xarray.Dataset, storeName: str, timeChunk: int, firstChunk: int, workers: int = None, **kwargs):
+    """
+    writes the observations to the store, in parallel over the chunks when dask is installed
+
+    params timeChunk: number of epochs in a chunk of the store
+    params firstChunk: number of epochs filling the last, partly written chunk of the store
+    params kwargs: passed to xarray.Dataset.to_zarr
+    """
+    try:
+        import dask
+    except ImportError:
+        data.to_zarr(storeName, **kwargs)
+        return
+
+    # the chunks of the data coincide with the chunks of the store so that each one is written by a single task
+    nrEpochs = data.sizes['time']
+    timeChunks = [min(firstChunk, nrEpochs)] if firstChunk > 0 else []
+    timeChunks += [timeChunk] * ((nrEpochs - sum(timeChunks)) // timeChunk)
+    if sum(timeChunks) < nrEpochs:
+        timeChunks.append(nrEpochs - sum(timeChunks))
+    data = data.chunk({'time': tuple(timeChunks), 'sv': SVCHUNK})
+
+    with dask.config.set(scheduler='threads', num_workers=workers):
+        data.to_zarr(storeName, **kwargs)
+
+
+def medianInterval(obsData: xarray.Dataset) -> float:
+    """
+    returns the interval in seconds between the epochs of the observations
+    """
+    if obsData.sizes['time'] > 1:
+        return float(np.median(np.diff(obsData.time.values) / np.timedelta64(1, 's')))
+
+    interval = obsData.attrs.get('interval')
+
+    return interval if interval else 1.
+
+
+def emptyArray(nrEpochs: int, nrSVs: int):
+    """
+    returns an array without observations, kept lazy when dask is installed
+    """
+    try:
+        import dask.array
+        return dask.array.full((nrEpochs, nrSVs), np.nan, chunks=(max(1, nrEpochs), SVCHUNK))
+    except ImportError:
+        return np.full((nrEpochs, nrSVs), np.nan)
+
+
+def encoding(obsData: xarray.Dataset, timeChunk: int, dtypes: str = 'lossless') -> dict:
+    """
+    returns the Zarr encoding of the data variables and the time coordinate
+    """
+    dEnc = {'time': dict(TIMEENCODING)}
+    for name in obsData.data_vars:
+        enc = {'chunks': (timeChunk, SVCHUNK)}
+
+        dtype = rinex_netcdf.dDtypes[dtypes].get(rinex_netcdf.variableKind(name)) if dtypes is not None else None
+        if dtype is not None:
+            enc['dtype'] = dtype
+            if np.issubdtype(np.dtype(dtype), np.integer):
+                enc['_FillValue'] = rinex_netcdf.INDFILL
+
+        dEnc[name] = enc
+
+    return dEnc
+
+
+def extendSVs(storeName: str, store: xarray.Dataset, newSVs: Sequence[str]):
+    """
+    enlarges the satellite dimension of the arrays in the store for the new satellites, the added part holds no observations
+    """
+    group = zarr.open_group(storeName, mode='r+')
+
+    for name, var in store.variables.items():
+        if 'sv' not in var.dims:
+            continue
+
+        arr = group[name]
+        axis = var.dims.index('sv')
+        shape = list(arr.shape)
+        shape[axis] += len(newSVs)
+        arr.resize(tuple(shape))
+
+        if name == 'sv':
+            arr[-len(newSVs):] = np.array(newSVs, dtype=object)
+
+    zarr.consolidate_metadata(storeName)
+
+
+def appendObs(storeName: str, obsData: xarray.Dataset, chunkSeconds: float = CHUNKSECONDS, dtypes: str = 'lossless', workers: int = None) -> int:
+    """
+    appends the observations to the store, creating the store when it does not exist
+
+    Only epochs after the last epoch in the store are appended. Returns the number of epochs appended.
+
+    params chunkSeconds: seconds of observations in a chunk, set when creating the store
+    params dtypes: storage dtypes from rinex_netcdf.dDtypes, set when creating the store
+    params workers: number of threads writing chunks (None for all cores)
+    """
+    if not isStore(storeName):
+        # satellites as variable length strings, the fixed length unicode dtype is not part of the Zarr specification
+        data = obsData.sortby('sv')
+        data = data.assign_coords(sv=data.sv.values.astype(object))
+        data.attrs = storeAttrs(obsData)
+        timeChunk = max(1, int(round(chunkSeconds / medianInterval(data))))
+
+        writeChunked(data, storeName, timeChunk=timeChunk, firstChunk=0, workers=workers, mode='w-', encoding=encoding(data, timeChunk=timeChunk, dtypes=dtypes))
+
+        return data.sizes['time']
+
+    with xarray.open_zarr(storeName, chunks=None) as store:
+        nrStored = store.sizes['time']
+        data = obsData.isel(time=np.nonzero(obsData.time.values > store.time.values[-1])[0])
+        if data.sizes['time'] == 0:
+            return 0
+
+        # satellites not yet in the store are added after the ones stored
+        newSVs = sorted(set(data.sv.values) - set(store.sv.values))
+        if newSVs:
+            extendSVs(storeName, store, newSVs)
+        svs = list(store.sv.values) + newSVs
+
+        # observables not yet in the store are added without observations for the stored epochs
+        timeChunk = store[list(store.data_vars)[0]].encoding['chunks'][0]
+        newVars = [name for name in data.data_vars if name not in store.data_vars]
+        if newVars:
+            empty = xarray.Dataset({name: (('time', 'sv'), emptyArray(nrStored, len(svs))) for name in newVars})
+            writeChunked(empty, storeName, timeChunk=timeChunk, firstChunk=0, workers=workers, mode='a', encoding={name: enc for name, enc in encoding(data[newVars], timeChunk=timeChunk).items() if name in newVars})
+
+        files = store.attrs.get('filename', '').split(', ')
+        names = list(store.data_vars) + newVars
+
+    # the appended observations hold all satellites and observables of the store in its order
+    data = data.reindex(sv=np.array(svs, dtype=object))
+    for name in names:
+        if name not in data.data_vars:
+            data[name] = (('time', 'sv'), emptyArray(data.sizes['time'], len(svs)))
+    # the satellites are not written again: their order is fixed by the reindex and the stored coordinate keeps its dtype
+    data = xarray.Dataset({name: data[name].variable for name in names}, coords={'time': data['time'].variable}, attrs=storeAttrs(obsData, files=files))
+
+    writeChunked(data, storeName, timeChunk=timeChunk, firstChunk=(timeChunk - nrStored % timeChunk) % timeChunk, workers=workers, mode='a', append_dim='time')
+
+    return data.sizes['time']
+
+
+def openStore(storeName: str, chunks: dict = None) -> xarray.Dataset:
+    """
+    opens the observations of the store lazily with the satellites sorted
+
+    params chunks: dask chunks (e.g. {'time': 3600}) for the lazy arrays, None reads through the Zarr backend
+    """
+    store = xarray.open_zarr(storeName, chunks=chunks)
+
+    return store.isel(sv=np.argsort(store.sv.values))
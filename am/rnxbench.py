@@ -0,0 +1,1246 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks for the processing steps of rnxplot and rnxdiff
+"""
+
+import os
+import argparse
+import sys
+import time
+import gzip
+import shutil
+import subprocess
+import tempfile
+from typing import Tuple
+from termcolor import colored
+import logging
+
+import am_config as amc
+
+__author__ = 'amuls'
+
+# tolerance of the statistics of the moving averages computed chunk by chunk: the rolling sums restart at each chunk, changing their rounding
+DIFFRTOL = 1e-9
+DIFFATOL = 1e-12
+
+
+def treatCmdOpts(argv):
+    """
+    Treats the command line options and sets the global variables according to the CLI args
+
+    :param argv: the options (without argv[0])
+    :type argv: list of string
+    """
+    helpTxt = os.path.basename(__file__) + ' benchmarks the processing steps of rnxplot and rnxdiff'
+
+    # create the parser for command line arguments
+    parser = argparse.ArgumentParser(description=helpTxt)
+    parser.add_argument('-l', '--logging', help='specify logging level console/file (default {:s})'.format(colored('INFO DEBUG', 'green')), nargs=2, required=False, default=['INFO', 'DEBUG'], choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'])
+
+    subparsers = parser.add_subparsers(dest='bench', help='benchmark to run')
+    subparsers.required = True
+
+    # reading of RINEX observation files
+    parserObs = subparsers.add_parser('obs', help='throughput of native RINEX v3 reader versus georinex')
+    parserObs.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserObs.add_argument('-u', '--use', help='GNSS systems to load', nargs='+', required=False, default=None, type=str)
+    parserObs.add_argument('-m', '--meas', help='observables to load', nargs='+', required=False, default=None, type=str)
+    parserObs.add_argument('-t', '--tlim', help='start / stop time (ISO format)', nargs=2, required=False, default=None, type=str)
+    parserObs.add_argument('-i', '--interval', help='decimation interval [sec]', required=False, default=None, type=float)
+    parserObs.add_argument('--indicators', help='load SSI & LLI indicators', action='store_true', required=False)
+    parserObs.add_argument('--skip-georinex', help='only time the native reader', action='store_true', required=False, dest='skipGeorinex')
+
+    # epoch index of RINEX observation files
+    parserIdx = subparsers.add_parser('index', help='epoch index build / reuse and time window reads')
+    parserIdx.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserIdx.add_argument('-t', '--tlim', help='start / stop time (ISO format) of the window read', nargs=2, required=True, type=str)
+
+    # parallel chunked parsing of RINEX observation files
+    parserPar = subparsers.add_parser('parallel', help='scaling of the native RINEX v3 reader with the number of worker processes')
+    parserPar.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserPar.add_argument('-t', '--tlim', help='start / stop time (ISO format)', nargs=2, required=False, default=None, type=str)
+    parserPar.add_argument('-w', '--workers', help='maximum number of worker processes (default all cores)', required=False, default=os.cpu_count() or 1, type=int)
+
+    # Compact RINEX (Hatanaka) observation files
+    parserCrx = subparsers.add_parser('crx', help='streaming Compact RINEX decoding versus decompressing to disk before parsing')
+    parserCrx.add_argument('crx', help='Compact RINEX v3 observation file (.crx, .crx.gz, .yyd, .yyd.gz)', type=str)
+    parserCrx.add_argument('-u', '--use', help='GNSS systems to load', nargs='+', required=False, default=None, type=str)
+    parserCrx.add_argument('-m', '--meas', help='observables to load', nargs='+', required=False, default=None, type=str)
+
+    # cache of parsed observations
+    parserCache = subparsers.add_parser('cache', help='parsed observation cache: miss, exact hit and subset hit')
+    parserCache.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserCache.add_argument('-t', '--tlim', help='start / stop time (ISO format) of the cached selection', nargs=2, required=True, type=str)
+    parserCache.add_argument('-d', '--dir', help='cache directory (default temporary directory)', required=False, default=None, type=str)
+
+    # NetCDF layouts
+    parserNc = subparsers.add_parser('netcdf', help='file size, write time and read latency of NetCDF chunk layouts')
+    parserNc.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserNc.add_argument('-t', '--tlim', help='start / stop time (ISO format)', nargs=2, required=False, default=None, type=str)
+    parserNc.add_argument('-w', '--window', help='length of the time window read [sec] (default 600)', required=False, default=600, type=float)
+
+    # lazy reading of NetCDF files
+    parserLazy = subparsers.add_parser('lazy', help='time to first display and memory of eager versus lazy NetCDF reading')
+    parserLazy.add_argument('netcdf', help='NetCDF observation file written by rnxplot', type=str)
+    parserLazy.add_argument('-s', '--svs', help='number of satellites plotted (default 4)', required=False, default=4, type=int)
+    parserLazy.add_argument('-m', '--meas', help='signals plotted (default first 2)', nargs='+', required=False, default=None, type=str)
+    parserLazy.add_argument('-w', '--window', help='length of the time window plotted [sec] (default 3600)', required=False, default=3600, type=float)
+    parserLazy.add_argument('-c', '--chunk', help='epochs per dask chunk for the lazy dask read (default 3600)', required=False, default=3600, type=int)
+
+    # appending to a Zarr store
+    parserZarr = subparsers.add_parser('zarr', help='appending parts of a RINEX file to a Zarr store, the first part without a satellite and an observable, checking the store against the file')
+    parserZarr.add_argument('rinex', help='RINEX v3 observation file', type=str)
+    parserZarr.add_argument('-t', '--tlim', help='start / stop time (ISO format)', nargs=2, required=False, default=None, type=str)
+    parserZarr.add_argument('-p', '--parts', help='number of parts appended one after the other (default 3)', required=False, default=3, type=int)
+
+    # CSV export of rnxplot
+    parserCsv = subparsers.add_parser('csv', help='CSV export per GNSS system and signal: column by column versus single pass and parallel')
+    parserCsv.add_argument('obs', help='RINEX v3 or NetCDF observation file', type=str)
+    parserCsv.add_argument('-w', '--workers', help='maximum number of worker processes (default all cores)', required=False, default=os.cpu_count() or 1, type=int)
+
+    # largest jumps between epochs
+    parserJumps = subparsers.add_parser('jumps', help='top-k jumps per satellite: satellite by satellite merging versus the whole array at once')
+    parserJumps.add_argument('obs', help='RINEX v3 or NetCDF observation file', type=str)
+    parserJumps.add_argument('-s', '--signals', help='signals to examine (default all)', nargs='+', required=False, default=None, type=str)
+    parserJumps.add_argument('-k', '--jumps', help='number of largest positive / negative jumps per satellite (default 3)', required=False, default=3, type=int)
+
+    # building the observation plots of rnxplot
+    parserPlot = subparsers.add_parser('plot', help='build time of the observation plots versus number of satellites and signals')
+    parserPlot.add_argument('obs', help='RINEX v3 or NetCDF observation file', type=str)
+    parserPlot.add_argument('-n', '--nrsvs', help='numbers of satellites plotted (default 4 10 20 40)', nargs='+', required=False, default=[4, 10, 20, 40], type=int)
+    parserPlot.add_argument('-s', '--signals', help='numbers of signals plotted (default 1 2 4)', nargs='+', required=False, default=[1, 2, 4], type=int)
+
+    # drawing the observation plots of rnxplot
+    parserDraw = subparsers.add_parser('draw', help='draw, redraw, pan and zoom time of the observation plots: a line per satellite versus one artist per subplot, all epochs versus downsampled')
+    parserDraw.add_argument('obs', help='RINEX v3 or NetCDF observation file', type=str)
+    parserDraw.add_argument('-n', '--nrsvs', help='numbers of satellites plotted (default 10 40)', nargs='+', required=False, default=[10, 40], type=int)
+    parserDraw.add_argument('-s', '--signals', help='number of signals (subplots) plotted (default 4)', required=False, default=4, type=int)
+
+    # headless rendering of the plots of rnxplot
+    parserBatch = subparsers.add_parser('batch', help='figures per second of the headless rendering of the observation plots per signal type versus the number of processes')
+    parserBatch.add_argument('obs', help='RINEX v3 or NetCDF observation file', type=str)
+    parserBatch.add_argument('-n', '--nrsvs', help='number of satellites plotted (default 40)', required=False, default=40, type=int)
+    parserBatch.add_argument('-w', '--workers', help='numbers of rendering processes (default 1 2 4)', nargs='+', required=False, default=[1, 2, 4], type=int)
+
+    # signal difference of rnxdiff
+    parserDiff = subparsers.add_parser('diff', help='signal difference, moving average and statistics of rnxdiff: PRN by PRN on the dataframe versus all PRNs as one array')
+    parserDiff.add_argument('csv', help='CSV files of both signals created by rnxplot', nargs=2, type=str)
+    parserDiff.add_argument('-m', '--movavg', help='moving averages of the difference [epochs] (default 60 600)', nargs='+', required=False, default=[60, 600], type=int)
+
+    # input of rnxdiff
+    parserDiffIn = subparsers.add_parser('diffinput', help='input of the signals of rnxdiff: CSV export and read back versus reading the observation file directly')
+    parserDiffIn.add_argument('obs', help='NetCDF file or Zarr store of the observations', type=str)
+    parserDiffIn.add_argument('-g', '--gnss', help='GNSS system identifier (default E)', required=False, default='E', type=str)
+    parserDiffIn.add_argument('-s', '--signals', help='signals to compare (default C1C C5Q)', nargs=2, required=False, default=['C1C', 'C5Q'], type=str)
+
+    # streaming statistics of rnxdiff
+    parserDiffStream = subparsers.add_parser('diffstream', help='statistics of the signal difference of rnxdiff: all epochs in memory versus chunk by chunk')
+    parserDiffStream.add_argument('obs', help='NetCDF file or Zarr store of the observations', type=str)
+    parserDiffStream.add_argument('-g', '--gnss', help='GNSS system identifier (default E)', required=False, default='E', type=str)
+    parserDiffStream.add_argument('-s', '--signals', help='signals to compare (default C1C C5Q)', nargs=2, required=False, default=['C1C', 'C5Q'], type=str)
+    parserDiffStream.add_argument('-m', '--movavg', help='moving average of the difference [epochs] (default 600)', required=False, default=600, type=int)
+    parserDiffStream.add_argument('-c', '--chunks', help='numbers of epochs per chunk (default 3600 14400)', nargs='+', required=False, default=[3600, 14400], type=int)
+
+    # alignment of the CSV files of rnxdiff
+    parserDiffAlign = subparsers.add_parser('diffalign', help='alignment of the CSV files of both signals of rnxdiff: outer merge on time versus integer grid of epochs')
+    parserDiffAlign.add_argument('csv', help='CSV files of both signals created by rnxplot', nargs=2, type=str)
+    parserDiffAlign.add_argument('-d', '--decimate', help='interval [s] of the decimated second signal (default 30)', required=False, default=30, type=int)
+
+    # lookups of the observation codes
+    parserSignals = subparsers.add_parser('signals', help='lookups per second of the signal type and description of the observation codes: walking the nested dicts versus the index built at import')
+    parserSignals.add_argument('-n', '--number', help='number of lookups of all observation codes (default 100)', required=False, default=100, type=int)
+
+    # conversion of the epochs to GPS week and time of week
+    parserTime = subparsers.add_parser('gpstime', help='conversion of UTC epochs to GPS week and time of week and back: epoch by epoch versus whole arrays')
+    parserTime.add_argument('-s', '--start', help='first UTC epoch (ISO format, default 2019-08-07T00:00:00)', required=False, default='2019-08-07T00:00:00', type=str)
+    parserTime.add_argument('-n', '--number', help='number of epochs (default 864000)', required=False, default=864000, type=int)
+    parserTime.add_argument('-i', '--interval', help='interval between epochs [ms] (default 100)', required=False, default=100, type=int)
+
+    # redirected stdout of rnxplot
+    parserConsole = subparsers.add_parser('console', help='stdout redirected to the rnxplot display: a queue message per write versus a line-capped buffer drained at a fixed frame rate')
+    parserConsole.add_argument('-n', '--number', help='number of lines printed (default 200000)', required=False, default=200000, type=int)
+    parserConsole.add_argument('-i', '--interval', help='interval between two display updates [ms] (default 50)', required=False, default=50, type=int)
+    parserConsole.add_argument('-m', '--maxlines', help='number of lines kept for display (default 10000)', required=False, default=10000, type=int)
+
+    args = parser.parse_args(argv[1:])
+
+    return args
+
+
+def timeIt(func, *args, **kwargs):
+    """
+    runs func and returns its result and the elapsed wall time in seconds
+    """
+    tStart = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - tStart
+
+
+def benchObs(args, logger: logging.Logger):
+    """
+    compares the throughput (MB/s and epochs/s) of the native RINEX v3 reader with georinex.load
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import georinex as gr
+    from rinex import rinex_obs3
+
+    sizeMB = os.path.getsize(args.rinex) / 1e6
+    dLoad = {'use': args.use, 'meas': args.meas, 'tlim': args.tlim, 'useindicators': args.indicators, 'interval': args.interval}
+
+    dEngines = {'native': rinex_obs3.rinexobs3}
+    if not args.skipGeorinex:
+        dEngines['georinex'] = gr.load
+
+    dObs = {}
+    for engine, loader in dEngines.items():
+        logger.info('{func:s}: loading {file:s} using {engine:s}'.format(file=args.rinex, engine=engine, func=cFuncName))
+        dObs[engine], elapsed = timeIt(loader, args.rinex, **dLoad)
+        nrEpochs = dObs[engine].sizes['time']
+        print('{engine:>10s}: {elapsed:8.2f} s  {mbs:8.2f} MB/s  {eps:10.1f} epochs/s  ({epochs:d} epochs, {svs:d} SVs, {vars:d} variables)'.format(engine=engine, elapsed=elapsed, mbs=sizeMB / elapsed, eps=nrEpochs / elapsed, epochs=nrEpochs, svs=dObs[engine].sizes['sv'], vars=len(dObs[engine].data_vars)))
+
+    if 'georinex' in dObs:
+        print('{:>10s}: {!s}'.format('identical', dObs['native'].equals(dObs['georinex'])))
+
+
+def benchIndex(args, logger: logging.Logger):
+    """
+    times building and reusing the epoch index and reading a time window with and without the index
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import georinex as gr
+    from rinex import rinex_obs3, rinex_index
+
+    logger.info('{func:s}: epoch index for {file:s}'.format(file=args.rinex, func=cFuncName))
+
+    dIndex, elapsed = timeIt(rinex_index.loadEpochIndex, args.rinex, rebuild=True)
+    print('{step:>20s}: {elapsed:8.3f} s  ({epochs:d} epochs)'.format(step='build index', elapsed=elapsed, epochs=len(dIndex['time'])))
+    _, elapsed = timeIt(rinex_index.loadEpochIndex, args.rinex)
+    print('{step:>20s}: {elapsed:8.3f} s'.format(step='reuse index', elapsed=elapsed))
+    _, elapsed = timeIt(gr.gettime, args.rinex)
+    print('{step:>20s}: {elapsed:8.3f} s'.format(step='georinex gettime', elapsed=elapsed))
+
+    for useIndex in [False, True]:
+        obs, elapsed = timeIt(rinex_obs3.rinexobs3, args.rinex, tlim=args.tlim, useIndex=useIndex)
+        print('{step:>20s}: {elapsed:8.3f} s  ({epochs:d} epochs)'.format(step='window read' + (' (index)' if useIndex else ''), elapsed=elapsed, epochs=obs.sizes['time']))
+
+
+def benchParallel(args, logger: logging.Logger):
+    """
+    times the native RINEX v3 reader for 1 up to all worker processes and checks the result equals the serial read
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    from rinex import rinex_obs3, rinex_index
+
+    logger.info('{func:s}: parallel parsing of {file:s} using up to {workers:d} processes'.format(file=args.rinex, workers=args.workers, func=cFuncName))
+
+    # build the index once so that it is not part of the timings
+    rinex_index.loadEpochIndex(args.rinex)
+
+    sizeMB = os.path.getsize(args.rinex) / 1e6
+    nrWorkers = sorted(set([2**i for i in range(args.workers.bit_length()) if 2**i < args.workers] + [args.workers]))
+
+    obsSerial = None
+    for workers in nrWorkers:
+        obs, elapsed = timeIt(rinex_obs3.rinexobs3, args.rinex, tlim=args.tlim, workers=workers)
+        if obsSerial is None:
+            obsSerial, elapsedSerial = obs, elapsed
+        print('{workers:>3d} workers: {elapsed:8.2f} s  {mbs:8.2f} MB/s  speed-up {speedup:5.2f}  identical {same!s}'.format(workers=workers, elapsed=elapsed, mbs=sizeMB / elapsed, speedup=elapsedSerial / elapsed, same=obs.equals(obsSerial)))
+
+
+def decompressToDisk(crxName: str, dirName: str) -> Tuple[str, int]:
+    """
+    expands a (gzip compressed) Compact RINEX file to a RINEX file in dirName, using CRX2RNX when available
+
+    returns: name of the RINEX file and number of bytes written to disk
+    """
+    from rinex import rinex_crx
+
+    written = 0
+    baseName = os.path.basename(crxName)
+
+    # gzip -d to disk
+    if crxName.endswith('.gz'):
+        baseName = baseName[:-3]
+        with gzip.open(crxName, 'rb') as fIn, open(os.path.join(dirName, baseName), 'wb') as fOut:
+            shutil.copyfileobj(fIn, fOut)
+        crxName = os.path.join(dirName, baseName)
+        written += os.path.getsize(crxName)
+
+    # CRX2RNX to disk
+    rnxName = os.path.join(dirName, baseName + '.rnx')
+    if shutil.which('CRX2RNX') is not None:
+        with open(crxName, 'rb') as fIn, open(rnxName, 'wb') as fOut:
+            subprocess.run([shutil.which('CRX2RNX'), '-'], stdin=fIn, stdout=fOut, check=True)
+    else:
+        with rinex_crx.CrxReader(crxName) as fIn, open(rnxName, 'w') as fOut:
+            fOut.writelines(fIn)
+    written += os.path.getsize(rnxName)
+
+    return rnxName, written
+
+
+def benchCrx(args, logger: logging.Logger):
+    """
+    compares loading a Compact RINEX file by streaming decoding with expanding it to disk before parsing
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    from rinex import rinex_obs3
+
+    logger.info('{func:s}: loading Compact RINEX file {file:s}'.format(file=args.crx, func=cFuncName))
+
+    sizeCrx = os.path.getsize(args.crx)
+
+    # streaming: gzip -> CRX -> RINEX lines -> reader, the first read is not timed (imports and caches)
+    rinex_obs3.rinexobs3(args.crx, use=args.use, meas=args.meas)
+    obsStream, elapsedStream = timeIt(rinex_obs3.rinexobs3, args.crx, use=args.use, meas=args.meas)
+
+    # decompress to disk, then parse
+    with tempfile.TemporaryDirectory() as dirName:
+        tStart = time.perf_counter()
+        (rnxName, written), elapsedExpand = timeIt(decompressToDisk, args.crx, dirName)
+        obsDisk, elapsedParse = timeIt(rinex_obs3.rinexobs3, rnxName, use=args.use, meas=args.meas)
+        elapsedDisk = time.perf_counter() - tStart
+        # the compressed file, the expanded file(s) and the RINEX file again for parsing
+        read = sizeCrx + written
+
+    print('{path:>20s}: {elapsed:8.2f} s  read {read:10.1f} MB  written {written:10.1f} MB'.format(path='streaming', elapsed=elapsedStream, read=sizeCrx / 1e6, written=0))
+    print('{path:>20s}: {elapsed:8.2f} s  read {read:10.1f} MB  written {written:10.1f} MB  (expand {expand:.2f} s, parse {parse:.2f} s)'.format(path='decompress to disk', elapsed=elapsedDisk, read=read / 1e6, written=written / 1e6, expand=elapsedExpand, parse=elapsedParse))
+
+    obsDisk.attrs['filename'] = obsStream.attrs['filename']
+    print('{path:>20s}: {same!s}'.format(path='identical', same=obsStream.identical(obsDisk)))
+
+
+def benchCache(args, logger: logging.Logger):
+    """
+    times reading a selection without cache, from an exact cache hit and a subset from a cached superset
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    from rinex import rinex_obs3, rinex_cache
+
+    logger.info('{func:s}: observation cache for {file:s}'.format(file=args.rinex, func=cFuncName))
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        cache = rinex_cache.ObsCache(cacheDir=args.dir if args.dir is not None else tmpDir)
+        cache.clear()
+
+        dLoad = {'tlim': args.tlim, 'useindicators': True}
+        obs, elapsed = timeIt(rinex_obs3.rinexobs3, args.rinex, **dLoad)
+        print('{step:>20s}: {elapsed:8.3f} s'.format(step='parse', elapsed=elapsed))
+        _, elapsed = timeIt(cache.store, args.rinex, obs, **dLoad)
+        print('{step:>20s}: {elapsed:8.3f} s'.format(step='store', elapsed=elapsed))
+        obsHit, elapsed = timeIt(cache.lookup, args.rinex, **dLoad)
+        print('{step:>20s}: {elapsed:8.3f} s  identical {same!s}'.format(step='exact hit', elapsed=elapsed, same=obsHit.equals(obs)))
+
+        # subset: the first GNSS, its first observable type, half the time span and no indicators
+        tStart, tStop = [obs.time.values[0], obs.time.values[obs.sizes['time'] // 2]]
+        dSubset = {'tlim': [str(tStart), str(tStop)], 'use': obs.sv.values[0][0], 'meas': list(obs.data_vars)[0][:2], 'useindicators': False}
+        obsSub, elapsedHit = timeIt(cache.lookup, args.rinex, **dSubset)
+        obsRead, elapsedRead = timeIt(rinex_obs3.rinexobs3, args.rinex, **dSubset)
+        print('{step:>20s}: {elapsed:8.3f} s  (parse {read:.3f} s)  identical {same!s}'.format(step='subset hit', elapsed=elapsedHit, read=elapsedRead, same=obsSub.equals(obsRead)))
+
+        # observables only: the observable type observed by the fewest satellites, the others keep their epoch records as in a direct read
+        obsTypes = sorted(set([name[:2] for name in obs.data_vars if not name.endswith(('lli', 'ssi'))]))
+        nrSVs = {obsType: int(np.any([obs[name].notnull().any(dim='time').values for name in obs.data_vars if name.startswith(obsType)], axis=0).sum()) for obsType in obsTypes}
+        dMeas = {'tlim': args.tlim, 'meas': [min(obsTypes, key=nrSVs.get)], 'useindicators': False}
+        obsSub, elapsedHit = timeIt(cache.lookup, args.rinex, **dMeas)
+        obsRead, elapsedRead = timeIt(rinex_obs3.rinexobs3, args.rinex, **dMeas)
+        print('{step:>20s}: {elapsed:8.3f} s  (parse {read:.3f} s)  identical {same!s}  ({meas:s}: {svs:d} / {nrSVs:d} SVs)'.format(step='observables hit', elapsed=elapsedHit, read=elapsedRead, same=obsSub.equals(obsRead), meas=dMeas['meas'][0], svs=nrSVs[dMeas['meas'][0]], nrSVs=obsRead.sizes['sv']))
+
+
+def benchNetCDF(args, logger: logging.Logger):
+    """
+    reports file size, write time and the latency of reading a time window of all satellites and the time series of a single satellite for the NetCDF layouts
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    import xarray
+    from rinex import rinex_obs3, rinex_netcdf
+
+    logger.info('{func:s}: NetCDF layouts for {file:s}'.format(file=args.rinex, func=cFuncName))
+
+    obs = rinex_obs3.rinexobs3(args.rinex, tlim=args.tlim, useindicators=True)
+
+    # the time window in the middle of the observations and the satellite with most observations
+    tMid = obs.time.values[obs.sizes['time'] // 2]
+    window = slice(tMid, tMid + np.timedelta64(int(args.window * 1e9), 'ns'))
+    sv = obs.sv.values[int(np.argmax(obs[list(obs.data_vars)[0]].count(dim='time').values))]
+
+    def readWindow(ncName: str):
+        with xarray.open_dataset(ncName, group='OBS') as nc:
+            return nc.sel(time=window).load()
+
+    def readSV(ncName: str):
+        with xarray.open_dataset(ncName, group='OBS') as nc:
+            return nc.sel(sv=sv).load()
+
+    print('{layout:>10s} {shuffle:>8s} {dtypes:>9s} {chunks:>12s} {size:>9s} {write:>8s} {window:>10s} {sv:>10s}'.format(layout='layout', shuffle='shuffle', dtypes='dtypes', chunks='chunks', size='MB', write='write s', window='window ms', sv='SV ms'))
+
+    configs = [(layout, shuffle, 'lossless') for layout in rinex_netcdf.dLayouts for shuffle in [False, True]] + [('balanced', True, 'compact')]
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for layout, shuffle, dtypes in configs:
+            ncName = os.path.join(tmpDir, '{:s}-{!s}-{:s}.nc'.format(layout, shuffle, dtypes))
+
+            _, elapsedWrite = timeIt(rinex_netcdf.writeObs, ncName, obs, layout=layout, shuffle=shuffle, dtypes=dtypes)
+            _, elapsedWindow = timeIt(readWindow, ncName)
+            _, elapsedSV = timeIt(readSV, ncName)
+
+            chunks = rinex_netcdf.chunkShape(obs, layout)
+            print('{layout:>10s} {shuffle!s:>8s} {dtypes:>9s} {chunks:>12s} {size:9.1f} {write:8.2f} {window:10.1f} {sv:10.1f}'.format(layout=layout, shuffle=shuffle, dtypes=dtypes, chunks='-' if chunks is None else '{:d}x{:d}'.format(*chunks), size=os.path.getsize(ncName) / 1e6, write=elapsedWrite, window=elapsedWindow * 1000, sv=elapsedSV * 1000))
+
+
+def benchZarr(args, logger: logging.Logger):
+    """
+    appends the observations in parts to a Zarr store as rnxstore does with daily files, the first part lacks the last satellite and the last observable so that
+    the later appends add them, and checks that the store holds the observations of the file
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    from rinex import rinex_obs3, rinex_zarr
+
+    obs = rinex_obs3.rinexobs3(args.rinex, tlim=args.tlim).sortby('sv')
+    newSV = str(obs.sv.values[-1])
+    newVar = list(obs.data_vars)[-1]
+    bounds = np.linspace(0, obs.sizes['time'], args.parts + 1).astype(int)
+    logger.info('{func:s}: {nr:d} parts of {file:s}, {sv:s} and {var:s} added by the second part'.format(nr=args.parts, file=args.rinex, sv=newSV, var=newVar, func=cFuncName))
+
+    print('{part:>5s} {epochs:>7s} {svs:>5s} {vars:>5s} {elapsed:>9s}'.format(part='part', epochs='epochs', svs='SVs', vars='obs', elapsed='append s'))
+    with tempfile.TemporaryDirectory() as tmpDir:
+        storeName = os.path.join(tmpDir, 'obs.zarr')
+        for part in range(args.parts):
+            data = obs.isel(time=slice(bounds[part], bounds[part + 1]))
+            if part == 0:
+                data = data.sel(sv=obs.sv.values[:-1])[[name for name in obs.data_vars if name != newVar]]
+
+            nrEpochs, elapsed = timeIt(rinex_zarr.appendObs, storeName, data)
+            print('{part:5d} {epochs:7d} {svs:5d} {vars:5d} {elapsed:9.3f}'.format(part=part + 1, epochs=nrEpochs, svs=data.sizes['sv'], vars=len(data.data_vars), elapsed=elapsed))
+
+        # the satellite and the observable added later hold no observations in the first part
+        with rinex_zarr.openStore(storeName) as store:
+            store = store.load()
+        svs = [str(sv) for sv in store.sv.values.tolist()]
+        expected = obs.copy(deep=True)
+        expected[newVar][:bounds[1]] = np.nan
+        for name in obs.data_vars:
+            expected[name][:bounds[1], -1] = np.nan
+        same = svs == [str(sv) for sv in obs.sv.values] and sorted(store.data_vars) == sorted(obs.data_vars) and all([np.array_equal(store[name].values, expected[name].values, equal_nan=True) for name in obs.data_vars])
+
+    print('{nr:d} epochs of {nrSVs:d} satellites and {nrVars:d} observables in the store, identical {same!s}'.format(nr=store.sizes['time'], nrSVs=len(svs), nrVars=len(store.data_vars), same=same))
+
+
+def runDisplay(ncName: str, lazy: bool, chunks: dict, nrSVs: int, signals: list, window: float) -> dict:
+    """
+    opens the NetCDF file as rnxplot does and selects the satellites, signals and time window for plotting
+
+    returns the time to first display (coordinates available), the time to read the selection and the peak resident memory in MB above the memory after the imports
+    """
+    import resource
+    import numpy as np
+    import xarray
+    from rinex import rinex_netcdf
+
+    # the first open loads the NetCDF library and the xarray backends, not part of the timings
+    xarray.open_dataset(ncName, group='OBS').close()
+
+    # ru_maxrss is in kB on linux
+    rssStart = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tStart = time.perf_counter()
+    obsData = rinex_netcdf.openObs(ncName, lazy=lazy, chunks=chunks)
+    # what displayObservations needs to show the selection widgets
+    svs = np.sort(obsData.coords['sv'].values)
+    signals = signals or [k for k, _ in obsData.data_vars.items()][:2]
+    times = obsData.coords['time'].values
+    tDisplay = time.perf_counter() - tStart
+    rssDisplay = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tMid = times[len(times) // 2]
+    tStart = time.perf_counter()
+    selection = rinex_netcdf.selectWindow(obsData, svs=svs[:nrSVs], signals=signals, tlim=[tMid, tMid + np.timedelta64(int(window * 1e9), 'ns')])
+    tSelect = time.perf_counter() - tStart
+    rssSelect = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {'display': tDisplay, 'select': tSelect, 'rssDisplay': (rssDisplay - rssStart) / 1e3, 'rssSelect': (rssSelect - rssStart) / 1e3, 'values': int(sum([selection[k].size for k in selection.data_vars]))}
+
+
+def benchLazy(args, logger: logging.Logger):
+    """
+    reports time to first display and peak resident memory for reading the NetCDF file at once, lazily and lazily with dask chunks
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    logger.info('{func:s}: eager versus lazy reading of {file:s}'.format(file=args.netcdf, func=cFuncName))
+
+    print('{mode:>10s} {display:>11s} {select:>10s} {rssDisplay:>11s} {rssSelect:>10s} {values:>9s}'.format(mode='mode', display='display ms', select='select ms', rssDisplay='display MB', rssSelect='select MB', values='values'))
+
+    modes = [('eager', False, None), ('lazy', True, None), ('dask', True, {'time': args.chunk})]
+    for mode, lazy, chunks in modes:
+        # each mode in a fresh process so that its peak memory is not hidden by an earlier one
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            dRun = executor.submit(runDisplay, args.netcdf, lazy, chunks, args.svs, args.meas, args.window).result()
+
+        print('{mode:>10s} {display:11.1f} {select:10.1f} {rssDisplay:11.1f} {rssSelect:10.1f} {values:9d}'.format(mode=mode, display=dRun['display'] * 1000, select=dRun['select'] * 1000, rssDisplay=dRun['rssDisplay'], rssSelect=dRun['rssSelect'], values=dRun['values']))
+
+
+def loadObs(fn: str):
+    """
+    reads all observations of a RINEX v3 or NetCDF file
+    """
+    from rinex import rinex_obs3, rinex_netcdf
+
+    if fn.endswith('.nc'):
+        return rinex_netcdf.openObs(fn, lazy=False)
+
+    return rinex_obs3.rinexobs3(fn)
+
+
+def columnCSVs(obs, csvDir: str, obsName: str):
+    """
+    CSV export as done before by rnxplot: per GNSS system and signal the columns are added satellite by satellite
+    """
+    import numpy as np
+    import pandas as pd
+    from rinex import rinex_csv
+
+    listSVs = np.sort(obs.coords['sv'].values)
+    for gnss in set([sv[0] for sv in listSVs]):
+        for st in obs.data_vars:
+            dfObs = pd.DataFrame(index=obs.time.values)
+            dfObs.index.name = 'time'
+            for sv in listSVs:
+                if sv.startswith(gnss):
+                    dfObs[sv] = obs[st].sel(sv=sv).values
+            dfObs.to_csv(rinex_csv.csvName(csvDir, obsName, gnss, st))
+
+
+def benchCsv(args, logger: logging.Logger):
+    """
+    times the CSV export column by column, in a single pass and in a single pass with the signals in parallel, checking the CSV files are identical
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import filecmp
+    from rinex import rinex_csv
+
+    obs = loadObs(args.obs)
+    obsName = os.path.basename(args.obs)
+    logger.info('{func:s}: CSV export of {nrSVs:d} satellites and {nrSignals:d} signals over {nrEpochs:d} epochs'.format(nrSVs=obs.sizes['sv'], nrSignals=len(obs.data_vars), nrEpochs=obs.sizes['time'], func=cFuncName))
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        dirs = {mode: os.path.join(tmpDir, mode) for mode in ['column', 'single', 'parallel']}
+        for dirName in dirs.values():
+            os.makedirs(dirName)
+
+        _, elapsedColumn = timeIt(columnCSVs, obs, dirs['column'], obsName)
+        csvNames, elapsedSingle = timeIt(rinex_csv.exportSignals, obs, dirs['single'], obsName, workers=1)
+        _, elapsedParallel = timeIt(rinex_csv.exportSignals, obs, dirs['parallel'], obsName, workers=args.workers)
+
+        names = [os.path.basename(csvName) for csvName in csvNames]
+        same = all([filecmp.cmp(os.path.join(dirs['column'], name), os.path.join(dirs[mode], name), shallow=False) for name in names for mode in ['single', 'parallel']])
+        same = same and sorted(names) == sorted(os.listdir(dirs['column']))
+
+    print('{nr:d} CSV files of {nrSVs:d} satellites, {nrSignals:d} signals, {nrEpochs:d} epochs, identical {same!s}'.format(nr=len(names), nrSVs=obs.sizes['sv'], nrSignals=len(obs.data_vars), nrEpochs=obs.sizes['time'], same=same))
+    print('  column by column: {elapsed:8.2f} s'.format(elapsed=elapsedColumn))
+    print('  single pass     : {elapsed:8.2f} s  speed-up {speedup:5.2f}'.format(elapsed=elapsedSingle, speedup=elapsedColumn / elapsedSingle))
+    print('  {workers:>2d} processes    : {elapsed:8.2f} s  speed-up {speedup:5.2f}'.format(workers=args.workers, elapsed=elapsedParallel, speedup=elapsedColumn / elapsedParallel))
+
+
+def mergedJumps(obs, signal: str, k: int):
+    """
+    top-k jumps as done before by rnxplot: per satellite nlargest / nsmallest merged into the jumps of the previous satellites
+    """
+    import pandas as pd
+
+    dfPos = pd.DataFrame(columns=['time'])
+    dfNeg = pd.DataFrame(columns=['time'])
+    for sv in obs.sv:
+        dfObs = obs[signal].sel(sv=sv).to_dataframe()
+        dfObs['ST'] = dfObs[signal].diff()
+
+        if dfPos.shape[0] == 0:
+            dfPos = dfObs['ST'].nlargest(n=k).to_frame()
+            dfNeg = dfObs['ST'].nsmallest(n=k).to_frame()
+        else:
+            dfPos = pd.merge(dfPos, dfObs['ST'].nlargest(n=k).to_frame(), on='time', how='outer')
+            dfNeg = pd.merge(dfNeg, dfObs['ST'].nsmallest(n=k).to_frame(), on='time', how='outer')
+        dfPos.rename(columns={'ST': '{!s}'.format(sv.values)}, inplace=True)
+        dfNeg.rename(columns={'ST': '{!s}'.format(sv.values)}, inplace=True)
+
+    return pd.concat([dfPos, dfNeg]).sort_index(axis=0, kind='mergesort')
+
+
+def benchJumps(args, logger: logging.Logger):
+    """
+    times the top-k jump detection per signal satellite by satellite and on the whole array, checking both find the same jumps
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    from rinex import rinex_jumps
+
+    obs = loadObs(args.obs)
+    signals = args.signals or list(obs.data_vars)
+    logger.info('{func:s}: top-{k:d} jumps of {nrSVs:d} satellites over {nrEpochs:d} epochs'.format(k=args.jumps, nrSVs=obs.sizes['sv'], nrEpochs=obs.sizes['time'], func=cFuncName))
+
+    print('{signal:>6s} {merged:>10s} {array:>10s} {speedup:>8s} {rows:>6s} {same:>6s}'.format(signal='signal', merged='merged ms', array='array ms', speedup='speed-up', rows='rows', same='same'))
+    for signal in signals:
+        dfMerged, elapsedMerged = timeIt(mergedJumps, obs, signal, args.jumps)
+        dfArray, elapsedArray = timeIt(rinex_jumps.extremeDiffs, obs, signal, k=args.jumps)
+
+        # rows of the same epoch may be ordered differently
+        cols = list(dfMerged.columns)
+        same = dfMerged.shape == dfArray.shape and dfMerged.reset_index().fillna(0).sort_values(['time'] + cols).values.tolist() == dfArray[cols].reset_index().fillna(0).sort_values(['time'] + cols).values.tolist()
+
+        print('{signal:>6s} {merged:10.1f} {array:10.1f} {speedup:8.1f} {rows:6d} {same!s:>6s}'.format(signal=signal, merged=elapsedMerged * 1000, array=elapsedArray * 1000, speedup=elapsedMerged / elapsedArray, rows=dfArray.shape[0], same=same))
+
+
+def mergedCSVs(csvFiles: list) -> Tuple[object, list, list]:
+    """
+    reads the CSV files of both signals and merges them on time as rnxdiff did before aligning them on a grid of epochs
+
+    returns the merged dataframe, the signals and the PRNs of both signals
+    """
+    import numpy as np
+    import pandas as pd
+
+    signals = [os.path.splitext(csvFile)[0].split('-')[-1] for csvFile in csvFiles]
+    dfObs = []
+    for csvFile, signal in zip(csvFiles, signals):
+        dfObs.append(pd.read_csv(csvFile, sep=',', parse_dates=['time']))
+        dfObs[-1].columns = ['time'] + ['{prn:s}-{st:s}'.format(prn=prn, st=signal) for prn in dfObs[-1].columns[1:]]
+    prns = list(np.intersect1d(*[[col.split('-')[0] for col in df.columns[1:]] for df in dfObs]))
+
+    return pd.merge(dfObs[0], dfObs[1], on=['time'], how='outer'), signals, prns
+
+
+def alignedCSVs(csvFiles: list) -> Tuple[object, list, object]:
+    """
+    reads the CSV files of both signals and aligns them on a grid of epochs as rnxdiff does
+
+    returns the epochs, the PRNs of both signals and the (2, time, prn) array
+    """
+    import numpy as np
+    import pandas as pd
+    from rinex import rinex_diff
+
+    dfObs = [pd.read_csv(csvFile, sep=',') for csvFile in csvFiles]
+    prns = list(np.intersect1d(dfObs[0].columns[1:], dfObs[1].columns[1:]))
+    times, obs = rinex_diff.alignEpochs(times=[pd.to_datetime(df['time']).values for df in dfObs], values=[df[prns].values for df in dfObs])
+
+    return times, prns, obs
+
+
+def walkedSubTitle(dGNSS: dict, signal: str) -> str:
+    """
+    returns the subtitle of the signal found by walking the nested dict as rinexObsPlot did before the index of the observation codes
+    """
+    from rinex import rinex_observables as rnxobs
+
+    rnxobs.path2Dict = None
+    rnxobs.walk(dGNSS, [], signal)
+    if rnxobs.path2Dict is None:
+        return ''
+
+    subDicts = rnxobs.path2Dict.split('.')[:-1]
+
+    return '{syst:s} {navsv:s} - {signal:s} - {freq:.3f} MHz  '.format(syst=dGNSS['name'], navsv=dGNSS[subDicts[0]][subDicts[1]]['name'], signal=signal, freq=dGNSS[subDicts[0]]['freq'])
+
+
+def indexedSubTitle(gnss: str, signal: str) -> str:
+    """
+    returns the subtitle of the signal from the index of the observation codes as rinexObsPlot does
+    """
+    from rinex import rinex_observables as rnxobs
+
+    info = rnxobs.signalInfo(gnss, signal)
+    if info is None:
+        return ''
+
+    return '{syst:s} {navsv:s} - {signal:s} - {freq:.3f} MHz  '.format(syst=info.system, navsv=info.name, signal=signal, freq=info.freq)
+
+
+def scalarWeekTOW(times) -> Tuple[list, list]:
+    """
+    converts the UTC epochs one by one to GPS week and time of week with gpstime
+    """
+    from GNSS import gnss_time
+    from GNSS import gpstime
+
+    weeks, tows = [], []
+    for dt, leap in zip(times.astype('datetime64[us]').tolist(), gnss_time.leapSeconds(times).tolist()):
+        week, tow, _, _ = gpstime.gpsFromUTC(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second + dt.microsecond / 1e6, leapSecs=leap)
+        weeks.append(week)
+        tows.append(tow)
+
+    return weeks, tows
+
+
+def scalarUTC(weeks: list, tows: list, leaps: list) -> list:
+    """
+    converts the GPS weeks and times of week one by one to UTC epochs with gpstime
+    """
+    import datetime
+    from GNSS import gpstime
+
+    utcs = []
+    for week, tow, leap in zip(weeks, tows, leaps):
+        year, month, day, hour, minute, sec = gpstime.UTCFromGps(week, tow, leapSecs=leap)
+        utcs.append(datetime.datetime(year, month, day, hour, minute) + datetime.timedelta(seconds=sec))
+
+    return utcs
+
+
+def benchGpsTime(args, logger: logging.Logger):
+    """
+    times the conversion of UTC epochs to GPS week and time of week and back, epoch by epoch with gpstime and on the whole array with gnss_time, checking both agree
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    from GNSS import gnss_time
+
+    times = np.datetime64(args.start, 'ns') + np.arange(args.number, dtype=np.int64) * np.timedelta64(args.interval, 'ms')
+    logger.info('{func:s}: {nr:d} epochs from {start!s} every {interval:d} ms'.format(nr=args.number, start=times[0], interval=args.interval, func=cFuncName))
+
+    (weeks, tows), elapsedScalarGPS = timeIt(scalarWeekTOW, times)
+    (week, tow), elapsedArrayGPS = timeIt(gnss_time.weekTOW, times, utc=True)
+    utcs, elapsedScalarUTC = timeIt(scalarUTC, weeks, tows, gnss_time.leapSeconds(times).tolist())
+    utc, elapsedArrayUTC = timeIt(gnss_time.timesFromWeekTOW, week, tow, utc=True)
+
+    # the scalar functions keep the fraction of the seconds to about a microsecond
+    errGPS = max(np.max(np.abs(np.asarray(weeks) - week)) * 604800, np.max(np.abs(np.asarray(tows) - tow)))
+    errUTC = np.max(np.abs(np.array(utcs, dtype='datetime64[ns]') - times)).astype(np.int64) / 1e9
+
+    print('{conversion:>12s} {scalar:>10s} {array:>10s} {speedup:>8s} {error:>12s} {exact:>6s}'.format(conversion='conversion', scalar='scalar s', array='array s', speedup='speed-up', error='max diff s', exact='exact'))
+    for conversion, elapsedScalar, elapsedArray, err, exact in [('UTC->GPS', elapsedScalarGPS, elapsedArrayGPS, errGPS, np.array_equal(gnss_time.timesFromWeekTOW(week, tow), gnss_time.utc2gps(times))),
+                                                                ('GPS->UTC', elapsedScalarUTC, elapsedArrayUTC, errUTC, np.array_equal(utc, times))]:
+        print('{conversion:>12s} {scalar:10.3f} {array:10.3f} {speedup:8.1f} {error:12.2e} {exact!s:>6s}'.format(conversion=conversion, scalar=elapsedScalar, array=elapsedArray, speedup=elapsedScalar / elapsedArray, error=err, exact=exact))
+
+
+def printLines(stream, nrLines: int):
+    """
+    prints the lines to the stream as print does, the text and the line end in separate writes
+    """
+    for i in range(nrLines):
+        print('    epoch {:7d}  C1C  L1C  S1C  C5Q  L5Q  S5Q  (sv: 34, time: 86400)'.format(i), file=stream)
+
+
+def queuedConsole(nrLines: int) -> Tuple[list, float]:
+    """
+    prints the lines through a multiprocessing queue, a receiving thread delivers every write to the display as rnxplot did
+    returns the deliveries and the time spent printing
+    """
+    import threading
+    from multiprocessing import Queue
+
+    class WriteStream(object):
+        def __init__(self, queue):
+            self.queue = queue
+
+        def write(self, text):
+            self.queue.put(text)
+
+    queue = Queue()
+    deliveries = []
+
+    def receive():
+        while True:
+            text = queue.get()
+            if text is None:
+                break
+            deliveries.append(text)
+
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+    _, elapsedPrint = timeIt(printLines, WriteStream(queue), nrLines)
+    queue.put(None)
+    receiver.join()
+
+    return deliveries, elapsedPrint
+
+
+def bufferedConsole(nrLines: int, interval: float, maxLines: int) -> Tuple[list, float]:
+    """
+    prints the lines to a ConsoleBuffer, a thread drains it every interval seconds and delivers the text to the display
+    returns the deliveries and the time spent printing
+    """
+    import threading
+    from ampyutils import console_buffer
+
+    buffer = console_buffer.ConsoleBuffer(maxLines=maxLines)
+    deliveries = []
+    done = threading.Event()
+
+    def frames():
+        while not done.wait(interval):
+            text = buffer.drain()
+            if text:
+                deliveries.append(text)
+        text = buffer.drain()
+        if text:
+            deliveries.append(text)
+
+    drainer = threading.Thread(target=frames)
+    drainer.start()
+    _, elapsedPrint = timeIt(printLines, buffer, nrLines)
+    done.set()
+    drainer.join()
+
+    return deliveries, elapsedPrint
+
+
+def benchConsole(args, logger: logging.Logger):
+    """
+    times printing lines to the display of rnxplot through a queue versus a line-capped buffer drained at a fixed frame rate, counting the deliveries (Qt signals and widget updates) and the lines delivered
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    logger.info('{func:s}: {nr:d} lines printed, display updated every {interval:d} ms keeping {max:d} lines'.format(nr=args.number, interval=args.interval, max=args.maxlines, func=cFuncName))
+
+    dConsoles = {
+        'queue': lambda: queuedConsole(args.number),
+        'buffer': lambda: bufferedConsole(args.number, args.interval / 1000., args.maxlines),
+    }
+
+    print('{console:>8s} {print:>10s} {total:>10s} {lines:>12s} {deliveries:>12s} {delivered:>10s} {last:>6s}'.format(console='console', print='print s', total='total s', lines='lines/s', deliveries='deliveries', delivered='lines', last='last'))
+    for console, func in dConsoles.items():
+        (deliveries, elapsedPrint), elapsed = timeIt(func)
+        text = ''.join(deliveries)
+        print('{console:>8s} {print:10.3f} {total:10.3f} {lines:12.0f} {deliveries:12d} {delivered:10d} {last!s:>6s}'.format(console=console, print=elapsedPrint, total=elapsed, lines=args.number / elapsed, deliveries=len(deliveries), delivered=text.count('\n'), last='{:7d}'.format(args.number - 1) in text.rstrip('\n').rsplit('\n', 1)[-1]))
+
+
+def benchSignals(args, logger: logging.Logger):
+    """
+    times the lookups of the signal type and the subtitle of all observation codes by walking the nested dicts and in the index, checking both give the same answers
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    from rinex import rinex_observables as rnxobs
+
+    codes = sorted(rnxobs.dSignalTypeOfCode)
+    keys = sorted(rnxobs.dSignalIndex)
+    logger.info('{func:s}: {nrKeys:d} observation codes of {nrGNSSs:d} GNSS systems, {nr:d} lookups of each'.format(nrKeys=len(keys), nrGNSSs=len(rnxobs.dGNSSs), nr=args.number, func=cFuncName))
+
+    dLookups = {
+        'signal type': ([lambda: [sorted(set(rnxobs.findKeyOfSignal(code, dict(rnxobs.dGAL, **rnxobs.dGPS)))) for code in codes],
+                         lambda: [[rnxobs.signalType(code)] for code in codes]], len(codes)),
+        'subtitle': ([lambda: [walkedSubTitle(rnxobs.dGNSSs[gnss], code) for gnss, code in keys],
+                      lambda: [indexedSubTitle(gnss, code) for gnss, code in keys]], len(keys)),
+    }
+
+    print('{lookup:>12s} {walk:>12s} {index:>12s} {speedup:>8s} {same:>6s}'.format(lookup='lookup', walk='walk /s', index='index /s', speedup='speed-up', same='same'))
+    for lookup, (funcs, nrLookups) in dLookups.items():
+        answers, elapsed = [], []
+        for func in funcs:
+            tStart = time.perf_counter()
+            for _ in range(args.number):
+                answer = func()
+            elapsed.append(time.perf_counter() - tStart)
+            answers.append(answer)
+
+        print('{lookup:>12s} {walk:12.0f} {index:12.0f} {speedup:8.1f} {same!s:>6s}'.format(lookup=lookup, walk=nrLookups * args.number / elapsed[0], index=nrLookups * args.number / elapsed[1], speedup=elapsed[0] / elapsed[1], same=answers[0] == answers[1]))
+
+
+def benchDiffAlign(args, logger: logging.Logger):
+    """
+    times the alignment of both signals read from the CSV files by an outer merge on time and on a grid of epochs, checking both give the same arrays
+
+    The second signal is also aligned after decimating it to an interval of -d seconds.
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    import pandas as pd
+    from rinex import rinex_diff
+
+    dfObs = [pd.read_csv(csvFile, sep=',', parse_dates=['time']) for csvFile in args.csv]
+    prns = list(np.intersect1d(dfObs[0].columns[1:], dfObs[1].columns[1:]))
+    # the second signal decimated, the first one keeps its sampling
+    dfDecimated = dfObs[1][dfObs[1]['time'].values.astype('datetime64[s]').astype(np.int64) % args.decimate == 0]
+
+    def merged(dfs: list):
+        dfs = [df.rename(columns={prn: '{prn:s}-{i:d}'.format(prn=prn, i=i) for prn in prns}) for i, df in enumerate(dfs)]
+        dfMerged = pd.merge(dfs[0], dfs[1], on=['time'], how='outer')
+
+        return dfMerged['time'].values, np.stack([dfMerged[['{prn:s}-{i:d}'.format(prn=prn, i=i) for prn in prns]].values for i in [0, 1]])
+
+    def aligned(dfs: list):
+        return rinex_diff.alignEpochs(times=[df['time'].values for df in dfs], values=[df[prns].values for df in dfs])
+
+    print('{input:>12s} {merged:>10s} {aligned:>11s} {speedup:>8s} {epochs:>7s} {same:>6s}'.format(input='input', merged='merged ms', aligned='aligned ms', speedup='speed-up', epochs='epochs', same='same'))
+    for name, dfs in [('same', dfObs), ('decimated', [dfObs[0], dfDecimated])]:
+        # the first run warms up the caches, not part of the timings
+        merged(dfs)
+        aligned(dfs)
+        (timesMerged, obsMerged), elapsedMerged = timeIt(merged, dfs)
+        (timesAligned, obsAligned), elapsedAligned = timeIt(aligned, dfs)
+
+        # the merge keeps all epochs of the finer sampled signal, the grid only the common ones
+        common = np.isin(timesMerged, timesAligned)
+        same = np.array_equal(timesMerged[common], timesAligned) and np.array_equal(obsMerged[:, common], obsAligned, equal_nan=True)
+        logger.info('{func:s}: {name:s}: {nrMerged:d} merged epochs, {nrAligned:d} aligned epochs'.format(name=name, nrMerged=len(timesMerged), nrAligned=len(timesAligned), func=cFuncName))
+
+        print('{input:>12s} {merged:10.1f} {aligned:11.1f} {speedup:8.1f} {epochs:7d} {same!s:>6s}'.format(input=name, merged=elapsedMerged * 1000, aligned=elapsedAligned * 1000, speedup=elapsedMerged / elapsedAligned, epochs=len(timesAligned), same=same))
+
+
+def loopedDifference(dfObs, signals: list, prns: list, movAvg: int) -> dict:
+    """
+    signal difference as done before by rnxdiff: the difference and moving average columns added PRN by PRN to the dataframe
+    """
+    dStats = {}
+    for prn in prns:
+        prnMA = '{prn:s}-MA'.format(prn=prn)
+        dfObs[prn] = dfObs['{prn:s}-{st:s}'.format(prn=prn, st=signals[0])] - dfObs['{prn:s}-{st:s}'.format(prn=prn, st=signals[1])]
+        dfObs[prnMA] = dfObs[prn].rolling(window=movAvg).mean()
+        dStats[prn] = {'count': dfObs[prnMA].count(), 'mean': dfObs[prnMA].mean(), 'max': dfObs[prnMA].max(), 'min': dfObs[prnMA].min()}
+
+    return dStats
+
+
+def arrayDifference(dfObs, signals: list, prns: list, movAvg: int):
+    """
+    signal difference as done by rnxdiff: all PRNs at once on the (time, prn) arrays
+    """
+    import numpy as np
+    from rinex import rinex_diff
+
+    obs = np.stack([dfObs[['{prn:s}-{st:s}'.format(prn=prn, st=signal) for prn in prns]].values for signal in signals])
+
+    return rinex_diff.SignalDiff(times=dfObs['time'].values, prns=prns, signals=signals, obs=obs, movAvg=movAvg)
+
+
+def benchDiff(args, logger: logging.Logger):
+    """
+    times the signal difference, moving average and statistics PRN by PRN and for all PRNs at once, checking both give the same statistics
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+
+    dfObs, signals, prns = mergedCSVs(args.csv)
+    logger.info('{func:s}: difference {st0:s}-{st1:s} of {nrPRNs:d} PRNs over {nrEpochs:d} epochs'.format(st0=signals[0], st1=signals[1], nrPRNs=len(prns), nrEpochs=dfObs.shape[0], func=cFuncName))
+
+    print('{movavg:>6s} {looped:>10s} {array:>10s} {speedup:>8s} {same:>6s}'.format(movavg='movavg', looped='looped ms', array='array ms', speedup='speed-up', same='same'))
+    for movAvg in args.movavg:
+        dStats, elapsedLooped = timeIt(loopedDifference, dfObs.copy(), signals, prns, movAvg)
+        sigDiff, elapsedArray = timeIt(arrayDifference, dfObs, signals, prns, movAvg)
+
+        same = all(np.allclose([dStats[prn][key] for key in dStats[prn]], [sigDiff.stats[prn][key] for key in dStats[prn]], equal_nan=True) for prn in prns)
+        print('{movavg:6d} {looped:10.1f} {array:10.1f} {speedup:8.1f} {same!s:>6s}'.format(movavg=movAvg, looped=elapsedLooped * 1000, array=elapsedArray * 1000, speedup=elapsedLooped / elapsedArray, same=same))
+
+
+def benchDiffInput(args, logger: logging.Logger):
+    """
+    times reading both signals of a GNSS system for rnxdiff through the CSV files and directly from the observation file, checking both give the same arrays
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import numpy as np
+    from rinex import rinex_csv, rinex_diff
+
+    def readCSVs(csvDir: str):
+        obsData = rinex_diff.openObservations(args.obs)
+        csvFiles = [name for name in rinex_csv.exportSignals(obsData[args.signals].load(), csvDir=csvDir, obsName='bench', signals=args.signals) if os.path.basename(name).startswith('bench-{gnss:s}-'.format(gnss=args.gnss))]
+        obsData.close()
+        return alignedCSVs(csvFiles)
+
+    def readObs():
+        obsData = rinex_diff.openObservations(args.obs)
+        signals = rinex_diff.systemSignals(obsData, gnss=args.gnss, signals=args.signals)
+        obsData.close()
+
+        return signals
+
+    # the first read loads the NetCDF / Zarr libraries
+    readObs()
+
+    with tempfile.TemporaryDirectory() as csvDir:
+        (timesCSV, prnsCSV, obsCSV), elapsedCSV = timeIt(readCSVs, csvDir)
+    (timesObs, prnsObs, obsObs), elapsedObs = timeIt(readObs)
+    logger.info('{func:s}: signals {st0:s} and {st1:s} of {nrPRNs:d} PRNs over {nrEpochs:d} epochs'.format(st0=args.signals[0], st1=args.signals[1], nrPRNs=len(prnsObs), nrEpochs=len(timesObs), func=cFuncName))
+
+    same = prnsCSV == prnsObs and np.array_equal(timesCSV, timesObs) and np.allclose(obsCSV, obsObs, rtol=0, atol=1e-6, equal_nan=True)
+    print('{input:>15s} {elapsed:>10s} {speedup:>8s} {same:>6s}'.format(input='input', elapsed='elapsed ms', speedup='speed-up', same='same'))
+    print('{input:>15s} {elapsed:10.1f}'.format(input='CSV round-trip', elapsed=elapsedCSV * 1000))
+    print('{input:>15s} {elapsed:10.1f} {speedup:8.1f} {same!s:>6s}'.format(input='observations', elapsed=elapsedObs * 1000, speedup=elapsedCSV / elapsedObs, same=same))
+
+def runDiffStream(obsName: str, gnss: str, signals: list, movAvg: int, chunk: int) -> dict:
+    """
+    calculates the statistics of the moving average of the signal difference with all epochs in memory (chunk None) or chunk by chunk
+
+    returns the statistics, the elapsed time and the peak resident memory in MB above the memory after the imports
+    """
+    import resource
+    from rinex import rinex_diff
+
+    # the first open loads the NetCDF / Zarr libraries, not part of the timings
+    rinex_diff.openObservations(obsName).close()
+    rssStart = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tStart = time.perf_counter()
+    obsData = rinex_diff.openObservations(obsName)
+    if chunk is None:
+        times, prns, obs = rinex_diff.systemSignals(obsData, gnss=gnss, signals=signals)
+        stats = rinex_diff.SignalDiff(times=times, prns=prns, signals=signals, obs=obs, movAvg=movAvg).stats
+    else:
+        streamDiff = None
+        for times, prns, obs in rinex_diff.systemChunks(obsData, gnss=gnss, signals=signals, chunk=chunk):
+            streamDiff = streamDiff or rinex_diff.StreamingDiff(prns=prns, signals=signals, movAvg=movAvg)
+            streamDiff.update(obs)
+        stats = streamDiff.stats
+    obsData.close()
+
+    return {'stats': stats, 'elapsed': time.perf_counter() - tStart, 'rss': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rssStart) / 1e3}
+
+
+def benchDiffStream(args, logger: logging.Logger):
+    """
+    reports time and peak resident memory of the rnxdiff statistics with all epochs in memory and chunk by chunk, checking both give the same statistics
+
+    The counts are equal, the mean, max and min of the moving averages agree within DIFFRTOL / DIFFATOL, the largest difference is reported.
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+
+    logger.info('{func:s}: moving average ({movavg:d} epochs) statistics of {st0:s}-{st1:s} of {file:s}'.format(movavg=args.movavg, st0=args.signals[0], st1=args.signals[1], file=args.obs, func=cFuncName))
+
+    print('{mode:>12s} {elapsed:>10s} {rss:>8s} {diff:>9s} {same:>6s}'.format(mode='epochs', elapsed='elapsed ms', rss='peak MB', diff='max diff', same='same'))
+    dRef = None
+    for chunk in [None] + args.chunks:
+        # each mode in a fresh process so that its peak memory is not hidden by an earlier one
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            dRun = executor.submit(runDiffStream, args.obs, args.gnss, args.signals, args.movavg, chunk).result()
+        dRef = dRef or dRun
+
+        # mean, max and min per PRN, NaN for a PRN without complete moving average in both
+        stats, refStats = [np.array([[dStats['stats'][prn][key] for key in ['mean', 'max', 'min']] for prn in dRef['stats']], dtype=float) for dStats in [dRun, dRef]]
+        diffs = np.abs(stats - refStats)
+        maxDiff = float(np.max(diffs[~np.isnan(diffs)])) if (~np.isnan(diffs)).any() else 0.
+        same = all([dRun['stats'][prn]['count'] == dRef['stats'][prn]['count'] for prn in dRef['stats']]) and np.allclose(stats, refStats, rtol=DIFFRTOL, atol=DIFFATOL, equal_nan=True)
+        print('{mode:>12s} {elapsed:10.1f} {rss:8.1f} {diff:9.1e} {same!s:>6s}'.format(mode='all' if chunk is None else '{:d}'.format(chunk), elapsed=dRun['elapsed'] * 1000, rss=dRun['rss'], diff=maxDiff, same=same))
+
+
+def plotSelection(obs, nrSVs: int, nrSignals: int) -> dict:
+    """
+    returns the dPlot of rnxplot selecting the satellites with most observations, the first signals and all epochs
+    """
+    import numpy as np
+    import pandas as pd
+
+    signals = list(obs.data_vars)[:nrSignals]
+    counts = obs[signals[0]].count(dim='time').values
+    svs = sorted(obs.sv.values[np.argsort(-counts, kind='mergesort')[:nrSVs]].astype(str).tolist())
+
+    dPlot = {}
+    dPlot['Time'] = {'start': pd.Timestamp(obs.time.values[0]).strftime('%Y-%m-%dT%H:%M:%S'), 'end': pd.Timestamp(obs.time.values[-1]).strftime('%Y-%m-%dT%H:%M:%S')}
+    dPlot['SVs'] = svs
+    dPlot['AllSVs'] = obs.sv.values.astype(str).tolist()
+    dPlot['#SVs'] = len(dPlot['AllSVs'])
+    dPlot['Signals'] = signals
+
+    return dPlot
+
+
+def buildSlicedPerSV(obs, dPlot: dict, axes):
+    """
+    plot build as done before: the time window is sliced for each satellite of each signal
+    """
+    import datetime
+
+    timeInterval = [datetime.datetime.strptime(dPlot['Time']['start'], "%Y-%m-%dT%H:%M:%S"), datetime.datetime.strptime(dPlot['Time']['end'], "%Y-%m-%dT%H:%M:%S")]
+    for ax, signal in zip(axes, dPlot['Signals']):
+        for sv in dPlot['SVs']:
+            obsData_time = obs.sel(time=slice(timeInterval[0], timeInterval[1]))
+            ax.plot(obsData_time.time, obsData_time[signal].sel(sv=sv), label=sv, marker='.', markersize=3, linestyle='')
+
+
+def buildPrepared(obs, dPlot: dict, axes):
+    """
+    plot build of rinexObsPlot: the observations are prepared once as arrays
+    """
+    from plot import rinexObsPlot
+
+    dData = rinexObsPlot.prepareObservables(dPlot=dPlot, obsData=obs)
+    for ax, signal in zip(axes, dPlot['Signals']):
+        for iSV, sv in enumerate(dPlot['SVs']):
+            ax.plot(dData['Time'], dData['Signals'][signal][:, iSV], label=sv, marker='.', markersize=3, linestyle='')
+
+
+def benchPlot(args, logger: logging.Logger):
+    """
+    times building the observation plots (creating the artists, without drawing) versus the number of satellites and signals
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    obs = loadObs(args.obs)
+    logger.info('{func:s}: plot build for {nrEpochs:d} epochs'.format(nrEpochs=obs.sizes['time'], func=cFuncName))
+
+    print('{svs:>4s} {signals:>8s} {sliced:>10s} {prepared:>12s} {speedup:>8s}'.format(svs='SVs', signals='signals', sliced='sliced ms', prepared='prepared ms', speedup='speed-up'))
+    for nrSignals in args.signals:
+        for nrSVs in args.nrsvs:
+            dPlot = plotSelection(obs, nrSVs=min(nrSVs, obs.sizes['sv']), nrSignals=min(nrSignals, len(obs.data_vars)))
+
+            # best of 3 builds
+            dElapsed = {'sliced': [], 'prepared': []}
+            for _ in range(3):
+                for name, builder in [('sliced', buildSlicedPerSV), ('prepared', buildPrepared)]:
+                    fig, axes = plt.subplots(nrows=len(dPlot['Signals']), squeeze=False)
+                    dElapsed[name].append(timeIt(builder, obs, dPlot, axes[:, 0])[1])
+                    plt.close(fig)
+            dElapsed = {name: min(elapsed) for name, elapsed in dElapsed.items()}
+
+            print('{svs:4d} {signals:8d} {sliced:10.1f} {prepared:12.1f} {speedup:8.1f}'.format(svs=len(dPlot['SVs']), signals=len(dPlot['Signals']), sliced=dElapsed['sliced'] * 1000, prepared=dElapsed['prepared'] * 1000, speedup=dElapsed['sliced'] / dElapsed['prepared']))
+
+
+def drawFigure(obs, dPlot: dict, singleArtist: bool, downsample: bool) -> dict:
+    """
+    builds the figure of the selected signals as rinexObsPlot does and returns the build, first draw, redraw, pan and zoom times
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from plot import rinexObsPlot, plot_points, plot_downsample
+
+    fig, axes = plt.subplots(nrows=2, ncols=(len(dPlot['Signals']) + 1) // 2, sharex='col', squeeze=False)
+    fig.set_size_inches(18.5, 10.5)
+    colors = [plt.cm.nipy_spectral(i) for i in np.linspace(0, 1, dPlot['#SVs'])]
+    colorSVs = [colors[dPlot['AllSVs'].index(sv)] for sv in dPlot['SVs']]
+
+    def build():
+        dData = rinexObsPlot.prepareObservables(dPlot=dPlot, obsData=obs)
+        for ax, signal in zip(axes.flat, dPlot['Signals']):
+            if singleArtist:
+                plot_points.plotSVs(ax, times=dData['Time'], values=dData['Signals'][signal], colors=colorSVs, markersize=3, cull=downsample)
+                ax.legend(handles=plot_points.legendHandles(svs=dPlot['SVs'], colors=colorSVs, markersize=3), loc='upper right', ncol=16, markerscale=6)
+            else:
+                downsampler = plot_downsample.Downsampler(ax, enabled=downsample)
+                for iSV, sv in enumerate(dPlot['SVs']):
+                    downsampler.plot(dData['Time'], dData['Signals'][signal][:, iSV], label=sv, color=colorSVs[iSV], marker='.', markersize=3, linestyle='')
+                ax.legend(loc='upper right', ncol=16, markerscale=6)
+
+    def pan():
+        # shift the shared time axis by a tenth of its range, as a pan in the Qt window does
+        for ax in axes[0]:
+            xMin, xMax = ax.get_xlim()
+            ax.set_xlim(xMin + (xMax - xMin) / 10, xMax + (xMax - xMin) / 10)
+        fig.canvas.draw()
+
+    def zoom():
+        # zoom in on a tenth of the time axis
+        for ax in axes[0]:
+            xMin, xMax = ax.get_xlim()
+            ax.set_xlim(xMin + (xMax - xMin) * 0.45, xMin + (xMax - xMin) * 0.55)
+        fig.canvas.draw()
+
+    dElapsed = {}
+    dElapsed['build'] = timeIt(build)[1]
+    dElapsed['draw'] = timeIt(fig.canvas.draw)[1]
+    dElapsed['redraw'] = min([timeIt(fig.canvas.draw)[1] for _ in range(3)])
+    dElapsed['pan'] = min([timeIt(pan)[1] for _ in range(3)])
+    dElapsed['zoom'] = timeIt(zoom)[1]
+    plt.close(fig)
+
+    return dElapsed
+
+
+def benchDraw(args, logger: logging.Logger):
+    """
+    times building, drawing, redrawing, panning and zooming the observation plots with a line per satellite versus one artist per subplot,
+    with all epochs or with the epochs drawn at the resolution of the plot
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    obs = loadObs(args.obs)
+    logger.info('{func:s}: plot draw for {nrEpochs:d} epochs'.format(nrEpochs=obs.sizes['time'], func=cFuncName))
+
+    print('{svs:>4s} {artists:>15s} {epochs:>11s} {build:>9s} {draw:>9s} {redraw:>10s} {pan:>8s} {zoom:>8s}'.format(svs='SVs', artists='artists', epochs='epochs', build='build ms', draw='draw ms', redraw='redraw ms', pan='pan ms', zoom='zoom ms'))
+    for nrSVs in args.nrsvs:
+        dPlot = plotSelection(obs, nrSVs=min(nrSVs, obs.sizes['sv']), nrSignals=min(args.signals, len(obs.data_vars)))
+
+        for name, singleArtist in [('line per SV', False), ('one per subplot', True)]:
+            for downsample in [False, True]:
+                dElapsed = drawFigure(obs, dPlot=dPlot, singleArtist=singleArtist, downsample=downsample)
+                print('{svs:4d} {artists:>15s} {epochs:>11s} {build:9.1f} {draw:9.1f} {redraw:10.1f} {pan:8.1f} {zoom:8.1f}'.format(svs=len(dPlot['SVs']), artists=name, epochs='downsampled' if downsample else 'all', **{key: elapsed * 1000 for key, elapsed in dElapsed.items()}))
+
+
+def benchBatch(args, logger: logging.Logger):
+    """
+    times the headless rendering of the observation plots of all signal types for a number of rendering processes
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    import tempfile
+    from plot import plot_batch
+
+    obs = loadObs(args.obs)
+    dPlot = plotSelection(obs, nrSVs=min(args.nrsvs, obs.sizes['sv']), nrSignals=len(obs.data_vars))
+    logger.info('{func:s}: rendering {nrSignals:d} signals of {nrSVs:d} satellites for {nrEpochs:d} epochs'.format(nrSignals=len(dPlot['Signals']), nrSVs=len(dPlot['SVs']), nrEpochs=obs.sizes['time'], func=cFuncName))
+
+    print('{workers:>7s} {figures:>7s} {elapsed:>9s} {rate:>9s}'.format(workers='workers', figures='figures', elapsed='elapsed s', rate='figures/s'))
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmpDir:
+            dPlot['name'] = os.path.join(tmpDir, os.path.basename(args.obs))
+            pltNames, elapsed = plot_batch.renderPlots(jobs=plot_batch.observableJobs(dPlot=dPlot, obsData=obs), workers=workers)
+
+        print('{workers:7d} {figures:7d} {elapsed:9.1f} {rate:9.2f}'.format(workers=workers, figures=len(pltNames), elapsed=elapsed, rate=len(pltNames) / elapsed))
+
+
+def main(argv):
+    """
+    runs the selected benchmark
+    """
+    amc.cBaseName = colored(os.path.basename(__file__), 'yellow')
+
+    args = treatCmdOpts(argv)
+
+    # create logging for better debugging
+    logger = amc.createLoggers(os.path.basename(__file__), dir='.', logLevels=args.logging)
+
+    dBenchmarks = {
+        'obs': benchObs,
+        'index': benchIndex,
+        'parallel': benchParallel,
+        'crx': benchCrx,
+        'cache': benchCache,
+        'netcdf': benchNetCDF,
+        'lazy': benchLazy,
+        'zarr': benchZarr,
+        'csv': benchCsv,
+        'jumps': benchJumps,
+        'plot': benchPlot,
+        'draw': benchDraw,
+        'batch': benchBatch,
+        'diff': benchDiff,
+        'diffinput': benchDiffInput,
+        'diffstream': benchDiffStream,
+        'diffalign': benchDiffAlign,
+        'signals': benchSignals,
+        'gpstime': benchGpsTime,
+        'console': benchConsole,
+    }
+    dBenchmarks[args.bench](args=args, logger=logger)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -11,6 +11,7 @@ from datetime import datetime
 import logging
 
 from rinex import rinex_observables as rnxobs
+from rinex import rinex_netcdf
 from amqtutils import (Formatter, fiveminutetimeedit)
 from plot import rinexObsPlot
 
@@ -358,7 +359,7 @@ class displayObservations(QWidget):
         # print('signal type ={:s} - {:s}: abbrev = {:s}'.format(txt1, txt2, abbrevSignalType))
 
         # find all the signals of this type types in rinex observables
-        signalsOfType = rnxobs.findSignalsOfType(abbrevSignalType, dict(rnxobs.dGAL, **rnxobs.dGPS))
+        signalsOfType = rnxobs.signalsOfType(abbrevSignalType)
         # print('signalsOfType = {!s}'.format(signalsOfType))
 
         # enable / disable these signals according to selection made
@@ -379,11 +380,11 @@ class displayObservations(QWidget):
         signal = cbSender.text()
 
         # find the signalType to which this signal belongs
-        keyOfSignal = rnxobs.findKeyOfSignal(signal, dict(rnxobs.dGAL, **rnxobs.dGPS))
+        keyOfSignal = rnxobs.signalType(signal)
         # print('keyOfSignal = {!s}'.format(keyOfSignal))
 
         # find all signals of this type that are in the currecnt rine file
-        signalsOfType = rnxobs.findSignalsOfType(keyOfSignal[0], dict(rnxobs.dGAL, **rnxobs.dGPS))
+        signalsOfType = rnxobs.signalsOfType(keyOfSignal)
         # print('signalsOfType = {!s}'.format(signalsOfType))
 
         # determine the intersection between the RINEX signals and the signalsOfType
@@ -487,7 +488,9 @@ class displayObservations(QWidget):
         if len(dPlot['SVs']) == 0 or len(dPlot['Signals']) == 0:
             QMessageBox.warning(self, 'rnxplot', 'Please select Signals and Satellites for Plotting', QMessageBox.Cancel)
         else:
-            rinexObsPlot.plotRinexObservables(dPlot=dPlot, obsData=self.obsData, logger=self.logger)
+            # read only the values of the selection, the observations may still be on disk
+            obsSelection = rinex_netcdf.selectWindow(self.obsData, svs=dPlot['SVs'], signals=dPlot['Signals'], tlim=[np.datetime64(dPlot['Time']['start']), np.datetime64(dPlot['Time']['end'])])
+            rinexObsPlot.plotRinexObservables(dPlot=dPlot, obsData=obsSelection, logger=self.logger)
 
         pass
 
@@ -1,11 +1,16 @@
-from PyQt5.QtWidgets import (QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QPushButton, QTextEdit, QLabel)
+from PyQt5.QtWidgets import (QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QPushButton, QPlainTextEdit, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
 from PyQt5.QtGui import (QTextCursor)
-from PyQt5.QtCore import (pyqtSlot)
+from PyQt5.QtCore import (pyqtSignal, pyqtSlot)
 
 import sys
 
+from ampyutils import console_buffer
+
 class MainStackedWidget(QTabWidget):
 
+    # emitted with the identifier of the job selected for cancelling in the jobs tab
+    signalCancelJob = pyqtSignal(int)
+
     def __init__(self, parent):
         """
         create a tabbed widget for display of observation and information
@@ -17,13 +22,16 @@ class MainStackedWidget(QTabWidget):
 
         self.tabObs = QWidget()
         self.tabInfo = QWidget()
+        self.tabJobs = QWidget()
 
         # Add tabs
         self.addTab(self.tabObs, 'Observations')
         self.addTab(self.tabInfo, 'Information')
+        self.addTab(self.tabJobs, 'Jobs')
 
         # create the information display
         self.tabInfo.setLayout(self.createInfoDisplay())
+        self.tabJobs.setLayout(self.createJobsDisplay())
         self.vloObs = QVBoxLayout()
         self.tabObs.setLayout(self.vloObs)
         # self.tabObs.setLayout(self.vloObs)
@@ -37,10 +45,11 @@ class MainStackedWidget(QTabWidget):
 
     def createInfoDisplay(self) -> QVBoxLayout:
         """
-        this tab has a textEdit for displaying result of stdout
+        this tab has a textEdit for displaying result of stdout, keeping its last lines only
         """
         vloInfo = QVBoxLayout()
-        self.textEdit = QTextEdit()
+        self.textEdit = QPlainTextEdit()
+        self.textEdit.setMaximumBlockCount(console_buffer.MAXLINES)
         c = self.textEdit.textCursor();
 
         vloInfo.addWidget(self.textEdit)
@@ -50,6 +59,62 @@ class MainStackedWidget(QTabWidget):
         return vloInfo
 
 
+    def createJobsDisplay(self) -> QVBoxLayout:
+        """
+        this tab lists the jobs loading, saving and exporting the observations with a button for cancelling the selected job
+        """
+        vloJobs = QVBoxLayout()
+
+        self.tableJobs = QTableWidget(0, 5)
+        self.tableJobs.setHorizontalHeaderLabels(['Job', 'Kind', 'Priority', 'State', 'Progress'])
+        self.tableJobs.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tableJobs.horizontalHeader().setStretchLastSection(True)
+        self.tableJobs.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableJobs.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tableJobs.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableJobs.verticalHeader().setVisible(False)
+        vloJobs.addWidget(self.tableJobs)
+
+        self.pbCancelJob = QPushButton('Cancel job')
+        self.pbCancelJob.clicked.connect(self.cancelSelectedJob)
+        hloButtons = QHBoxLayout()
+        hloButtons.addStretch(1)
+        hloButtons.addWidget(self.pbCancelJob)
+        vloJobs.addLayout(hloButtons)
+
+        # the job identifiers of the rows
+        self.jobIDs = []
+
+        return vloJobs
+
+
+    def updateJobsDisplay(self, jobs: list):
+        """
+        displays the jobs (workers.jobScheduler.Job), keeping the selected job selected
+        """
+        rows = self.tableJobs.selectionModel().selectedRows()
+        selectedID = self.jobIDs[rows[0].row()] if rows and rows[0].row() < len(self.jobIDs) else None
+
+        self.jobIDs = [job.jobID for job in jobs]
+        self.tableJobs.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            for col, text in enumerate([job.name, job.kind, str(job.priority), job.state, job.message]):
+                self.tableJobs.setItem(row, col, QTableWidgetItem(text))
+
+        if selectedID in self.jobIDs:
+            self.tableJobs.selectRow(self.jobIDs.index(selectedID))
+
+
+    @pyqtSlot()
+    def cancelSelectedJob(self):
+        """
+        requests cancelling the job selected in the jobs tab
+        """
+        rows = self.tableJobs.selectionModel().selectedRows()
+        if rows and rows[0].row() < len(self.jobIDs):
+            self.signalCancelJob.emit(self.jobIDs[rows[0].row()])
+
+
     def createObsDisplay(self, obsWidget: QWidget):
         """
         add the observation widget to tab observation
@@ -74,7 +139,7 @@ class MainStackedWidget(QTabWidget):
     @pyqtSlot(str)
     def stdOutTextDisplay(self,text):
         """
-        display the text in information tab and set cursor at end
+        display the text (all text written since the previous frame) in information tab and set cursor at end
         """
         self.textEdit.moveCursor(QTextCursor.End)
         self.textEdit.insertPlainText(text)
@@ -8,11 +8,16 @@ from termcolor import colored
 import numpy as np
 import pandas as pd
 import logging
-from scipy.signal import argrelextrema
+import json
+import time
+from typing import Tuple
 
 import am_config as amc
 from ampyutils import amutils
 from plot import signalDiffPlot
+from plot import plot_batch
+from rinex import rinex_diff
+from rinex import rinex_observables as rnxobs
 __author__ = 'amuls'
 
 
@@ -29,22 +34,34 @@ def treatCmdOpts(argv):
     parser = argparse.ArgumentParser(description=helpTxt)
 
     parser.add_argument('-d', '--dir', help='Directory of SBF file (defaults to .)', required=False, default='.', type=str)
-    parser.add_argument('-f', '--files', help='Filenames of 2 CSV files to compare', nargs=2, required=True, type=str)
-    parser.add_argument('-g', '--gnss', help='GNSS System Name', required=True, type=str)
-    parser.add_argument('-s', '--signals', help='Signal names to compare', nargs=2, required=True, type=str)
+    # the signals are read from 2 CSV files or from a single observation file
+    parserInput = parser.add_mutually_exclusive_group(required=True)
+    parserInput.add_argument('-f', '--files', help='Filenames of 2 CSV files to compare', nargs=2, type=str)
+    parserInput.add_argument('-o', '--obs', help='NetCDF file or Zarr store holding both signals', type=str)
+    parserInput.add_argument('-j', '--manifest', help='JSON manifest of the days, signal pairs and moving averages to compare in batch', type=str)
+    parser.add_argument('-g', '--gnss', help='GNSS System Name (not used with a manifest)', required=False, type=str)
+    parser.add_argument('-s', '--signals', help='Signal names to compare (not used with a manifest)', nargs=2, required=False, type=str)
     parser.add_argument('-m', '--movavg', help='moving average of difference [sec] (defaults 60s)', required=False, type=int, default=60)
+    parser.add_argument('-c', '--chunk', help='compute only the statistics of the observation file chunk by chunk of epochs, in bounded memory and without plots (default all epochs at once)', required=False, type=int, default=None)
+    parser.add_argument('-b', '--batch', help='save the plots without showing them, rendered in parallel processes (default False)', action='store_true', required=False)
+    parser.add_argument('-w', '--workers', help='number of processes rendering the plots in batch mode (default all cores)', required=False, type=int, default=None)
     # parser.add_argument('-o', '--overwrite', help='overwrite daily SBF file (default False)', action='store_true', required=False)
 
     parser.add_argument('-l', '--logging', help='specify logging level console/file (default {:s})'.format(colored('INFO DEBUG', 'green')), nargs=2, required=False, default=['INFO', 'DEBUG'], choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'])
 
     args = parser.parse_args()
 
-    return args.dir, args.files, args.gnss, args.signals, args.movavg, args.logging
+    if args.manifest is None and (args.gnss is None or args.signals is None):
+        parser.error('the arguments -g/--gnss and -s/--signals are required without manifest')
+    if args.chunk is not None and args.obs is None:
+        parser.error('the argument -c/--chunk requires -o/--obs')
+
+    return args.dir, args.files, args.obs, args.manifest, args.gnss, args.signals, args.movavg, args.chunk, args.batch, args.workers, args.logging
 
 
 def checkExistenceArgs(cvsDir: str, csvFiles: list, logger: logging.Logger) -> str:
     """
-    checks if dir and csvFiles are accessible
+    checks if dir and csvFiles (or the observation file or store) are accessible
     """
     cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
@@ -64,136 +81,332 @@ def checkExistenceArgs(cvsDir: str, csvFiles: list, logger: logging.Logger) -> s
     # check if the given CSV csvFiles are accessible
     for file in csvFiles:
         if not os.access(file, os.R_OK):
-            logger.error('{func:s}: CSV file {file:s} is not accessible.'.format(func=cFuncName, file=colored(file, 'red')))
+            logger.error('{func:s}: file {file:s} is not accessible.'.format(func=cFuncName, file=colored(file, 'red')))
             sys.exit(amc.E_FILE_NOT_ACCESSIBLE)
 
     return wdir
 
 
-def mergeSignals(csvFiles: list, logger: logging.Logger) -> pd.DataFrame:
+def alignSignals(csvFiles: list, logger: logging.Logger) -> Tuple[np.ndarray, np.ndarray]:
     """
-    merge dataframes form bith signals into 1 dataframe
+    aligns both signals read from the CSV files on a shared grid of epochs
+
+    returns the epochs and the (2, time, prn) array of both signals for the PRNs observed in both files
     """
-    # read both files into separate dataframes
     cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
+    # read both files into separate dataframes
     dfObs = []
     for i, csvFile in enumerate(csvFiles):
-        dfObs.append(pd.read_csv(csvFile, sep=',', parse_dates=True))
+        dfObs.append(pd.read_csv(csvFile, sep=','))
         # get list of SVs for each signaltype
         dCSV[i]['SVs'] = dfObs[i].columns.values[1:]
         dCSV[i]['#SVs'] = len(dCSV[i]['SVs'])
-
-        # rename the columns in each dataframe to reflect PRN-ST as column name
-        colNames = dfObs[i].columns.values[1:] + '-{st:s}'.format(st=dCSV[i]['signal'])
-        colNames = np.concatenate([['time'], colNames])
-        dfObs[i].columns = colNames
         # show the dataframe
         amutils.logHeadTailDataFrame(df=dfObs[i], dfName=dCSV[i]['signal'], callerName=cFuncName, logger=logger)
-        dfObs[i]['time'] = pd.to_datetime(dfObs[i]['time'], format='%Y-%m-%d %H:%M:%S')
-        # print('type of time = {type!s}'.format(type=type(dfObs[i]['time'][0])))
-        # sys.exit(0)
 
     # get list of unique SVs
-    print(type(dCSV[1]['SVs']))
     dCSV['SVs'] = np.intersect1d(dCSV[0]['SVs'], dCSV[1]['SVs'])
     dCSV['#SVs'] = len(dCSV['SVs'])
 
     logger.info('{func:s}: information:\n{dict!s}'.format(dict=dCSV, func=cFuncName))
 
-    # merge both dataframes on 'time'
-    return pd.merge(dfObs[0], dfObs[1], on=['time'], how='outer')
+    # the epochs of both files on the grid of the most coarsely sampled one
+    times = [pd.to_datetime(df['time']).values for df in dfObs]
+    gridTimes, obs = rinex_diff.alignEpochs(times=times, values=[df[dCSV['SVs']].values for df in dfObs])
+    logger.info('{func:s}: aligned {nr0:d} and {nr1:d} epochs (intervals {int0:.3f}s and {int1:.3f}s) on {nr:d} epochs'.format(nr0=len(times[0]), nr1=len(times[1]), int0=rinex_diff.samplingInterval(times[0]) / 1e9, int1=rinex_diff.samplingInterval(times[1]) / 1e9, nr=len(gridTimes), func=cFuncName))
+
+    return gridTimes, obs
 
 
-def signalDifference(dfObs: pd.DataFrame, logger: logging.Logger) -> pd.DataFrame:
+def gnssID(gnss: str) -> str:
     """
-    calculate the difference between the signals
+    returns the identifier (e.g. 'E') of the GNSS system named gnss (e.g. 'Galileo PRS'), None when unknown
     """
-    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+    for sysID, sysName in rnxobs.dGNSSsIDs.items():
+        if gnss == sysID or gnss.lower().startswith(sysName.lower()):
+            return sysID
 
-    # make the difference per SV
-    dCSV['stats'] = {}
-    for prn in dCSV['SVs']:
-        logger.info('{func:s}: calculating signal {st0:s}-{st1:s} difference for PRN {prn!s}'.format(prn=prn, func=cFuncName, st0=dCSV[0]['signal'], st1=dCSV[1]['signal']))
+    return None
 
-        prnID = '{prn:s}'.format(prn=prn)
-        prnMA = '{prn:s}-MA'.format(prn=prn)
 
-        # difference column gets prn number as title
-        dfObs[prnID] = dfObs['{prn:s}-{st0:s}'.format(prn=prn, st0=dCSV[0]['signal'])] - dfObs['{prn:s}-{st1:s}'.format(prn=prn, st1=dCSV[1]['signal'])]
+def readSignals(obsName: str, logger: logging.Logger) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    reads both signals of the GNSS system from the NetCDF file or Zarr store, aligned on its epochs
 
-        # add moving average
-        dfObs[prnMA] = dfObs[prnID].rolling(window=dCSV['movavg']).mean()
-        # amutils.logHeadTailDataFrame(df=dfObs, dfName='dfObs', callerName=cFuncName, logger=logger)
-        # amutils.logHeadTailDataFrame(df=dfObs[prnMA], dfName='dfObs[prnMA]', callerName=cFuncName, logger=logger)
-        print('dfObs.prnMA.values = {!s}'.format(dfObs[prnMA].values))
-        # calculate the statistics for the moving average column for this prn
-        dCSV['stats'][prnID] = {}
-        dCSV['stats'][prnID]['count'] = dfObs[prnMA].count()
-        dCSV['stats'][prnID]['mean'] = dfObs[prnMA].mean()
-        dCSV['stats'][prnID]['max'] = dfObs[prnMA].max()
-        dCSV['stats'][prnID]['min'] = dfObs[prnMA].min()
+    returns the epochs and the (2, time, prn) array of both signals
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-        # Find local peaks
-        # dfObsMM = pd.DataFrame()
-        # n = 30  # number of points to be checked before and after
-        # dfObsMM['min'] = dfObs.iloc[argrelextrema(dfObs[prnMA].values, np.less_equal, order=n)[0]][prnMA]
-        # dfObsMM['max'] = dfObs.iloc[argrelextrema(dfObs[prnMA].values, np.greater_equal, order=n)[0]][prnMA]
+    gnss = gnssID(dCSV['gnss'])
+    if gnss is None:
+        logger.error('{func:s}: unknown GNSS system {gnss:s}'.format(gnss=colored(dCSV['gnss'], 'red'), func=cFuncName))
+        sys.exit(amc.E_INVALID_ARGS)
 
-        # amutils.logHeadTailDataFrame(df=dfObsMM[['min', 'max']], dfName='dfObsMM', callerName=cFuncName, logger=logger)
+    obsData = rinex_diff.openObservations(obsName)
+    signals = [dCSV[i]['signal'] for i in [0, 1]]
+    for signal in signals:
+        if signal not in obsData.data_vars:
+            logger.error('{func:s}: signal {st:s} is not observed in {obs:s}'.format(st=colored(signal, 'red'), obs=obsName, func=cFuncName))
+            sys.exit(amc.E_INVALID_ARGS)
 
-        print('-' * 20)
-        print(dCSV['stats'][prnID])
-        print('=' * 20)
+    times, prns, obs = rinex_diff.systemSignals(obsData, gnss=gnss, signals=signals)
+    obsData.close()
 
-    return dfObs
+    for i in [0, 1]:
+        dCSV[i]['SVs'] = np.array(prns, dtype=object)
+        dCSV[i]['#SVs'] = len(prns)
+    dCSV['SVs'] = np.array(prns, dtype=object)
+    dCSV['#SVs'] = len(prns)
 
+    logger.info('{func:s}: read signals {st0:s} and {st1:s} of {nrPRNs:d} PRNs over {nrEpochs:d} epochs from {obs:s}'.format(st0=signals[0], st1=signals[1], nrPRNs=len(prns), nrEpochs=len(times), obs=obsName, func=cFuncName))
 
-def main(argv):
+    return times, obs
+
+
+def signalDifference(times: np.ndarray, obs: np.ndarray, logger: logging.Logger) -> rinex_diff.SignalDiff:
     """
-    creates a combined SBF file from hourly or six-hourly SBF files
+    calculate the difference between the signals and its moving average for all PRNs at once
+
+    params obs: (2, time, prn) array of both signals for the PRNs in dCSV['SVs']
     """
-    amc.cBaseName = colored(os.path.basename(__file__), 'yellow')
     cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-    # treat command line options
-    dirCSV, filesCSV, GNSSsyst, GNSSsignals, movAvg, logLevels = treatCmdOpts(argv)
+    logger.info('{func:s}: calculating signal {st0:s}-{st1:s} difference for PRNs {prns!s}'.format(prns=list(dCSV['SVs']), func=cFuncName, st0=dCSV[0]['signal'], st1=dCSV[1]['signal']))
 
-    # create logging for better debugging
-    logger = amc.createLoggers(os.path.basename(__file__), dir=dirCSV, logLevels=logLevels)
+    sigDiff = rinex_diff.SignalDiff(times=times, prns=dCSV['SVs'], signals=[dCSV[0]['signal'], dCSV[1]['signal']], obs=obs, movAvg=dCSV['movavg'])
 
-    # check if arguments are accepted
-    workDir = checkExistenceArgs(cvsDir=dirCSV, csvFiles=filesCSV, logger=logger)
+    # the statistics of the moving average per prn
+    dCSV['stats'] = sigDiff.stats
+
+    return sigDiff
+
+
+def diffSignals(workDir: str, csvFiles: list, obsName: str, gnss: str, signals: list, movAvg: int, logger: logging.Logger) -> rinex_diff.SignalDiff:
+    """
+    reads both signals from the CSV files or the observation file in workDir and calculates their difference, the info is kept in dCSV
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
     # create dictionary with the current info
     global dCSV
     dCSV = {}
     dCSV['dir'] = workDir
-    dCSV['gnss'] = GNSSsyst
-    for i, (signal, csv) in enumerate(zip(GNSSsignals, filesCSV)):
+    dCSV['gnss'] = gnss
+    for i, (signal, csv) in enumerate(zip(signals, csvFiles or [os.path.basename(obsName.rstrip(os.sep))] * 2)):
         dCSV[i] = {'signal': signal, 'file': csv}
     dCSV['movavg'] = movAvg
     logger.info('{func:s}: information:\n{dict!s}'.format(dict=dCSV, func=cFuncName))
 
-    # read and merge into a single dataframe
-    dfObsMerged = mergeSignals(csvFiles=filesCSV, logger=logger)
+    if obsName is None:
+        # both signals aligned on a shared grid of epochs
+        times, obs = alignSignals(csvFiles=[os.path.join(workDir, csvFile) for csvFile in csvFiles], logger=logger)
+    else:
+        # both signals aligned on the epochs of the observation file
+        times, obs = readSignals(obsName=os.path.join(workDir, obsName), logger=logger)
+
     # create signalwise difference
-    dfObsMerged = signalDifference(dfObs=dfObsMerged, logger=logger)
-    amutils.logHeadTailDataFrame(df=dfObsMerged, dfName='dfObsMerged', callerName=cFuncName, logger=logger)
+    sigDiff = signalDifference(times=times, obs=obs, logger=logger)
+    amutils.logHeadTailDataFrame(df=sigDiff.toDataFrame(), dfName='sigDiff', callerName=cFuncName, logger=logger)
 
     # find max/min values for signals and for difference over all PRNs
-    dCSV['dMax'] = amutils.divround((dfObsMerged[dCSV['SVs']].max()).max(), 5, 2.5)
-    dCSV['dMin'] = amutils.divround((dfObsMerged[dCSV['SVs']].min()).min(), 5, 2.5)
+    dCSV['dMax'] = amutils.divround(np.nanmax(sigDiff.diff), 5, 2.5)
+    dCSV['dMin'] = amutils.divround(np.nanmin(sigDiff.diff), 5, 2.5)
     for i in [0, 1]:
-        stCols = dCSV[i]['SVs'] + '-{st:s}'.format(st=dCSV[i]['signal'])
-
-        dCSV[i]['max'] = amutils.divround(dfObsMerged[stCols].max().max(), 5, 2.5)
-        dCSV[i]['min'] = amutils.divround(dfObsMerged[stCols].min().min(), 5, 2.5)
+        dCSV[i]['max'] = amutils.divround(np.nanmax(sigDiff.obs[i]), 5, 2.5)
+        dCSV[i]['min'] = amutils.divround(np.nanmin(sigDiff.obs[i]), 5, 2.5)
 
     logger.info('{func:s}: information:\n{dict!s}'.format(dict=dCSV, func=cFuncName))
 
+    return sigDiff
+
+
+def streamSignals(workDir: str, obsName: str, gnss: str, signals: list, movAvg: int, chunk: int, logger: logging.Logger) -> dict:
+    """
+    calculates the statistics of the moving average of the signal difference reading the observation file chunk by chunk of epochs
+
+    returns per PRN the statistics of the moving average
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    gnssSyst = gnssID(gnss)
+    if gnssSyst is None:
+        logger.error('{func:s}: unknown GNSS system {gnss:s}'.format(gnss=colored(gnss, 'red'), func=cFuncName))
+        sys.exit(amc.E_INVALID_ARGS)
+
+    obsData = rinex_diff.openObservations(os.path.join(workDir, obsName))
+    for signal in signals:
+        if signal not in obsData.data_vars:
+            logger.error('{func:s}: signal {st:s} is not observed in {obs:s}'.format(st=colored(signal, 'red'), obs=obsName, func=cFuncName))
+            sys.exit(amc.E_INVALID_ARGS)
+
+    streamDiff = None
+    for times, prns, obs in rinex_diff.systemChunks(obsData, gnss=gnssSyst, signals=signals, chunk=chunk):
+        streamDiff = streamDiff or rinex_diff.StreamingDiff(prns=prns, signals=signals, movAvg=movAvg)
+        streamDiff.update(obs)
+        logger.debug('{func:s}: {nrEpochs:d} epochs up to {time!s}'.format(nrEpochs=streamDiff.nrEpochs, time=times[-1], func=cFuncName))
+    obsData.close()
+
+    if streamDiff is None:
+        logger.error('{func:s}: {obs:s} holds no epochs'.format(obs=obsName, func=cFuncName))
+        sys.exit(amc.E_INVALID_ARGS)
+
+    logger.info('{func:s}: statistics of moving average ({movavg:d}s) of {st0:s}-{st1:s} over {nrEpochs:d} epochs:\n{stats!s}'.format(movavg=movAvg, st0=signals[0], st1=signals[1], nrEpochs=streamDiff.nrEpochs, stats=pd.DataFrame(streamDiff.stats).T, func=cFuncName))
+
+    return streamDiff.stats
+
+
+def manifestJobs(manifestName: str, movAvg: int, logger: logging.Logger) -> list:
+    """
+    returns the jobs of the manifest: every day for every signal pair and every moving average
+
+    The manifest is a JSON file, e.g.
+        {"gnss": "Galileo PRS", "signals": [["S1A", "S6A"], ["C1A", "C6A"]], "movavg": [600],
+         "days": [{"dir": "~/Nextcloud/E6BEL/19219/csv", "csv": "BEGP2190-19-nc-E-{signal:s}.csv"},
+                  {"dir": "~/Nextcloud/E6BEL/19220", "obs": "BEGP2200-19O.nc", "signals": [["S1A", "S6A"]]}]}
+    A day reads the CSV files named by "csv" (with {signal:s} replaced by each signal) or the observation file or store "obs",
+    it may replace "gnss", "signals" and "movavg" of the manifest. Relative directories are relative to the manifest.
+    A manifest lacking any of these for a day exits before any job is run.
+
+    params movAvg: moving average when the manifest gives none
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    with open(manifestName, 'r') as fManifest:
+        dManifest = json.load(fManifest)
+
+    # the required keys of every day
+    errors = [] if dManifest.get('days') else ['no "days"']
+    for nr, dDay in enumerate(dManifest.get('days') or [], start=1):
+        if not isinstance(dDay.get('dir'), str):
+            errors.append('day {nr:d}: no "dir"'.format(nr=nr))
+        if not isinstance(dDay.get('gnss', dManifest.get('gnss')), str):
+            errors.append('day {nr:d}: no "gnss"'.format(nr=nr))
+        signals = dDay.get('signals', dManifest.get('signals'))
+        if not signals or not all([isinstance(pair, list) and len(pair) == 2 and all([isinstance(signal, str) for signal in pair]) for pair in signals]):
+            errors.append('day {nr:d}: no "signals" as pairs of signals'.format(nr=nr))
+        if dDay.get('obs') is None and not isinstance(dDay.get('csv'), str):
+            errors.append('day {nr:d}: neither "csv" nor "obs"'.format(nr=nr))
+    if errors:
+        for error in errors:
+            logger.error('{func:s}: manifest {manifest:s}: {error:s}'.format(manifest=manifestName, error=colored(error, 'red'), func=cFuncName))
+        sys.exit(amc.E_INVALID_ARGS)
+
+    jobs = []
+    for dDay in dManifest['days']:
+        dirName = os.path.join(os.path.dirname(os.path.abspath(manifestName)), os.path.expanduser(dDay['dir']))
+        movAvgs = dDay.get('movavg', dManifest.get('movavg', [movAvg]))
+        for signals in dDay.get('signals', dManifest.get('signals')):
+            for window in movAvgs:
+                dJob = {'dir': os.path.normpath(dirName), 'gnss': dDay.get('gnss', dManifest.get('gnss')), 'signals': signals, 'movavg': window, 'files': None, 'obs': dDay.get('obs')}
+                if dJob['obs'] is None:
+                    dJob['files'] = [dDay['csv'].format(signal=signal) for signal in signals]
+                # the plots of each moving average in their own directory when the day has several
+                dJob['pltDir'] = os.path.join(dJob['dir'], 'png', 'MA{movavg:d}'.format(movavg=window)) if len(movAvgs) > 1 else None
+                jobs.append(dJob)
+
+    return jobs
+
+
+def runManifestJob(dJob: dict) -> dict:
+    """
+    compares the signals of a job of the manifest and saves its plots
+
+    returns the timing, the number of plots and the statistics per PRN of the job, or the error
+    """
+    logger = logging.getLogger(os.path.basename(__file__))
+
+    dResult = {'dir': dJob['dir'], 'input': dJob['obs'] or ' '.join(dJob['files']), 'signals': '-'.join(dJob['signals']), 'movavg': dJob['movavg']}
+    tStart = time.perf_counter()
+    try:
+        for fileName in (dJob['files'] or [dJob['obs']]):
+            if not os.access(os.path.join(dJob['dir'], fileName), os.R_OK):
+                raise OSError('file {file:s} is not accessible'.format(file=os.path.join(dJob['dir'], fileName)))
+
+        sigDiff = diffSignals(workDir=dJob['dir'], csvFiles=dJob['files'], obsName=dJob['obs'], gnss=dJob['gnss'], signals=dJob['signals'], movAvg=dJob['movavg'], logger=logger)
+        dResult['diff [s]'] = time.perf_counter() - tStart
+
+        if dJob['pltDir'] is not None:
+            dCSV['pltDir'] = dJob['pltDir']
+        tPlot = time.perf_counter()
+        dResult['#plots'] = len(signalDiffPlot.plotSignalDiff(dCsv=dCSV, sigDiff=sigDiff, logger=logger, show=False))
+        dResult['plot [s]'] = time.perf_counter() - tPlot
+        dResult['stats'] = sigDiff.stats
+    except Exception as e:
+        # any failure only ends this job, the other jobs and the summary are done
+        dResult['error'] = str(e) or type(e).__name__
+    # an unknown GNSS system or signal exits in readSignals, it only ends this job
+    except SystemExit as e:
+        dResult['error'] = 'exit code {code!s}'.format(code=e.code)
+
+    return dResult
+
+
+def runManifest(manifestName: str, movAvg: int, workers: int, logger: logging.Logger) -> str:
+    """
+    runs the jobs of the manifest in parallel processes and writes the summary of the jobs as CSV file next to the manifest
+
+    returns the name of the summary
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    jobs = manifestJobs(manifestName=manifestName, movAvg=movAvg, logger=logger)
+    logger.info('{func:s}: running {nr:d} jobs of manifest {manifest:s}'.format(nr=len(jobs), manifest=manifestName, func=cFuncName))
+
+    results, elapsed = plot_batch.runJobs(jobs=[(runManifestJob, {'dJob': dJob}) for dJob in jobs], workers=workers)
+
+    # a row per PRN of each job
+    rows = []
+    for dResult in results:
+        dStats = dResult.pop('stats', {})
+        if 'error' in dResult:
+            logger.error('{func:s}: {signals:s} in {dir:s}: {error:s}'.format(signals=dResult['signals'], dir=dResult['dir'], error=colored(dResult['error'], 'red'), func=cFuncName))
+        else:
+            logger.info('{func:s}: {signals:s} (MA {movavg:d}s) in {dir:s}: difference {diff:.1f} s, {nr:d} plots {plot:.1f} s'.format(signals=dResult['signals'], movavg=dResult['movavg'], dir=dResult['dir'], diff=dResult['diff [s]'], nr=dResult['#plots'], plot=dResult['plot [s]'], func=cFuncName))
+        rows += [dict(dResult, prn=prn, **dPRN) for prn, dPRN in dStats.items()] or [dResult]
+
+    summaryName = os.path.splitext(manifestName)[0] + '-summary.csv'
+    pd.DataFrame(rows).to_csv(summaryName, index=False)
+    logger.info('{func:s}: ran {nr:d} jobs in {elapsed:.1f} s, summary in {summary:s}'.format(nr=len(jobs), elapsed=elapsed, summary=summaryName, func=cFuncName))
+
+    return summaryName
+
+
+def main(argv):
+    """
+    creates a combined SBF file from hourly or six-hourly SBF files
+    """
+    amc.cBaseName = colored(os.path.basename(__file__), 'yellow')
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    # treat command line options
+    dirCSV, filesCSV, obsName, manifestName, GNSSsyst, GNSSsignals, movAvg, chunk, batch, workers, logLevels = treatCmdOpts(argv)
+
+    # create logging for better debugging
+    logger = amc.createLoggers(os.path.basename(__file__), dir=dirCSV, logLevels=logLevels)
+
+    # the jobs of the manifest
+    if manifestName is not None:
+        runManifest(manifestName=manifestName, movAvg=movAvg, workers=workers, logger=logger)
+        return
+
+    # check if arguments are accepted
+    workDir = checkExistenceArgs(cvsDir=dirCSV, csvFiles=filesCSV or [obsName], logger=logger)
+
+    # statistics of the difference of periods too long to hold in memory
+    if chunk is not None:
+        streamSignals(workDir=workDir, obsName=obsName, gnss=GNSSsyst, signals=GNSSsignals, movAvg=movAvg, chunk=chunk, logger=logger)
+        return
+
+    # read both signals and create signalwise difference
+    sigDiff = diffSignals(workDir=workDir, csvFiles=filesCSV, obsName=obsName, gnss=GNSSsyst, signals=GNSSsignals, movAvg=movAvg, logger=logger)
+
     # create plots per prn
-    signalDiffPlot.plotSignalDiff(dCsv=dCSV, dfSig=dfObsMerged, logger=logger)
+    if batch:
+        pltNames, elapsed = plot_batch.renderPlots(jobs=plot_batch.signalDiffJobs(dCsv=dCSV, sigDiff=sigDiff), workers=workers)
+        logger.info('{func:s}: rendered {nr:d} plots in {elapsed:.1f} s ({rate:.2f} figures/s)'.format(nr=len(pltNames), elapsed=elapsed, rate=len(pltNames) / elapsed, func=cFuncName))
+    else:
+        signalDiffPlot.plotSignalDiff(dCsv=dCSV, sigDiff=sigDiff, logger=logger)
 
 
 if __name__ == "__main__":
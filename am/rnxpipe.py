@@ -0,0 +1,213 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+processes RINEX observation files as rnxplot does, without GUI: the selected observations are loaded, stored in a NetCDF file,
+exported to CSV files and plotted to PNG files, the files in parallel processes
+"""
+
+import os
+import argparse
+import sys
+import json
+import time
+from termcolor import colored
+import logging
+
+import georinex as gr
+import pandas as pd
+
+import am_config as amc
+from plot import plot_batch
+from rinex import rinex_obs3, rinex_netcdf, rinex_csv, rinex_jumps, rinex_selection
+from rinex import rinex_observables as rnxobs
+
+__author__ = 'amuls'
+
+# the steps following the loading of the observations
+STEPS = ['store', 'export', 'plot']
+
+
+def treatCmdOpts(argv):
+    """
+    Treats the command line options and sets the global variables according to the CLI args
+
+    :param argv: the options (without argv[0])
+    :type argv: list of string
+    """
+    helpTxt = os.path.basename(__file__) + ' loads, stores in NetCDF, exports to CSV and plots the selected observations of RINEX files'
+
+    # create the parser for command line arguments
+    parser = argparse.ArgumentParser(description=helpTxt)
+    parser.add_argument('files', help='RINEX observation files (also Compact RINEX), added to the files of the configuration', nargs='*', type=str)
+    parser.add_argument('-c', '--config', help='JSON configuration holding the selection as rnxplot (GNSSObs, Timing, Indicators) and optionally the files', required=False, default=None, type=str)
+    parser.add_argument('-g', '--gnss', help='GNSS systems to load (default all of the configuration or of the file)', nargs='+', required=False, default=None, type=str)
+    parser.add_argument('-m', '--meas', help='observables to load (default all of the configuration or of the file)', nargs='+', required=False, default=None, type=str)
+    parser.add_argument('-s', '--start', help='start time, ISO date and time or time of day HH:MM[:SS] (default first epoch)', required=False, default=None, type=str)
+    parser.add_argument('-e', '--stop', help='stop time, ISO date and time or time of day HH:MM[:SS] (default last epoch)', required=False, default=None, type=str)
+    parser.add_argument('-i', '--interval', help='interval of the epochs loaded [s] (default interval of the file)', required=False, default=None, type=float)
+    parser.add_argument('-n', '--indicators', help='load the LLI and SSI indicators (default False)', action='store_true', required=False)
+    parser.add_argument('-p', '--steps', help='steps following the load (default {steps:s})'.format(steps=' '.join(STEPS)), nargs='*', required=False, default=STEPS, choices=STEPS)
+    parser.add_argument('-w', '--workers', help='number of processes handling the files (default all cores)', required=False, default=None, type=int)
+    parser.add_argument('-o', '--summary', help='CSV file summarising the files processed (default rnxpipe-summary.csv)', required=False, default='rnxpipe-summary.csv', type=str)
+    parser.add_argument('-l', '--logging', help='specify logging level console/file (default {:s})'.format(colored('INFO DEBUG', 'green')), nargs=2, required=False, default=['INFO', 'DEBUG'], choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'])
+
+    args = parser.parse_args(argv[1:])
+
+    if args.config is None and not args.files:
+        parser.error('RINEX files or a configuration listing them are required')
+
+    return args
+
+
+def pipelineSelection(args) -> tuple:
+    """
+    returns the files and the selection of the configuration, overruled by the command line options
+
+    The configuration is a JSON file, e.g.
+        {"files": ["BEGP2190.19O", "BEGP2200.19O"],
+         "GNSSObs": {"E": ["C1C", "C5Q"], "G": []},
+         "Timing": {"start": "08:00", "stop": "12:00", "interval": 1.0},
+         "Indicators": false}
+    An empty list of observables selects all observables of the GNSS system. Relative file names are relative to the configuration.
+    """
+    dConfig = {}
+    files = []
+    if args.config is not None:
+        with open(args.config, 'r') as fConfig:
+            dConfig = json.load(fConfig)
+        files = [os.path.join(os.path.dirname(os.path.abspath(args.config)), os.path.expanduser(fn)) for fn in dConfig.get('files', [])]
+
+    dRinexSelect = {'GNSSObs': dConfig.get('GNSSObs', {}), 'Timing': dict(dConfig.get('Timing', {})), 'Indicators': dConfig.get('Indicators', False)}
+    if args.gnss is not None or args.meas is not None:
+        dRinexSelect['GNSSObs'] = rinex_selection.gnssObs(gnss=args.gnss or list(dRinexSelect['GNSSObs']), meas=args.meas)
+    for key, value in [('start', args.start), ('stop', args.stop), ('interval', args.interval)]:
+        if value is not None:
+            dRinexSelect['Timing'][key] = value
+    if args.indicators:
+        dRinexSelect['Indicators'] = True
+
+    return files + args.files, dRinexSelect
+
+
+def loadObs(fn: str, dRinexSelect: dict):
+    """
+    reads the selected observations, RINEX v3 files with the native reader
+    """
+    dLoad = rinex_selection.loadArguments(dRinexSelect)
+
+    if float(gr.rinexinfo(fn)['version']) >= 3:
+        return rinex_obs3.rinexobs3(fn, **dLoad)
+
+    return gr.load(fn, **dLoad)
+
+
+def plotSelection(obsData, dRinexSelect: dict, name: str) -> dict:
+    """
+    returns the dPlot of rnxplot selecting all satellites and all observables read for the time window of the selection
+    """
+    dPlot = {}
+    dPlot['Time'] = {'start': dRinexSelect['Timing']['start'], 'end': dRinexSelect['Timing']['stop']}
+    dPlot['AllSVs'] = obsData.sv.values.astype(str).tolist()
+    dPlot['SVs'] = dPlot['AllSVs']
+    dPlot['#SVs'] = len(dPlot['AllSVs'])
+    dPlot['Signals'] = [signal for signal in obsData.data_vars if rnxobs.signalType(signal) is not None]
+    dPlot['#Signals'] = len(dPlot['Signals'])
+    dPlot['name'] = name
+
+    return dPlot
+
+
+def runFile(fn: str, dRinexSelect: dict, steps: list) -> dict:
+    """
+    loads the selected observations of the RINEX file and runs the steps: store in NetCDF, export to CSV and plot
+
+    returns the timing and the number of epochs, satellites, CSV files and plots of the file, or the error
+    """
+    dResult = {'file': fn}
+    try:
+        if not os.access(fn, os.R_OK):
+            raise OSError('file {file:s} is not accessible'.format(file=fn))
+
+        # the selection completed from the header and the epochs of the file as done by the dialog of rnxplot
+        dRinexSelect = rinex_selection.completeSelection(fn, dRinexSelect)
+        dResult['gnss'] = ''.join(dRinexSelect['GNSSObs'])
+
+        tStart = time.perf_counter()
+        obsData = loadObs(fn, dRinexSelect)
+        dResult['load [s]'] = time.perf_counter() - tStart
+        dResult['#epochs'] = obsData.sizes['time']
+        dResult['#SVs'] = obsData.sizes['sv']
+
+        NetCDFName = rinex_selection.netCDFName(fn, dRinexSelect)
+        if 'store' in steps:
+            tStart = time.perf_counter()
+            rinex_netcdf.writeObs(NetCDFName, obsData)
+            dResult['store [s]'] = time.perf_counter() - tStart
+            dResult['netcdf'] = NetCDFName
+
+        if 'export' in steps:
+            tStart = time.perf_counter()
+            csvDir = os.path.join(os.path.dirname(os.path.abspath(fn)), 'csv')
+            os.makedirs(csvDir, exist_ok=True)
+            csvNames = rinex_jumps.exportJumps(obsData, csvDir=csvDir, obsName=os.path.basename(fn))
+            csvNames += rinex_csv.exportSignals(obsData, csvDir=csvDir, obsName=os.path.basename(fn))
+            dResult['export [s]'] = time.perf_counter() - tStart
+            dResult['#csv'] = len(csvNames)
+
+        if 'plot' in steps:
+            # the plots of the signal types one after the other, the files are processed in parallel
+            pltNames, dResult['plot [s]'] = plot_batch.renderPlots(jobs=plot_batch.observableJobs(dPlot=plotSelection(obsData, dRinexSelect, name=NetCDFName), obsData=obsData), workers=1)
+            dResult['#plots'] = len(pltNames)
+    except Exception as e:
+        # any failure is reported for the file, the other files are processed
+        dResult['error'] = str(e) or type(e).__name__
+
+    return dResult
+
+
+def runPipeline(files: list, dRinexSelect: dict, steps: list, workers: int, summaryName: str, logger: logging.Logger) -> pd.DataFrame:
+    """
+    runs the pipeline for the files in parallel processes and writes the summary of the files as CSV file
+
+    returns the summary
+    """
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    logger.info('{func:s}: processing {nr:d} files, selection {sel!s}, steps load {steps:s}'.format(nr=len(files), sel=dRinexSelect, steps=' '.join(steps), func=cFuncName))
+
+    results, elapsed = plot_batch.runJobs(jobs=[(runFile, {'fn': fn, 'dRinexSelect': dRinexSelect, 'steps': steps}) for fn in files], workers=min(workers or os.cpu_count(), len(files)))
+
+    for dResult in results:
+        if 'error' in dResult:
+            logger.error('{func:s}: {file:s}: {error:s}'.format(file=dResult['file'], error=colored(dResult['error'], 'red'), func=cFuncName))
+        else:
+            logger.info('{func:s}: {file:s}: {epochs:d} epochs of {svs:d} satellites loaded in {load:.1f} s, {csv:d} CSV files, {plots:d} plots'.format(file=dResult['file'], epochs=dResult['#epochs'], svs=dResult['#SVs'], load=dResult['load [s]'], csv=dResult.get('#csv', 0), plots=dResult.get('#plots', 0), func=cFuncName))
+
+    dfSummary = pd.DataFrame(results)
+    dfSummary.to_csv(summaryName, index=False)
+    logger.info('{func:s}: processed {nr:d} files in {elapsed:.1f} s, summary in {summary:s}'.format(nr=len(files), elapsed=elapsed, summary=summaryName, func=cFuncName))
+
+    return dfSummary
+
+
+def main(argv):
+    """
+    runs the pipeline for the files of the configuration and of the command line
+    """
+    amc.cBaseName = colored(os.path.basename(__file__), 'yellow')
+
+    args = treatCmdOpts(argv)
+
+    # create logging for better debugging
+    logger = amc.createLoggers(os.path.basename(__file__), dir='.', logLevels=args.logging)
+
+    files, dRinexSelect = pipelineSelection(args)
+    dfSummary = runPipeline(files=files, dRinexSelect=dRinexSelect, steps=args.steps, workers=args.workers, summaryName=args.summary, logger=logger)
+
+    if 'error' in dfSummary and dfSummary['error'].notna().any():
+        sys.exit(amc.E_FAILURE)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -12,30 +12,28 @@ Website: zetcode.com
 Last edited: August 2017
 """
 
-from PyQt5.QtWidgets import (QMainWindow, QAction, QApplication, QMessageBox, QFileDialog, QMenu)
+from PyQt5.QtWidgets import (QMainWindow, QAction, QApplication, QMessageBox, QFileDialog, QMenu, QPushButton)
 from PyQt5.QtGui import (QIcon, QColor)
-from PyQt5.QtCore import (QThread, pyqtSignal, pyqtSlot, QT_VERSION_STR)
+from PyQt5.QtCore import (pyqtSignal, pyqtSlot, QT_VERSION_STR)
 from PyQt5.Qt import (PYQT_VERSION_STR)
 
 from amqtutils import (qtutils, waitingspinnerwidget, Formatter, stdout_redirect)
 from rnxdialog import (rinexDialog, stacked_widget, observationDisplay)
-from workers import (readRinexObs, writeNetCDF, readNetCDF)
+from workers import (readRinexObs, writeNetCDF, readNetCDF, writeZarr, exportCSV, jobScheduler)
 
 from qtstyles import (amstyles)
 from rinex import rinex_observables as rnxobs
+from rinex import rinex_cache, rinex_zarr, rinex_jumps, rinex_progress, rinex_selection, rinex_netcdf
 import am_config as amc
 
 import sys
 import os
 import xarray
 import georinex as gr
-import pandas as pd
 import platform
 import io
 import numpy as np
-from multiprocessing import Queue
 from termcolor import colored
-from ampyutils import amutils
 
 
 __author__ = "Alain Muls"
@@ -46,6 +44,8 @@ __status__ = "Development"
 
 # for NetCDF compression. too high slows down with little space savings.
 ENC = {'zlib': True, 'complevel': 1, 'fletcher32': True}
+# milliseconds closing the window waits for the cancelled jobs to stop
+CLOSEWAIT = 1000
 
 
 class RinexObservations(QMainWindow):
@@ -88,6 +88,21 @@ class RinexObservations(QMainWindow):
         self.dGNSSsIDs = rnxobs.dGNSSsIDs
         self.logger.info('{func:s}: dict = {dict!s}'.format(dict=self.prettyFmt(self.dGNSSsIDs), func=cFuncName))
 
+        # cache of parsed observations (directory set by PYRINEX_CACHE, size in MB by PYRINEX_CACHE_SIZE)
+        self.obsCache = rinex_cache.ObsCache()
+        self.logger.info('{func:s}: observation cache in {dir:s}'.format(dir=self.obsCache.cacheDir, func=cFuncName))
+
+        # number of largest jumps per satellite and the signals examined (None for all) for the CSV files
+        self.nrJumps = rinex_jumps.NRJUMPS
+        self.jumpSignals = None
+
+        # the observations displayed and those replaced, closed once no job uses them
+        self.obs = None
+        self.obsReleased = []
+
+        # set when closing the window waits for the running jobs
+        self.closing = False
+
         self.initUI()
 
     def initUI(self):
@@ -114,11 +129,24 @@ class RinexObservations(QMainWindow):
         self.createActions()
         self.createMenus()
 
+        # the loads, saves and CSV exports run as jobs in a shared pool of threads, listed in the tab 'Jobs'
+        self.scheduler = jobScheduler.JobScheduler(parent=self)
+        self.scheduler.signalJobsChanged.connect(self.slotJobsChanged)
+        self.scheduler.signalJobFailed.connect(self.slotJobFailed)
+        self.tabWidget.signalCancelJob.connect(self.scheduler.cancel)
+
+        # cancels all jobs, shown while one of them is queued or running
+        self.btnCancel = QPushButton('Cancel', self)
+        self.btnCancel.setToolTip('Cancel all loading, saving and exporting jobs')
+        self.btnCancel.clicked.connect(self.cancelWorkers)
+        self.btnCancel.hide()
+        self.statusBar.addPermanentWidget(self.btnCancel)
+
         # toolbar = self.addToolBar('Exit')
         # toolbar.addAction(actExit)
 
-        # create a spinner for showing wait times
-        self.spinner = waitingspinnerwidget.QtWaitingSpinner(self, centerOnParent=True, disableParentWhenSpinning=True)
+        # create a spinner for showing wait times, the window stays enabled for cancelling
+        self.spinner = waitingspinnerwidget.QtWaitingSpinner(self, centerOnParent=True, disableParentWhenSpinning=False)
 
         self.spinner.setRoundness(70.0)
         self.spinner.setMinimumTrailOpacity(15.0)
@@ -149,6 +177,21 @@ class RinexObservations(QMainWindow):
         self.actLoadNetCDF.setStatusTip('Open NetCDF file')
         self.actLoadNetCDF.triggered.connect(self.loadNetCDF)
 
+        self.actLoadZarr = QAction(QIcon(self.scriptDir + os.path.sep + 'pics/openfile3.png'), 'Load Zarr store', self)
+        self.actLoadZarr.setStatusTip('Open Zarr observation store')
+        self.actLoadZarr.triggered.connect(self.loadZarr)
+
+        self.actAppendZarr = QAction('Append to Zarr store', self)
+        self.actAppendZarr.setStatusTip('Append the RINEX observations to a Zarr store')
+        self.actAppendZarr.triggered.connect(self.append2Zarr)
+        self.actAppendZarr.setEnabled(False)
+
+        self.actCancel = QAction('Cancel', self)
+        self.actCancel.setShortcut('Esc')
+        self.actCancel.setStatusTip('Cancel all loading, saving and exporting jobs')
+        self.actCancel.triggered.connect(self.cancelWorkers)
+        self.actCancel.setEnabled(False)
+
         self.actPreference = QAction(QIcon(self.scriptDir + os.path.sep + 'pics/preference.png'), 'Preference', self)
         self.actPreference.setShortcut('Ctrl+P')
         self.actPreference.setStatusTip('Open preference dialog')
@@ -178,8 +221,11 @@ class RinexObservations(QMainWindow):
         loadMenu = QMenu('Load', self)
         loadMenu.addAction(self.actLoadRinexInfo)
         loadMenu.addAction(self.actLoadNetCDF)
+        loadMenu.addAction(self.actLoadZarr)
 
         fileMenu.addMenu(loadMenu)
+        fileMenu.addAction(self.actAppendZarr)
+        fileMenu.addAction(self.actCancel)
         fileMenu.addAction(self.actPreference)
         fileMenu.addSeparator()
         fileMenu.addAction(self.actExit)
@@ -221,7 +267,7 @@ class RinexObservations(QMainWindow):
         # dirRxTURP = os.path.join(os.getenv("HOME"), 'RxTURP' + os.dir.separator() + 'BEGPIOS')
         self.dirRxTURP = os.getcwd()  # os.path.join(self.scriptDir, '../BEGP')
         self.logger.info('{func:s} start at working directory  = {dir:s}'.format(dir=self.dirRxTURP, func=cFuncName))
-        self.rinexObsFile, _ = QFileDialog.getOpenFileName(self, 'Open RINEX File', self.dirRxTURP, "Rinex Obs (*.[0-9][0-9]?);;OBS (*.obs)")
+        self.rinexObsFile, _ = QFileDialog.getOpenFileName(self, 'Open RINEX File', self.dirRxTURP, "Rinex Obs (*.[0-9][0-9]?);;OBS (*.obs);;Compact RINEX (*.crx *.crx.gz *.[0-9][0-9]d.gz)")
 
         self.logger.info('{func:s} reading RINEX file  = {dir:s}'.format(dir=self.rinexObsFile, func=cFuncName))
 
@@ -317,6 +363,30 @@ class RinexObservations(QMainWindow):
 
         pass
 
+    def loadZarr(self):
+        """
+        loadZarr() opens a Zarr store holding the observations of consecutive RINEX files
+        """
+        cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+        storeName = QFileDialog.getExistingDirectory(self, 'Open Zarr store', os.getcwd())
+        self.logger.info('{func:s} reading Zarr store = {dir:s}'.format(dir=storeName, func=cFuncName))
+
+        if storeName:
+            if rinex_zarr.isStore(storeName):
+                # the store is read as a NetCDF file
+                self.NetCDFFile = storeName
+                self.obsDir = os.path.dirname(storeName)
+                self.obsName = os.path.basename(storeName)
+
+                self.readNetCDFObs()
+            else:
+                msg = QMessageBox()
+                msg.setIcon(QMessageBox.Warning)
+                msg.setText('Directory {:s} is not a Zarr store.\nSelect correct directory.'.format(storeName))
+                msg.setWindowTitle("Warning")
+                msg.exec_()
+
     def checkRinexObsFile(self, filename: str):
         """
         check what type of file we have
@@ -345,7 +415,7 @@ class RinexObservations(QMainWindow):
         cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
         # get the info for the RINEX obs file
-        self.obsHeader = gr.rinexheader(self.rinexObsFile)
+        self.obsHeader = rinex_selection.readHeader(self.rinexObsFile)
         self.logger.info('{func:s}: self.obsHeader = {hdr!s}\n\n'.format(self.prettyFmt(self.obsHeader)))
         self.logger.info('{func:s}: type = {type!s}'.format(type=self.obsHeader['filetype'], func=cFuncName))
         self.logger.info('{func:s}: Systems: {syst!s}'.format(syst=self.obsHeader['fields'], func=cFuncName))
@@ -361,15 +431,14 @@ class RinexObservations(QMainWindow):
 
         self.dRnxTimes = {}
 
-        # get the times of the observations
-        obsTimes = gr.gettime(self.rinexObsFile)
+        # get the times of the observations from the epoch index (built once and stored next to the RINEX file)
+        # or from the epoch lines of a Compact RINEX file (recovered without decoding its observations)
+        dTiming = rinex_selection.readTiming(self.rinexObsFile)
 
-        # print('xxx {!s}'.format(pd.to_datetime(str(obsTimes[0].values))))
-
-        self.dRnxTimes['start'] = pd.to_datetime(str(obsTimes[0].values)).timetuple()
-        self.dRnxTimes['stop'] = pd.to_datetime(str(obsTimes[-1].values)).timetuple()
-        self.dRnxTimes['interval'] = obsTimes[0].attrs['interval']
-        self.dRnxTimes['epochs'] = len(obsTimes)
+        self.dRnxTimes['start'] = dTiming['start'].timetuple()
+        self.dRnxTimes['stop'] = dTiming['stop'].timetuple()
+        self.dRnxTimes['interval'] = dTiming['interval']
+        self.dRnxTimes['epochs'] = dTiming['epochs']
 
         self.logger.info('{func:s} dRnxTimes = {times!s}'.format(times=self.dRnxTimes, func=cFuncName))
 
@@ -393,33 +462,31 @@ class RinexObservations(QMainWindow):
         """
         readRinexObs reads in the RINEX observable data
         """
-        self.threadRnxObsRead = QThread()
-        self.workerObs = readRinexObs.readRinexObservation(rinexObsName=self.rinexObsFile, dRinexSelect=self.dRinexSelected)
-        # self.threadRnxObsRead.setObjectName('thread_' + str(idx))
-        # self.__threads.append((self.threadRnxObsRead, self.workerObs))  # need to store self.workerObs too otherwise will be gc'd
-        self.workerObs.moveToThread(self.threadRnxObsRead)
-
-        # get progress messages from self.workerObs:
-        self.workerObs.signalFinished.connect(self.slotRinexObsRead)
-        self.workerObs.signalMessage.connect(self.displayMessage)
+        workerObs = readRinexObs.readRinexObservation(rinexObsName=self.rinexObsFile, dRinexSelect=self.dRinexSelected, workers=os.cpu_count() or 1, cache=self.obsCache)
 
-        # indicate that we are waiting for the file to be read
-        self.spinner.start()
+        # get progress messages from workerObs:
+        workerObs.signalFinished.connect(self.slotRinexObsRead)
+        workerObs.signalMessage.connect(self.displayMessage)
+        workerObs.signalProgress.connect(self.displayProgress)
 
-        # get read to start self.workerObs:
+        # run workerObs as a job in the pool, loading goes before saving and exporting
         self.signalClearInfoDisplay.emit()
-        # self.sig_start.connect(self.workerObs.work)  # needed due to PyCharm debugger bug (!); comment out next line
-        self.threadRnxObsRead.started.connect(self.workerObs.work)
-        # print('starting')
-        self.threadRnxObsRead.start()  # this will emit 'started' and start self.threadRnxObsRead's event loop
-        # print('started')
+        self.scheduler.submit(workerObs, name=os.path.basename(self.rinexObsFile), kind='load')
 
     @pyqtSlot(xarray.Dataset)
     def slotRinexObsRead(self, obsData):
         """
-        slot for stopping the waiting indicator
+        slot for displaying the observations read, the worker sending them gives the file and selection
         """
+        workerObs = self.sender()
+        self.rinexObsFile = workerObs.rinexObsName
+        self.dRinexSelected = workerObs.dRinexSelect
+        self.obsDir = os.path.dirname(self.rinexObsFile)
+        self.obsName = os.path.basename(self.rinexObsFile)
+
+        self.releaseObs()
         self.obs = obsData
+        self.obsLazy = False
 
         # write to information tab
         self.signalClearInfoDisplay.emit()
@@ -428,14 +495,12 @@ class RinexObservations(QMainWindow):
         sys.stdout.write('-' * 50)
         sys.stdout.write('\n')
 
-        # stop thread reading obs
         self.statusBar.clearMessage()
-        self.spinner.stop()
 
         # check what is returned
         if self.obs is not None:
-            print('RINEX Observation Information:\n{!s}'.format(self.prettyFmt(self.obs)))
             self.save2NetCDF()
+            self.actAppendZarr.setEnabled(True)
         else:
             print('No observation data in file {:s}'.format(self.rinexObsFile))
             msg = QMessageBox()
@@ -444,10 +509,6 @@ class RinexObservations(QMainWindow):
             msg.setWindowTitle("Error")
             msg.exec_()
 
-        self.threadRnxObsRead.quit()
-        self.threadRnxObsRead.wait()
-        self.threadRnxObsRead.deleteLater()
-
         # create CSV files for all SYSTEMS and all SIGNALS
         print('... create CSV files for all SYSTEMS and all SIGNALS')
 
@@ -456,9 +517,16 @@ class RinexObservations(QMainWindow):
     @pyqtSlot(xarray.Dataset)
     def slotNetCDFObsRead(self, obsData):
         """
-        slot for stopping the waiting indicator
+        slot for displaying the observations read, the worker sending them gives the file
         """
+        self.NetCDFFile = self.sender().netCDFName
+        self.obsDir = os.path.dirname(self.NetCDFFile)
+        self.obsName = os.path.basename(self.NetCDFFile)
+
+        self.releaseObs()
         self.obs = obsData
+        self.obsLazy = True
+        self.actAppendZarr.setEnabled(False)
 
         # write to information tab
         self.signalClearInfoDisplay.emit()
@@ -467,13 +535,7 @@ class RinexObservations(QMainWindow):
         sys.stdout.write('-' * 50)
         sys.stdout.write('\n')
 
-        # stop thread reading obs
         self.statusBar.clearMessage()
-        self.spinner.stop()
-
-        self.threadNetCDFRead.quit()
-        self.threadNetCDFRead.wait()
-        self.threadNetCDFRead.deleteLater()
 
         self.createObservationDisplay()
 
@@ -481,7 +543,14 @@ class RinexObservations(QMainWindow):
         """
         create the display for displaying the observation data collected
         """
-        self.createCSVfiles()
+        cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+        # a lazily opened NetCDF file is exported signal by signal, a Zarr store spans several RINEX files each exported when read
+        if self.obsLazy and rinex_zarr.isStore(self.NetCDFFile):
+            self.logger.info('{func:s}: no CSV files created for Zarr store {file:s}, they are created when reading its RINEX files'.format(file=self.NetCDFFile, func=cFuncName))
+            print('... no CSV files created for the Zarr store {:s}, they are created when reading its RINEX files'.format(self.obsName))
+        else:
+            self.createCSVfiles()
 
         self.obsWidget = observationDisplay.displayObservations(NetCDFname=self.NetCDFFile, obsData=self.obs, logger=self.logger, styleSheet=self.styleSheet)
 
@@ -497,7 +566,7 @@ class RinexObservations(QMainWindow):
 
     def createCSVfiles(self):
         """
-        creates per SYSTEM and per SIGNAL a CSV file for all observed SVs
+        creates per SYSTEM and per SIGNAL a CSV file for all observed SVs, exported as a job in the background
         """
         cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
@@ -514,120 +583,120 @@ class RinexObservations(QMainWindow):
         listSignals = [k for k, _ in self.obs.data_vars.items()]
         self.logger.info('{func:s}: signals found {sign!s}'.format(sign=listSignals, func=cFuncName))
 
-        # TEMP searching for max difference in signal strength for signal type E6A
-        for _, sigType in enumerate(listSignals):
-            dfSigType = self.findSigTypeExtremeDiff(typeSig=sigType)
-
-            # export to sigType differences to CSV file
-            amutils.mkdir_p(os.path.join(self.obsDir, 'csv'))
-            csvName = os.path.join(self.obsDir, 'csv', '{file:s}-{st:s}-diff'.format(file=self.obsName, st=sigType))
-            nameCVS = csvName.replace('.', '-')
-            csvName = nameCVS.replace('_', '')
-            dfSigType.to_csv('{csv:s}.csv'.format(csv=csvName))
-            self.logger.info('{func:s}: created CSV file {csv:s}'.format(csv=csvName, func=cFuncName))
-
-        # create for all GNSSs per SIGNALTYPE a csv file with the data
-        for _, gnss in enumerate(listGNSSsID):
-            for _, sigType in enumerate(listSignals):
-                self.logger.info('{func:s}: creating CSV file for system {syst:s}, signal {st:s}'.format(syst=gnss, st=sigType, func=cFuncName))
+        # largest jumps between epochs per signal and for all GNSSs per SIGNALTYPE a csv file with the data, the signals in parallel
+        workerCSV = exportCSV.exportCSVFiles(obsData=self.obs, csvDir=os.path.join(self.obsDir, 'csv'), obsName=self.obsName, jumpSignals=self.jumpSignals, nrJumps=self.nrJumps, workers=os.cpu_count() or 1)
+        workerCSV.signalFinished.connect(self.slotExportedCSV)
+        workerCSV.signalMessage.connect(self.displayMessage)
+        workerCSV.signalProgress.connect(self.displayProgress)
 
-                dfSystST = self.createSystemSignalType(gnss=gnss, st=sigType, listSVs=listSVs)
+        self.scheduler.submit(workerCSV, name=self.obsName, kind='export')
 
-                # export to CSV file
-                amutils.mkdir_p(os.path.join(self.obsDir, 'csv'))
-                csvName = os.path.join(self.obsDir, 'csv', '{file:s}-{syst:s}-{st:s}'.format(file=self.obsName, syst=gnss, st=sigType))
-                nameCVS = csvName.replace('.', '-')
-                csvName = nameCVS.replace('_', '')
-                # nameCVS= csvName.translate({ord(i): '-' for i in ['.', '_']})
-                dfSystST.to_csv('{csv:s}.csv'.format(csv=csvName))
-                self.logger.info('{func:s}: created CSV file {csv:s}'.format(csv=csvName, func=cFuncName))
-
-    def createSystemSignalType(self, gnss: str, st: str, listSVs: list) -> pd.DataFrame:
+    @pyqtSlot(list)
+    def slotExportedCSV(self, csvNames: list):
         """
-        create dataframe for GNSS system and for SignalType
+        slot called when the CSV files have been created
         """
         cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-        # create an empty dataframe
-        # dfObsType = pd.DataFrame(columns=['time'])
+        for csvName in csvNames:
+            self.logger.info('{func:s}: created CSV file {csv:s}'.format(csv=csvName, func=cFuncName))
+        self.statusBar.showMessage('Created {:d} CSV files for {:s}'.format(len(csvNames), self.sender().obsName))
+
+    @pyqtSlot(str)
+    def displayMessage(self, message: str):
+        """
+        display message from a worker in statusbar
+        """
+        # print('MSG = {:s}'.format(message))
+        self.statusBar.showMessage(message)
 
-        dfObs = pd.DataFrame(index=self.obs.time.values)
-        dfObs.index.name = 'time'
+    @pyqtSlot(dict)
+    def displayProgress(self, dProgress: dict):
+        """
+        display the epochs, bytes, MB/s and time left reported by a worker in statusbar
+        """
+        self.statusBar.showMessage(rinex_progress.progressMessage(dProgress['action'], dProgress))
 
-        # self.logger.debug('{func:s}: test to get time index'.format(func=cFuncName))
-        # self.logger.debug(self.obs.time.values)
-        # self.logger.debug(type(self.obs.time.values))
-        # # dfTest = pd.DataFrame(index=self.obs.time.values, data=self.obs.time.values)
-        # # amutils.logHeadTailDataFrame(logger=self.logger, callerName=sys._getframe().f_code.co_name, df=dfTest, dfName='TEST index', head=10, tail=10)
+    def releaseObs(self):
+        """
+        releases the observations displayed before they are replaced, they are closed once no job uses them anymore
+        """
+        if self.obs is not None:
+            self.obsReleased.append(self.obs)
+            self.obs = None
+        self.closeReleasedObs()
 
-        # self.logger.debug('{func:s}: test get data'.format(func=cFuncName))
-        # self.logger.debug(self.obs[st].sel(sv='E30').values)
-        # self.logger.debug(type(self.obs[st].sel(sv='E30').values))
+    def closeReleasedObs(self):
+        """
+        closes the released observations not used by a queued or running job, freeing a lazily opened NetCDF file or Zarr store
+        """
+        inUse = [getattr(job.worker, 'obsData', None) for job in self.scheduler.activeJobs()]
+        for obsData in [obsData for obsData in self.obsReleased if not any([obsData is used for used in inUse])]:
+            with rinex_netcdf.HDF5LOCK:
+                obsData.close()
+            self.obsReleased.remove(obsData)
 
-        for sv in listSVs:
-            # check if sv belongs to the requested system
-            if sv.startswith(gnss):
-                self.logger.info('{func:s}: ... working on Sv {sv:s}'.format(sv=sv, func=cFuncName))
+    @pyqtSlot()
+    def slotJobsChanged(self):
+        """
+        updates the job list, the spinner turns while files are loaded and the Cancel button is shown while jobs are active
+        """
+        self.tabWidget.updateJobsDisplay(list(self.scheduler.jobs.values()))
+        self.closeReleasedObs()
 
-                dfObs[sv] = self.obs[st].sel(sv=sv).values
+        # the window closes when the last job running at closing has stopped
+        if self.closing and not self.scheduler.activeJobs():
+            self.close()
+            return
 
-        amutils.logHeadTailDataFrame(logger=self.logger, callerName=sys._getframe().f_code.co_name, df=dfObs, dfName='Observables for {st:s}'.format(st=st), head=10, tail=10)
+        if self.scheduler.activeJobs(kind='load'):
+            self.spinner.start()
+        else:
+            self.spinner.stop()
 
-        return dfObs
+        active = bool(self.scheduler.activeJobs())
+        self.btnCancel.setVisible(active)
+        self.actCancel.setEnabled(active)
 
-    def findSigTypeExtremeDiff(self, typeSig: str) -> pd.DataFrame:
+    @pyqtSlot(int, str)
+    def slotJobFailed(self, jobID: int, message: str):
         """
-        find the extreme differences in the S6A value
+        reports a job that ended with an error
         """
         cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-        # create an empty dataframe for Positive / Negative differences
-        dfS6Apos = pd.DataFrame(columns=['time'])
-        dfS6Aneg = pd.DataFrame(columns=['time'])
-        for sv in self.obs.sv:
-            # print('*' * 20)
-            # print('sv = {!s}'.format(sv))
-            # print('my self.obs[S6A][{!s}] {!s}'.format(sv, self.obs[typeSig].sel(sv=sv)))
-            # print('+' * 20)
-            # print('my MAX self.obs[S6A][{!s}] {!s}'.format(sv, np.max(self.obs[typeSig].sel(sv=sv))))
-            # print('-' * 20)
-
-            # print('=' * 20)
-            dfObs = self.obs[typeSig].sel(sv=sv).to_dataframe()
-            dfObs['ST'] = dfObs[typeSig].diff()  # np.abs(dfObs[typeSig].diff())
-            # amutils.logHeadTailDataFrame(logger=self.logger, callerName='CSV creator', df=dfObs, dfName='dfObs')
-            # sort high to low
-            # print('sorted = {!s}'.format(dfObs['ST'].sort_values(ascending=False, na_position='last', inplace=False)))
-            # keep largest / smallest
-            # print('nlargest = {!s}'.format(dfObs['ST'].nlargest(n=3)))
-            # print('nsmallest = {!s}'.format(dfObs['ST'].nsmallest(n=3)))
-            # print('=+' * 30)
-
-            if dfS6Apos.shape[0] == 0:
-                dfTmp = dfObs['ST'].nlargest(n=3).to_frame()
-                dfTmp2 = dfObs['ST'].nsmallest(n=3).to_frame()
-            else:
-                dfTmp = pd.merge(dfS6Apos, dfObs['ST'].nlargest(n=3).to_frame(), on='time', how='outer')
-                dfTmp2 = pd.merge(dfS6Aneg, dfObs['ST'].nsmallest(n=3).to_frame(), on='time', how='outer')
-            dfS6Apos = dfTmp
-            dfS6Aneg = dfTmp2
-            dfS6Apos.rename(columns={'ST': '{!s}'.format(sv.values)}, inplace=True)
-            dfS6Aneg.rename(columns={'ST': '{!s}'.format(sv.values)}, inplace=True)
-            # amutils.logHeadTailDataFrame(logger=self.logger, callerName='CSV creator', df=dfS6Apos, dfName='dfS6Apos')
-            # amutils.logHeadTailDataFrame(logger=self.logger, callerName='CSV creator', df=dfS6Aneg, dfName='dfS6Aneg')
+        job = self.scheduler.jobs[jobID]
+        self.logger.error('{func:s}: job {id:d} {kind:s} {name:s} failed: {msg:s}'.format(id=jobID, kind=job.kind, name=job.name, msg=message, func=cFuncName))
+        self.statusBar.showMessage('Job {kind:s} {name:s} failed: {msg:s}'.format(kind=job.kind, name=job.name, msg=message))
 
-        dfSigType = dfS6Apos.append(dfS6Aneg, ignore_index=False).sort_index(axis=0)
-        amutils.logHeadTailDataFrame(logger=self.logger, callerName=sys._getframe().f_code.co_name, df=dfSigType, dfName='Differences for {st:s}'.format(st=typeSig), head=10, tail=10)
-
-        return dfSigType
+    def cancelWorkers(self):
+        """
+        cancels the jobs: queued jobs are not started, running workers stop at their next block of epochs or variable
+        """
+        self.scheduler.cancelAll()
+        self.statusBar.showMessage('Cancelling ...')
 
-    @pyqtSlot(str)
-    def displayMessage(self, message: str):
+    def closeEvent(self, event):
         """
-        display message from self.workerObs in statusbar
+        cancels the jobs and closes when they have stopped
+
+        A running job that cannot be cancelled (e.g. a load by georinex) or stops later than CLOSEWAIT keeps the window
+        open and responsive, listing the jobs still running, until it ends.
         """
-        # print('MSG = {:s}'.format(message))
-        self.statusBar.showMessage(message)
+        cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+        if not self.scheduler.shutdown(msecs=CLOSEWAIT):
+            running = self.scheduler.activeJobs()
+            if running:
+                self.closing = True
+                for job in running:
+                    self.logger.warning('{func:s}: closing once job {id:d} {kind:s} {name:s} has stopped'.format(id=job.jobID, kind=job.kind, name=job.name, func=cFuncName))
+                self.statusBar.showMessage('Closing once {:d} running jobs have stopped: {:s}'.format(len(running), ', '.join([job.name for job in running])))
+                self.tabWidget.setCurrentWidget(self.tabWidget.tabJobs)
+                event.ignore()
+                return
+
+        super(RinexObservations, self).closeEvent(event)
 
     def save2NetCDF(self):
         """
@@ -637,32 +706,16 @@ class RinexObservations(QMainWindow):
         # os.path.splitext(os.path.basename(f))
 
         # create the filename for the NetCDF file
-        startHMS = ''.join(self.dRinexSelected['Timing']['start'][-8:-3].split(':'))
-        stopHMS = ''.join(self.dRinexSelected['Timing']['stop'][-8:-3].split(':'))
-        interval = '{:05.2f}'.format(self.dRinexSelected['Timing']['interval']).replace('.', '')
-        gnss = ''.join([k for k, v in self.dRinexSelected['GNSSObs'].items()])
-
-        self.NetCDFFile  = '{rinex:s}-{start:s}-{stop:s}-{interval:s}-{gnss:s}.nc'.format(rinex=self.rinexObsFile.replace('.', '-'), start=startHMS, stop=stopHMS, interval=interval, gnss=gnss)
-
-        self.threadSaveNetCDF = QThread()
-        self.workerNetCDF = writeNetCDF.write2NetCDF(NetCDFName=self.NetCDFFile, obsData=self.obs)
-        # self.threadSaveNetCDF.setObjectName('thread_' + str(idx))
-        # self.__threads.append((self.threadSaveNetCDF, self.workerNetCDF))  # need to store self.workerNetCDF too otherwise will be gc'd
-        self.workerNetCDF.moveToThread(self.threadSaveNetCDF)
+        self.NetCDFFile = rinex_selection.netCDFName(self.rinexObsFile, self.dRinexSelected)
 
-        # get progress messages from self.workerNetCDF:
-        self.workerNetCDF.signalFinished.connect(self.slotWroteNetCDF)
-        self.workerNetCDF.signalMessage.connect(self.displayMessage)
+        workerNetCDF = writeNetCDF.write2NetCDF(NetCDFName=self.NetCDFFile, obsData=self.obs)
 
-        # indicate that we are waiting for the file to be read
-        # self.spinner.start()
+        # get progress messages from workerNetCDF:
+        workerNetCDF.signalFinished.connect(self.slotWroteNetCDF)
+        workerNetCDF.signalMessage.connect(self.displayMessage)
+        workerNetCDF.signalProgress.connect(self.displayProgress)
 
-        # get read to start self.workerNetCDF:
-        # self.sig_start.connect(self.workerNetCDF.work)  # needed due to PyCharm debugger bug (!); comment out next line
-        self.threadSaveNetCDF.started.connect(self.workerNetCDF.work)
-        self.threadSaveNetCDF.start()  # this will emit 'started' and start self.thread's event loop
-
-        pass
+        self.scheduler.submit(workerNetCDF, name=os.path.basename(self.NetCDFFile), kind='save')
 
     @pyqtSlot()
     def slotWroteNetCDF(self):
@@ -670,60 +723,68 @@ class RinexObservations(QMainWindow):
         slot called when NetCDF file has been created
         """
         # print('slotWroteNetCDF')
-        self.statusBar.clearMessage()
+        self.statusBar.showMessage('Observations stored in {:s}'.format(os.path.basename(self.sender().NetCDFName)))
+
+    def append2Zarr(self):
+        """
+        appends the RINEX observations read to a Zarr store, created when not existing
+        """
+        cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
 
-        # self.spinner.stop()
-        self.threadSaveNetCDF.quit()
-        self.threadSaveNetCDF.wait()
-        self.threadSaveNetCDF.deleteLater()
+        storeName, _ = QFileDialog.getSaveFileName(self, 'Append to Zarr store', os.path.dirname(self.rinexObsFile), "Zarr store (*.zarr)", options=QFileDialog.DontConfirmOverwrite)
+        if not storeName:
+            return
+        if not storeName.endswith('.zarr') and not rinex_zarr.isStore(storeName):
+            storeName += '.zarr'
+        self.logger.info('{func:s}: appending {file:s} to Zarr store {store:s}'.format(file=self.rinexObsFile, store=storeName, func=cFuncName))
+
+        workerZarr = writeZarr.append2Zarr(storeName=storeName, obsData=self.obs)
+
+        # get progress messages from workerZarr:
+        workerZarr.signalFinished.connect(self.slotAppendedZarr)
+        workerZarr.signalMessage.connect(self.displayMessage)
+
+        self.scheduler.submit(workerZarr, name=os.path.basename(storeName), kind='save')
+
+    @pyqtSlot(int)
+    def slotAppendedZarr(self, nrEpochs: int):
+        """
+        slot called when the observations have been appended to the Zarr store
+        """
+        self.statusBar.showMessage('Appended {:d} epochs to {:s}'.format(nrEpochs, os.path.basename(self.sender().storeName)))
 
     def readNetCDFObs(self):
         """
         readRinexObs reads in the RINEX observable data
         """
-        self.threadNetCDFRead = QThread()
-        self.workerNetCDF = readNetCDF.readNetCDFMeas(netCDFName=self.NetCDFFile)
-        # self.threadNetCDFRead.setObjectName('thread_' + str(idx))
-        # self.__threads.append((self.threadNetCDFRead, self.workerNetCDF))  # need to store self.workerNetCDF too otherwise will be gc'd
-        self.workerNetCDF.moveToThread(self.threadNetCDFRead)
-
-        # get progress messages from self.workerNetCDF:
-        self.workerNetCDF.signalFinished.connect(self.slotNetCDFObsRead)
-        self.workerNetCDF.signalMessage.connect(self.displayMessage)
+        # only the coordinates are read, the selection for plotting is read when plotted
+        workerNetCDF = readNetCDF.readNetCDFMeas(netCDFName=self.NetCDFFile, lazy=True)
 
-        # indicate that we are waiting for the file to be read
-        self.spinner.start()
+        # get progress messages from workerNetCDF:
+        workerNetCDF.signalFinished.connect(self.slotNetCDFObsRead)
+        workerNetCDF.signalMessage.connect(self.displayMessage)
+        workerNetCDF.signalProgress.connect(self.displayProgress)
 
-        # get read to start self.workerNetCDF:
+        # run workerNetCDF as a job in the pool
         self.signalClearInfoDisplay.emit()
-        # self.sig_start.connect(self.workerNetCDF.work)  # needed due to PyCharm debugger bug (!); comment out next line
-        self.threadNetCDFRead.started.connect(self.workerNetCDF.work)
-        # print('starting')
-        self.threadNetCDFRead.start()  # this will emit 'started' and start self.thread's event loop
-        # print('started')
+        self.scheduler.submit(workerNetCDF, name=os.path.basename(self.NetCDFFile), kind='load')
 
 
 if __name__ == '__main__':
-    # Create Queue and redirect sys.stdout to this queue
-    queue = Queue()
-    sys.stdout = stdout_redirect.WriteStream(queue)
-
     qapp = QApplication(sys.argv)
 
+    # redirect sys.stdout to a buffer displayed in the information tab at a fixed frame rate
+    console = stdout_redirect.ConsoleStream()
+    console.install()
+    qapp.aboutToQuit.connect(console.close)
+
     screen_resolution = qapp.desktop().screenGeometry()
     # width, height = screen_resolution.width(), screen_resolution.height()
 
     # print('wxh = {!s}x{!s}'.format(width, height))
 
     app = RinexObservations(screen_resolution)
+    console.signalText.connect(app.tabWidget.stdOutTextDisplay)
     app.show()
 
-    # Create thread that will listen on the other end of the queue, and send the text to the textedit in our application
-    rxStdOutThread = QThread()
-    stdOutRx = stdout_redirect.rxStdOut(queue)
-    stdOutRx.rxStdOutSignal.connect(app.tabWidget.stdOutTextDisplay)
-    stdOutRx.moveToThread(rxStdOutThread)
-    rxStdOutThread.started.connect(stdOutRx.run)
-    rxStdOutThread.start()
-
     qapp.exec_()
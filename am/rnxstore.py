@@ -0,0 +1,82 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+appends the observations of RINEX or NetCDF files to a Zarr store, e.g. the daily files of a campaign
+"""
+
+import os
+import argparse
+import sys
+import time
+from termcolor import colored
+
+import am_config as amc
+from rinex import rinex_obs3, rinex_netcdf, rinex_zarr
+
+__author__ = 'amuls'
+
+
+def treatCmdOpts(argv):
+    """
+    Treats the command line options and sets the global variables according to the CLI args
+
+    :param argv: the options (without argv[0])
+    :type argv: list of string
+    """
+    helpTxt = os.path.basename(__file__) + ' appends the observations of RINEX v3 or NetCDF files to a Zarr store'
+
+    # create the parser for command line arguments
+    parser = argparse.ArgumentParser(description=helpTxt)
+    parser.add_argument('store', help='Zarr store (directory), created when not existing', type=str)
+    parser.add_argument('-f', '--files', help='RINEX v3 observation (also Compact RINEX) or NetCDF files in time order', nargs='+', required=True, type=str)
+    parser.add_argument('-c', '--chunk', help='seconds of observations per chunk when creating the store (default {:d})'.format(rinex_zarr.CHUNKSECONDS), required=False, default=rinex_zarr.CHUNKSECONDS, type=float)
+    parser.add_argument('-w', '--workers', help='number of threads writing chunks (default all cores)', required=False, default=None, type=int)
+    parser.add_argument('-l', '--logging', help='specify logging level console/file (default {:s})'.format(colored('INFO DEBUG', 'green')), nargs=2, required=False, default=['INFO', 'DEBUG'], choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'])
+
+    args = parser.parse_args(argv[1:])
+
+    return args
+
+
+def readObs(fn: str):
+    """
+    reads all observations of a RINEX v3 or NetCDF file
+    """
+    if fn.endswith('.nc'):
+        return rinex_netcdf.openObs(fn, lazy=False)
+
+    return rinex_obs3.rinexobs3(fn, useindicators=True)
+
+
+def main(argv):
+    """
+    appends the files one after the other to the store
+    """
+    amc.cBaseName = colored(os.path.basename(__file__), 'yellow')
+    cFuncName = colored(os.path.basename(__file__), 'yellow') + ' - ' + colored(sys._getframe().f_code.co_name, 'green')
+
+    args = treatCmdOpts(argv)
+
+    # create logging for better debugging
+    logger = amc.createLoggers(os.path.basename(__file__), dir='.', logLevels=args.logging)
+
+    for fn in args.files:
+        if not os.path.isfile(fn) or not os.access(fn, os.R_OK):
+            logger.error('{func:s}: file {file:s} does not exist or is not accessible'.format(file=fn, func=cFuncName))
+            sys.exit(amc.E_FILE_NOT_EXIST)
+
+        tStart = time.perf_counter()
+        nrEpochs = rinex_zarr.appendObs(args.store, readObs(fn), chunkSeconds=args.chunk, workers=args.workers)
+
+        if nrEpochs == 0:
+            logger.warning('{func:s}: {file:s} holds no epochs after the last epoch in {store:s}'.format(file=fn, store=args.store, func=cFuncName))
+        else:
+            logger.info('{func:s}: appended {nr:d} epochs of {file:s} in {elapsed:.2f} s'.format(nr=nrEpochs, file=fn, elapsed=time.perf_counter() - tStart, func=cFuncName))
+
+    with rinex_zarr.openStore(args.store) as store:
+        logger.info('{func:s}: {store:s} holds {nrEpochs:d} epochs of {nrSVs:d} satellites from {start!s} to {stop!s}'.format(store=args.store, nrEpochs=store.sizes['time'], nrSVs=store.sizes['sv'], start=store.time.values[0], stop=store.time.values[-1], func=cFuncName))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
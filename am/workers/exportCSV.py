@@ -0,0 +1,73 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import xarray
+
+from ampyutils import amutils
+from rinex import rinex_csv, rinex_jumps, rinex_progress
+
+
+class exportCSVFiles(QObject):
+
+    # emit this signal with the names of the CSV files created at end of the export
+    signalFinished = pyqtSignal(list)
+    # message to be shown to user in statusbar
+    signalMessage = pyqtSignal(str)
+    # bytes exported, MB/s and seconds left (see rinex_progress.Progress.report) with the action
+    signalProgress = pyqtSignal(dict)
+    # emitted instead of signalFinished when the export was cancelled, the CSV files written are kept
+    signalCancelled = pyqtSignal()
+
+
+    def __init__(self, obsData: xarray.Dataset, csvDir: str, obsName: str, jumpSignals: list = None, nrJumps: int = rinex_jumps.NRJUMPS, workers: int = 1):
+        """
+        creates per GNSS system and per signal a CSV file for all observed SVs and per signal the largest jumps
+        params obsData: observations to export
+        params csvDir: directory of the CSV files, created when not existing
+        params obsName: name of the observation file used for naming the CSV files
+        params jumpSignals: the signals examined for the largest jumps (None for all)
+        params nrJumps: number of largest jumps per satellite
+        params workers: number of processes writing the CSV files of the signals
+        """
+        super(exportCSVFiles, self).__init__()
+
+        # store the passend variables
+        self.obsData = obsData
+        self.csvDir = csvDir
+        self.obsName = obsName
+        self.jumpSignals = jumpSignals
+        self.nrJumps = nrJumps
+        self.workers = workers
+
+        # reports the progress of exporting the signals, cancelled from the GUI thread
+        self.action = 'Exporting {:s}'.format(self.obsName)
+        self.progress = rinex_progress.Progress(callback=lambda dProgress: self.signalProgress.emit(dict(dProgress, action=self.action)))
+
+    def cancel(self):
+        """
+        requests the export to stop at the next signal, called from the GUI thread
+        """
+        self.progress.cancel()
+
+
+    def work(self):
+        """
+        performs the export of the CSV files
+        """
+        self.signalMessage.emit('Exporting {:s} to CSV files. Please wait'.format(self.obsName))
+
+        amutils.mkdir_p(self.csvDir)
+
+        try:
+            # largest jumps between epochs per signal
+            csvNames = rinex_jumps.exportJumps(self.obsData, csvDir=self.csvDir, obsName=self.obsName, signals=self.jumpSignals, k=self.nrJumps, progress=self.progress)
+
+            # for all GNSSs per SIGNALTYPE a csv file with the data, the signals in parallel
+            csvNames += rinex_csv.exportSignals(self.obsData, csvDir=self.csvDir, obsName=self.obsName, workers=self.workers, progress=self.progress)
+        except rinex_progress.Cancelled:
+            self.signalMessage.emit('Exporting {:s} cancelled'.format(self.obsName))
+            self.signalCancelled.emit()
+            return
+
+        self.progress.finish()
+
+        self.signalFinished.emit(csvNames)
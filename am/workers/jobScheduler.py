@@ -0,0 +1,227 @@
+"""
+shared pool of threads running the workers of rnxplot as prioritised jobs
+
+A worker (readRinexObservation, readNetCDFMeas, write2NetCDF, append2Zarr,
+exportCSVFiles) is submitted as a job of a kind: loading a file, saving the
+observations or exporting CSV files. The jobs run in a bounded QThreadPool, a
+queued job of higher priority is started before the others so an interactive
+load is not stuck behind a background save or export. The workers keep their
+signals, emitted from the pool thread they are delivered queued in the GUI
+thread.
+
+The scheduler keeps the list of jobs with their state and last message for
+display, a queued job is cancelled by taking it from the pool, a running job by
+calling the cancel() of its worker.
+"""
+
+import itertools
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from rinex import rinex_progress
+
+__author__ = 'amuls'
+
+# priorities of the kinds of jobs, a queued job with a higher priority starts first
+dPriorities = {
+    'load': 10,  # reading a RINEX or NetCDF file or Zarr store for display
+    'save': 5,  # storing the observations read in a NetCDF file or Zarr store
+    'export': 0,  # CSV files for further analysis
+}
+
+# states of a job
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+# number of ended jobs kept in the job list
+MAXENDED = 50
+
+
+class Job(QRunnable):
+    """
+    runs the work() of a worker in a thread of the pool
+    """
+
+    def __init__(self, scheduler: 'JobScheduler', jobID: int, worker: QObject, name: str, kind: str, priority: int):
+        """
+        params scheduler: the scheduler notified of the changes of state
+        params worker: the worker with a work() method, optionally a cancel() method and a progress attribute
+        params name: the name of the job displayed (e.g. the file name)
+        """
+        super(Job, self).__init__()
+        # the scheduler keeps the job, the pool does not delete it
+        self.setAutoDelete(False)
+
+        self.scheduler = scheduler
+        self.jobID = jobID
+        self.worker = worker
+        self.name = name
+        self.kind = kind
+        self.priority = priority
+
+        self.state = QUEUED
+        self.message = ''
+
+    def run(self):
+        """
+        runs the worker, its state tells whether it finished, was cancelled or failed
+        """
+        # cancelled while being started by the pool
+        if self.state != QUEUED:
+            return
+
+        self.scheduler.setState(self, RUNNING)
+        try:
+            self.worker.work()
+        except Exception as e:
+            self.message = '{name:s}: {err!s}'.format(name=type(e).__name__, err=e)
+            self.scheduler.setState(self, FAILED)
+        else:
+            progress = getattr(self.worker, 'progress', None)
+            self.scheduler.setState(self, CANCELLED if progress is not None and progress.cancelled else FINISHED)
+
+
+class JobScheduler(QObject):
+    """
+    bounded pool of threads running prioritised jobs and keeping their list
+    """
+
+    # emitted when a job is submitted, changes state or reports a message
+    signalJobsChanged = pyqtSignal()
+    # emitted with the job identifier and the message when a job failed
+    signalJobFailed = pyqtSignal(int, str)
+    # emitted from the pool threads, delivered in the GUI thread
+    signalStateChanged = pyqtSignal(int, str)
+
+    def __init__(self, maxThreads: int = None, parent: QObject = None):
+        """
+        params maxThreads: number of jobs running at the same time (default half the cores, at least 2)
+        """
+        super(JobScheduler, self).__init__(parent)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(maxThreads if maxThreads is not None else max(2, (os.cpu_count() or 1) // 2))
+
+        self.jobs = OrderedDict()
+        self.jobIDs = itertools.count(1)
+
+        self.signalStateChanged.connect(self.slotStateChanged)
+
+    def submit(self, worker: QObject, name: str, kind: str, priority: int = None) -> int:
+        """
+        queues the worker as a job of the kind ('load', 'save' or 'export'), returns the job identifier
+
+        params priority: overrules the priority of the kind
+        """
+        job = Job(self, jobID=next(self.jobIDs), worker=worker, name=name, kind=kind, priority=dPriorities[kind] if priority is None else priority)
+        self.jobs[job.jobID] = job
+
+        # the messages and progress of the worker are shown in the job list
+        worker.signalMessage.connect(self.slotJobMessage)
+        if hasattr(worker, 'signalProgress'):
+            worker.signalProgress.connect(self.slotJobProgress)
+
+        self.pruneJobs()
+        self.pool.start(job, job.priority)
+        self.signalJobsChanged.emit()
+
+        return job.jobID
+
+    def setState(self, job: Job, state: str):
+        """
+        sets the state of the job, called from the pool thread running it
+        """
+        job.state = state
+        self.signalStateChanged.emit(job.jobID, state)
+
+    @pyqtSlot(int, str)
+    def slotStateChanged(self, jobID: int, state: str):
+        """
+        forwards the change of state of a job in the GUI thread
+        """
+        if state == FAILED and jobID in self.jobs:
+            self.signalJobFailed.emit(jobID, self.jobs[jobID].message)
+
+        self.signalJobsChanged.emit()
+
+    def jobOfWorker(self, worker: QObject) -> Job:
+        """
+        returns the job running the worker, None when not found
+        """
+        for job in self.jobs.values():
+            if job.worker is worker:
+                return job
+
+        return None
+
+    @pyqtSlot(str)
+    def slotJobMessage(self, message: str):
+        """
+        keeps the last message of the worker with its job
+        """
+        job = self.jobOfWorker(self.sender())
+        if job is not None:
+            job.message = message
+            self.signalJobsChanged.emit()
+
+    @pyqtSlot(dict)
+    def slotJobProgress(self, dProgress: dict):
+        """
+        keeps the last progress of the worker as message of its job
+        """
+        job = self.jobOfWorker(self.sender())
+        if job is not None:
+            job.message = rinex_progress.progressMessage(dProgress['action'], dProgress)
+            self.signalJobsChanged.emit()
+
+    def cancel(self, jobID: int):
+        """
+        cancels the job: a queued job is taken from the pool, a running job is asked to stop when its worker can be cancelled
+        """
+        job = self.jobs.get(jobID)
+        if job is None:
+            return
+
+        if job.state == QUEUED and self.pool.tryTake(job):
+            job.state = CANCELLED
+            job.message = 'cancelled before start'
+            self.signalJobsChanged.emit()
+        elif job.state in (QUEUED, RUNNING) and hasattr(job.worker, 'cancel'):
+            # a queued job not taken from the pool is being started
+            job.worker.cancel()
+            job.message = 'cancelling ...'
+            self.signalJobsChanged.emit()
+
+    def cancelAll(self):
+        """
+        cancels all queued and running jobs
+        """
+        for jobID in list(self.jobs.keys()):
+            self.cancel(jobID)
+
+    def activeJobs(self, kind: str = None) -> list:
+        """
+        returns the queued and running jobs, optionally only of the kind
+        """
+        return [job for job in self.jobs.values() if job.state in (QUEUED, RUNNING) and (kind is None or job.kind == kind)]
+
+    def pruneJobs(self):
+        """
+        removes the oldest ended jobs beyond MAXENDED from the list
+        """
+        ended = [jobID for jobID, job in self.jobs.items() if job.state not in (QUEUED, RUNNING)]
+        for jobID in ended[:max(len(ended) - MAXENDED, 0)]:
+            del self.jobs[jobID]
+
+    def shutdown(self, msecs: int = -1) -> bool:
+        """
+        cancels the jobs and waits for the running ones to stop, returns whether they all stopped within msecs
+        """
+        self.cancelAll()
+
+        return self.pool.waitForDone(msecs)
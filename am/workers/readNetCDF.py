@@ -2,9 +2,10 @@ from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 
 import xarray
 
-import georinex as gr
 from os import path
 
+from rinex import rinex_netcdf, rinex_zarr, rinex_progress
+
 
 class readNetCDFMeas(QObject):
 
@@ -12,19 +13,37 @@ class readNetCDFMeas(QObject):
     signalFinished = pyqtSignal(xarray.Dataset)
     # message to be shown to user in statusbar
     signalMessage = pyqtSignal(str)
+    # bytes read, MB/s and seconds left (see rinex_progress.Progress.report) with the action
+    signalProgress = pyqtSignal(dict)
+    # emitted instead of signalFinished when the reading was cancelled
+    signalCancelled = pyqtSignal()
 
 
-    def __init__(self, netCDFName: str):
+    def __init__(self, netCDFName: str, lazy: bool = False, chunks: dict = None):
         """
         initialises the readRinexObservation
-        params netCDFName: name of RINEX file to load
+        params netCDFName: name of NetCDF file or Zarr store to load
+        params lazy: read only the coordinates, the values stay on disk until selected for display
+        params chunks: dask chunks for the lazy arrays (e.g. {'time': 3600})
         """
         super(readNetCDFMeas, self).__init__()
 
         # store the passend variables
         self.netCDFName = netCDFName
+        self.lazy = lazy
+        self.chunks = chunks
         # print('worker init {:s}'.format(self.netCDFName))
 
+        # reports the progress of loading all values, cancelled from the GUI thread
+        self.action = 'Reading {:s}'.format(path.basename(self.netCDFName))
+        self.progress = rinex_progress.Progress(callback=lambda dProgress: self.signalProgress.emit(dict(dProgress, action=self.action)))
+
+    def cancel(self):
+        """
+        requests the loading to stop at the next variable, called from the GUI thread
+        """
+        self.progress.cancel()
+
 
     def work(self):
         """
@@ -45,8 +64,18 @@ class readNetCDFMeas(QObject):
         # print('worker emit signalMessage indicating start of worker')
         self.signalMessage.emit('Reading NetCDF Observations from {:s}. Please wait'.format(path.basename(self.netCDFName)))
 
-        # load the selected data
-        dataObs = gr.load(self.netCDFName, verbose=True)
+        # load the selected data, lazily only the coordinates. A Zarr store is always read lazily
+        if rinex_zarr.isStore(self.netCDFName):
+            dataObs = rinex_zarr.openStore(self.netCDFName, chunks=self.chunks)
+        elif self.lazy:
+            dataObs = rinex_netcdf.openObs(self.netCDFName, lazy=True, chunks=self.chunks)
+        else:
+            try:
+                dataObs = rinex_netcdf.openObs(self.netCDFName, lazy=False, progress=self.progress)
+            except rinex_progress.Cancelled:
+                self.signalMessage.emit('Reading {:s} cancelled'.format(path.basename(self.netCDFName)))
+                self.signalCancelled.emit()
+                return
 
         # worker emit signalFinished
         # print('readRinexObs emit signalFinished')
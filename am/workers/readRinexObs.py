@@ -5,6 +5,8 @@ import xarray
 import georinex as gr
 from os import path
 
+from rinex import rinex_obs3, rinex_cache, rinex_progress, rinex_selection
+
 
 class readRinexObservation(QObject):
 
@@ -12,23 +14,46 @@ class readRinexObservation(QObject):
     signalFinished = pyqtSignal(xarray.Dataset)
     # message to be shown to user in statusbar
     signalMessage = pyqtSignal(str)
+    # epochs and bytes read, MB/s and seconds left (see rinex_progress.Progress.report) with the action
+    signalProgress = pyqtSignal(dict)
+    # emitted instead of signalFinished when the reading was cancelled
+    signalCancelled = pyqtSignal()
 
 
-    def __init__(self, rinexObsName: str, dRinexSelect: dict):
+    def __init__(self, rinexObsName: str, dRinexSelect: dict, engine: str = 'native', workers: int = 1, cache: rinex_cache.ObsCache = None):
         """
         initialises the readRinexObservation
         params rinexObsName: name of RINEX file to load
         params dRinexSelect: the selected GNSS ssystems and observables and indicators
+        params engine: 'native' uses rinex_obs3 for RINEX v3 files, 'georinex' uses georinex.load
+        params workers: number of processes used by the native reader to parse the file in parallel
+        params cache: cache of parsed observations consulted before reading the RINEX file
         type rinexObsName: str
         type dRinexSelect: dict
+        type engine: str
+        type workers: int
+        type cache: rinex_cache.ObsCache
         """
         super(readRinexObservation, self).__init__()
 
         # store the passend variables
         self.rinexObsName = rinexObsName
         self.dRinexSelect = dRinexSelect
+        self.engine = engine
+        self.workers = workers
+        self.cache = cache
         # print('worker init {:s}'.format(self.rinexObsName))
 
+        # reports the progress of the native reader, cancelled from the GUI thread
+        self.action = 'Reading {:s}'.format(path.basename(self.rinexObsName))
+        self.progress = rinex_progress.Progress(callback=lambda dProgress: self.signalProgress.emit(dict(dProgress, action=self.action)))
+
+    def cancel(self):
+        """
+        requests the reading to stop at the next block of epochs, called from the GUI thread
+        """
+        self.progress.cancel()
+
 
     def work(self):
         """
@@ -49,21 +74,30 @@ class readRinexObservation(QObject):
         # print('worker emit signalMessage indicating start of worker')
         self.signalMessage.emit('Reading RINEX Observations from {:s}. Please wait'.format(path.basename(self.rinexObsName)))
 
-        # specify the GNSS systems and measurements to load to load
-        useGNSS = []
-        useMeas = []
-        for GNSS, Meas in self.dRinexSelect['GNSSObs'].items():
-            useGNSS.append(GNSS)
-            useMeas = useMeas + Meas
-        useMeas = list(set(useMeas))
-        # print('use = {!s}  meas = {!s}'.format(useGNSS, useMeas))
-
-        # specify in ISOFORMAT the start / stop times for reading the RINEX file
-        tLim = [self.dRinexSelect['Timing']['start'], self.dRinexSelect['Timing']['stop']]
-        # print('tLim = {!s}'.format(tLim))
-
-        # load the selected data
-        dataObs = gr.load(self.rinexObsName, tlim=tLim, use=useGNSS, meas=useMeas, useindicators=self.dRinexSelect['Indicators'], interval=self.dRinexSelect['Timing']['interval'], verbose=True)
+        # selection as passed to the readers and used as key of the cache
+        dLoad = rinex_selection.loadArguments(self.dRinexSelect)
+
+        dataObs = None
+        if self.cache is not None:
+            dataObs = self.cache.lookup(self.rinexObsName, **dLoad)
+            if dataObs is not None:
+                self.signalMessage.emit('Observations from {:s} taken from cache'.format(path.basename(self.rinexObsName)))
+
+        # load the selected data, the native reader only handles RINEX v3 files
+        if dataObs is None:
+            try:
+                if self.engine == 'native' and float(gr.rinexinfo(self.rinexObsName)['version']) >= 3:
+                    dataObs = rinex_obs3.rinexobs3(self.rinexObsName, workers=self.workers, progress=self.progress, **dLoad)
+                else:
+                    dataObs = gr.load(self.rinexObsName, verbose=True, **dLoad)
+            except rinex_progress.Cancelled:
+                self.signalMessage.emit('Reading {:s} cancelled'.format(path.basename(self.rinexObsName)))
+                self.signalCancelled.emit()
+                return
+            self.progress.finish()
+
+            if self.cache is not None:
+                self.cache.store(self.rinexObsName, dataObs, **dLoad)
         # dataObs = gr.load(self.rinexObsName, tlim=tLim, use=useGNSS, meas=useMeas, useindicators=self.dRinexSelect['Indicators'], interval=60, verbose=True)
 
         # worker emit signalFinished
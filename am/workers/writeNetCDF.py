@@ -6,9 +6,7 @@ import xarray
 import georinex as gr
 import os
 
-
-# for NetCDF compression. too high slows down with little space savings.
-ENC = {'zlib': True, 'complevel': 1, 'fletcher32': True}
+from rinex import rinex_netcdf, rinex_progress
 
 
 class write2NetCDF(QObject):
@@ -17,23 +15,43 @@ class write2NetCDF(QObject):
     signalFinished = pyqtSignal()
     # message to be shown to user in statusbar
     signalMessage = pyqtSignal(str)
+    # bytes written, MB/s and seconds left (see rinex_progress.Progress.report) with the action
+    signalProgress = pyqtSignal(dict)
+    # emitted instead of signalFinished when the writing was cancelled, the file is removed
+    signalCancelled = pyqtSignal()
 
 
-    def __init__(self, NetCDFName: str, obsData: xarray.Dataset):
+    def __init__(self, NetCDFName: str, obsData: xarray.Dataset, layout: str = 'balanced', shuffle: bool = True, dtypes: str = 'lossless'):
         """
         writes to a NetCDF formatted file
         params rinexName: name of NetCDF file to create
         params dRinexSelect: RINEX selection made
         params obsDate: observations to write
+        params layout: (time, sv) chunk layout from rinex_netcdf.dLayouts
+        params shuffle: use the HDF5 shuffle filter
+        params dtypes: storage dtypes from rinex_netcdf.dDtypes (None keeps float64)
         """
         super(write2NetCDF, self).__init__()
 
         # store the passend variables
         self.NetCDFName = NetCDFName
         self.obsData = obsData
+        self.layout = layout
+        self.shuffle = shuffle
+        self.dtypes = dtypes
 
         # print('worker init {:s}'.format(self.NetCDFName))
 
+        # reports the progress of writing the variables, cancelled from the GUI thread
+        self.action = 'Writing {:s}'.format(os.path.basename(self.NetCDFName))
+        self.progress = rinex_progress.Progress(callback=lambda dProgress: self.signalProgress.emit(dict(dProgress, action=self.action)))
+
+    def cancel(self):
+        """
+        requests the writing to stop at the next variable, called from the GUI thread
+        """
+        self.progress.cancel()
+
 
     def work(self):
         """
@@ -62,18 +80,13 @@ class write2NetCDF(QObject):
         # print('worker emit signalMessage indicating start of worker')
         self.signalMessage.emit('Writing Observations to {:s}. Please wait'.format(os.path.basename(self.NetCDFName)))
 
-        if os.path.isfile(self.NetCDFName):
-            try:
-                os.remove(self.NetCDFName)
-            except OSError as e: # this would be "except OSError, e:" before Python 2.6
-                if e.errno != errno.ENOENT: # errno.ENOENT = no such file or directory
-                    raise # re-raise exception if a different error occurred
-
-        # create the NetCDF file
-        enc = {k: ENC for k in self.obsData.data_vars}
-        # print('enc = {!s}'.format(enc))
-
-        self.obsData.to_netcdf(self.NetCDFName, group='OBS', mode='w', encoding=enc)
+        # create the NetCDF file with chunks tuned for reading satellite time series and short windows
+        try:
+            rinex_netcdf.writeObs(self.NetCDFName, self.obsData, layout=self.layout, shuffle=self.shuffle, dtypes=self.dtypes, progress=self.progress)
+        except rinex_progress.Cancelled:
+            self.signalMessage.emit('Writing {:s} cancelled'.format(os.path.basename(self.NetCDFName)))
+            self.signalCancelled.emit()
+            return
 
         # worker emit signalFinished
         # print('writeNetCDF emit signalFinished')
@@ -0,0 +1,41 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import xarray
+
+import os
+
+from rinex import rinex_zarr
+
+
+class append2Zarr(QObject):
+
+    # emit this signal with the number of epochs appended at end of writing to the Zarr store
+    signalFinished = pyqtSignal(int)
+    # message to be shown to user in statusbar
+    signalMessage = pyqtSignal(str)
+
+
+    def __init__(self, storeName: str, obsData: xarray.Dataset, workers: int = None):
+        """
+        appends to a Zarr store, created when not existing
+        params storeName: name of the Zarr store (directory)
+        params obsData: observations to append
+        params workers: number of threads writing chunks (None for all cores)
+        """
+        super(append2Zarr, self).__init__()
+
+        # store the passend variables
+        self.storeName = storeName
+        self.obsData = obsData
+        self.workers = workers
+
+
+    def work(self):
+        """
+        performs appending the observations after the last epoch in the store
+        """
+        self.signalMessage.emit('Appending Observations to {:s}. Please wait'.format(os.path.basename(self.storeName)))
+
+        nrEpochs = rinex_zarr.appendObs(self.storeName, self.obsData, workers=self.workers)
+
+        self.signalFinished.emit(nrEpochs)